@@ -24,6 +24,7 @@ def show_menu():
             {"key": "2", "label": "Inicializar nueva clínica", "group": "Clínicas"},
             {"key": "3", "label": "Validar e insertar configuración", "group": "Clínicas"},
             {"key": "4", "label": "Generar queries de clínica", "group": "Clínicas"},
+            {"key": "7", "label": "Validar e insertar todas las clínicas", "group": "Clínicas"},
             {"key": "5", "label": "Ejecutar comandos de clínica", "group": "Migración"},
             {"key": "6", "label": "Sincronizar documentación", "group": "Documentación"},
             {"key": "0", "label": "Salir", "group": "Sistema"},
@@ -70,6 +71,19 @@ def validate_insert_option():
         error(f"{e}")
 
 
+def onboard_clinics_option():
+    """Opcion para validar e insertar todas las clínicas en lote."""
+    from clinics.onboard_clinics import onboard_clinics
+
+    try:
+        onboard_clinics()
+    except KeyboardInterrupt:
+        console.print()
+        info("Operación cancelada")
+    except Exception as e:
+        error(f"{e}")
+
+
 def generate_queries_option():
     """Opcion para generar queries de una clínica."""
     from clinics.generate_queries import generate_queries
@@ -133,6 +147,9 @@ def main():
         elif option == "4":
             generate_queries_option()
             ask("Presiona Enter para continuar")
+        elif option == "7":
+            onboard_clinics_option()
+            ask("Presiona Enter para continuar")
         elif option == "5":
             run_commands_option()
         elif option == "6":
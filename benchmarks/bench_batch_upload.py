@@ -0,0 +1,131 @@
+"""
+Benchmark de throughput de subidas en lote, sin red.
+
+Usa LocalStorageClient (OBJECT_STORAGE_PROVIDER=local) sobre un
+directorio temporal y compara, con la misma operación por archivo
+(upload_file_checksummed: mmap + SHA-256 en la misma lectura):
+- subida secuencial (una a la vez)
+- upload_many con distintos números de workers (speedup vs secuencial)
+
+El backend local no tiene la latencia de red que upload_many paraleliza:
+sin ella cada subida es CPU/disco y la ganancia depende de los núcleos
+disponibles. --latency-ms simula el round-trip de cada request a S3
+(default 20 ms); con --latency-ms 0 se mide solo el costo local.
+
+Uso:
+    python benchmarks/bench_batch_upload.py [--files N] [--size-kb KB] [--latency-ms MS]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.storage import LocalStorageClient, StorageConfig, UploadItem
+from ui import print_header, print_table, info
+
+
+def create_source_files(source_dir: str, count: int, size_kb: int) -> list[str]:
+    """Crea archivos de prueba con contenido aleatorio (simulan PDFs de evidencia)."""
+    paths = []
+    for i in range(count):
+        path = os.path.join(source_dir, f"evidence_{i:06d}.pdf")
+        with open(path, "wb") as f:
+            f.write(os.urandom(size_kb * 1024))
+        paths.append(path)
+    return paths
+
+
+class LatencyStorageClient(LocalStorageClient):
+    """LocalStorageClient que espera latency segundos por subida (simula el round-trip a S3)."""
+
+    def __init__(self, config: StorageConfig, latency: float):
+        super().__init__(config)
+        self.latency = latency
+
+    def upload_stream(self, source, key, bucket_type="general",
+                      content_type="application/octet-stream", metadata=None, callback=None) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return super().upload_stream(source, key, bucket_type, content_type, metadata, callback)
+
+
+def new_client(storage_dir: str, latency: float) -> LocalStorageClient:
+    """Cliente local sobre un directorio vacío."""
+    shutil.rmtree(storage_dir, ignore_errors=True)
+    return LatencyStorageClient(StorageConfig(
+        access_key_id="",
+        secret_access_key="",
+        region="local",
+        bucket_general="general",
+        bucket_worm="worm",
+        provider="local",
+        local_path=storage_dir,
+    ), latency)
+
+
+def run(files: int, size_kb: int, workers_list: list[int], latency_ms: float):
+    print_header("BENCHMARK: subidas en lote (backend local)")
+    info(
+        f"{files} archivos de {size_kb} KB, latencia simulada {latency_ms:g} ms por subida, "
+        f"{os.cpu_count()} CPU"
+    )
+    latency = latency_ms / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source_dir = os.path.join(tmp, "source")
+        storage_dir = os.path.join(tmp, "storage")
+        os.makedirs(source_dir)
+        paths = create_source_files(source_dir, files, size_kb)
+        total_mb = files * size_kb / 1024
+
+        items = [
+            UploadItem(path, f"consents/evidence/{os.path.basename(path)}", "worm")
+            for path in paths
+        ]
+
+        rows = []
+
+        client = new_client(storage_dir, latency)
+        start = time.perf_counter()
+        for item in items:
+            client.upload_file_checksummed(item.file_path, item.key, bucket_type=item.bucket_type)
+        sequential = time.perf_counter() - start
+        rows.append([
+            "secuencial",
+            f"{sequential:.2f}s",
+            f"{files / sequential:.1f}",
+            f"{total_mb / sequential:.1f}",
+            "1.00x",
+        ])
+
+        for workers in workers_list:
+            client = new_client(storage_dir, latency)
+            # Sin límite de ancho de banda ni concurrencia adaptativa: se mide
+            # solo el paralelismo de upload_many
+            report = client.upload_many(items, max_workers=workers, max_mb_per_sec=0, adaptive=False)
+            if report.failed:
+                info(f"{len(report.failed)} fallidos con {workers} workers: {report.failed[0].error}")
+            rows.append([
+                f"upload_many ({workers} workers)",
+                f"{report.elapsed:.2f}s",
+                f"{report.files_per_second:.1f}",
+                f"{report.mb_per_second:.1f}",
+                f"{sequential / report.elapsed:.2f}x",
+            ])
+
+        print_table("Throughput", ["Modo", "Tiempo", "Archivos/s", "MB/s", "Speedup"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de subidas en lote sin red")
+    parser.add_argument("--files", type=int, default=2000, help="Número de archivos")
+    parser.add_argument("--size-kb", type=int, default=200, help="Tamaño de cada archivo en KB")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16], help="Workers a probar")
+    parser.add_argument("--latency-ms", type=float, default=20,
+                        help="Latencia simulada por subida en ms (0 = solo costo local)")
+    args = parser.parse_args()
+    run(args.files, args.size_kb, args.workers, args.latency_ms)
@@ -0,0 +1,118 @@
+"""
+Benchmark del resumen de clínica: N+1 queries vs query agregada.
+
+Compara, para una clínica (por defecto la de más sites activos, p.ej.
+una de 20 sites):
+- N+1: sites + salas/equipos/tratamientos por site + profesionales y
+  servicios completos, contando con len() (lo que hacía get_clinic_summary)
+- get_clinic_counts(clinic_id): una query agregada
+- get_clinic_counts(): la misma query para todas las clínicas
+
+Solo lectura. Requiere DATABASE_URL en .env.
+
+Uso:
+    python benchmarks/bench_clinic_summary.py [--clinic-id ID] [--runs N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.database import execute_query
+from clinics.queries import get_clinic_counts
+from ui import print_header, print_table, info, error
+
+
+def counts_n_plus_one(clinic_id: str) -> tuple[dict, int]:
+    """Conteos con el patrón anterior (filas completas + len()). Retorna (conteos, queries)."""
+    queries = 0
+
+    def run(query, params):
+        nonlocal queries
+        queries += 1
+        return execute_query(query, params)
+
+    sites = run("""
+        SELECT id, clinic_id, name, address, timezone, site_status, record_status,
+               record_metadata, created_at, updated_at
+        FROM site WHERE clinic_id = %s AND record_status = 'ACTIVE' ORDER BY name
+    """, (clinic_id,))
+    counts = {"rooms_count": 0, "equipment_count": 0, "treatments_count": 0}
+    for site in sites:
+        counts["rooms_count"] += len(run(
+            "SELECT * FROM room WHERE site_id = %s AND record_status = 'ACTIVE' ORDER BY name",
+            (site["id"],),
+        ))
+        counts["equipment_count"] += len(run(
+            "SELECT * FROM equipment WHERE site_id = %s AND record_status = 'ACTIVE' ORDER BY name",
+            (site["id"],),
+        ))
+        counts["treatments_count"] += len(run(
+            "SELECT * FROM treatment WHERE site_id = %s AND record_status = 'ACTIVE' ORDER BY name",
+            (site["id"],),
+        ))
+    counts["sites_count"] = len(sites)
+    counts["professionals_count"] = len(run(
+        "SELECT * FROM professional WHERE clinic_id = %s AND record_status = 'ACTIVE'", (clinic_id,),
+    ))
+    counts["services_count"] = len(run(
+        "SELECT * FROM service WHERE clinic_id = %s AND record_status = 'ACTIVE'", (clinic_id,),
+    ))
+    counts["patients_count"] = run(
+        "SELECT COUNT(*) AS count FROM patient WHERE clinic_id = %s AND record_status = 'ACTIVE'", (clinic_id,),
+    )[0]["count"]
+    return counts, queries
+
+
+def median_time(func, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run(clinic_id: str | None, runs: int):
+    print_header("BENCHMARK: resumen de clínica")
+
+    if not clinic_id:
+        rows = execute_query("""
+            SELECT clinic_id, COUNT(*) AS sites
+            FROM site WHERE record_status = 'ACTIVE'
+            GROUP BY clinic_id ORDER BY sites DESC LIMIT 1
+        """)
+        if not rows:
+            error("No hay clínicas con sites activos")
+            return
+        clinic_id = rows[0]["clinic_id"]
+
+    old_counts, n_queries = counts_n_plus_one(clinic_id)
+    new_counts = get_clinic_counts(clinic_id)[0]
+    info(f"Clínica {clinic_id}: {old_counts['sites_count']} sites activos")
+
+    mismatched = [k for k, v in old_counts.items() if new_counts[k] != v]
+    if mismatched:
+        error(f"Conteos distintos: {', '.join(mismatched)}")
+
+    n_plus_one = median_time(lambda: counts_n_plus_one(clinic_id), runs)
+    aggregate = median_time(lambda: get_clinic_counts(clinic_id), runs)
+    all_clinics = median_time(get_clinic_counts, runs)
+    n_clinics = len(get_clinic_counts())
+
+    print_table("Resultados (mediana)", ["Modo", "Queries", "Tiempo", "Speedup"], [
+        ["N+1 (filas completas + len)", str(n_queries), f"{n_plus_one * 1000:.1f} ms", "1.0x"],
+        ["get_clinic_counts(clinic_id)", "1", f"{aggregate * 1000:.1f} ms", f"{n_plus_one / aggregate:.1f}x"],
+        [f"get_clinic_counts() ({n_clinics} clínicas)", "1", f"{all_clinics * 1000:.1f} ms", "-"],
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del resumen de clínica")
+    parser.add_argument("--clinic-id", help="Clínica a medir (default: la de más sites)")
+    parser.add_argument("--runs", type=int, default=5, help="Repeticiones por modo")
+    args = parser.parse_args()
+    run(args.clinic_id, args.runs)
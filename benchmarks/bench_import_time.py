@@ -0,0 +1,63 @@
+"""
+Benchmark del costo de import de los módulos de almacenamiento.
+
+Mide, en subprocesos nuevos (sin caché de módulos):
+- import config.storage (boto3 diferido hasta el primer cliente)
+- import config.storage + import boto3 (lo que costaba el import eager)
+- primer cliente S3 (import de boto3 + creación del cliente)
+
+Uso:
+    python benchmarks/bench_import_time.py [--runs N]
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from ui import print_header, print_table, info
+
+SNIPPETS = {
+    "import config.storage": "import config.storage",
+    "import config.storage + boto3 (eager)": "import config.storage, boto3, boto3.s3.transfer",
+    "primer cliente S3": (
+        "from config.storage import S3Client, StorageConfig\n"
+        "S3Client(StorageConfig('AKIA', 'secret', 'eu-west-3', 'g', 'w')).client"
+    ),
+}
+
+
+def measure(code: str) -> float:
+    """Tiempo (ms) de ejecutar code en un intérprete nuevo, descontando el arranque."""
+    script = (
+        "import sys, time\n"
+        f"sys.path.insert(0, {ROOT_DIR!r})\n"
+        "start = time.perf_counter()\n"
+        f"{code}\n"
+        "print((time.perf_counter() - start) * 1000)\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def run(runs: int):
+    print_header("BENCHMARK: tiempo de import (boto3 diferido)")
+    info(f"{runs} ejecuciones por caso (mediana)")
+
+    results = {label: statistics.median(measure(code) for _ in range(runs)) for label, code in SNIPPETS.items()}
+    lazy = results["import config.storage"]
+    eager = results["import config.storage + boto3 (eager)"]
+
+    rows = [[label, f"{ms:.1f} ms"] for label, ms in results.items()]
+    print_table("Resultados", ["Caso", "Tiempo"], rows)
+    info(f"Ahorro en comandos que no usan AWS: {eager - lazy:.1f} ms ({eager / lazy:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de tiempo de import")
+    parser.add_argument("--runs", type=int, default=5, help="Ejecuciones por caso")
+    args = parser.parse_args()
+    run(args.runs)
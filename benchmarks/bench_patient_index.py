@@ -0,0 +1,111 @@
+"""
+Benchmark del índice de identidad de pacientes.
+
+Genera pacientes sintéticos (como filas de la tabla patient) y filas de
+origen con los mismos datos escritos distinto (puntos en el documento,
+prefijo +34, mayúsculas, acentos), y mide:
+- Construcción del índice
+- Matching de todas las filas de origen con find()
+- Tamaño del índice persistido y tiempo de carga
+
+No requiere base de datos (la carga en streaming desde Postgres es
+PatientIndex.from_database).
+
+Uso:
+    python benchmarks/bench_patient_index.py [--patients N] [--rows N]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.patient_index import PatientIndex
+from config.utils import generate_ids
+from ui import print_header, print_table, info, success
+
+FIRST_NAMES = ["Ana", "José", "María", "Lucía", "Javier", "Álvaro", "Sofía", "Raúl", "Inés", "Pablo"]
+LAST_NAMES = ["García", "López", "Martínez", "Sánchez", "Pérez", "Gómez", "Fernández", "Díaz", "Muñoz", "Ruiz"]
+
+
+def synthetic_patients(n: int, rng: random.Random) -> list[dict]:
+    ids = generate_ids(n)
+    patients = []
+    for i, patient_id in enumerate(ids):
+        patients.append({
+            "id": patient_id,
+            "id_document_number": f"{10_000_000 + i}{'TRWAGMYFPDXBNJZSQVHLCKE'[i % 23]}",
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": f"{rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "birthday": date(1940, 1, 1) + timedelta(days=rng.randrange(30_000)),
+            "phones": [f"6{i:08d}"],
+            "emails": [f"paciente{i}@example.com"],
+        })
+    return patients
+
+
+def source_rows(patients: list[dict], n: int, rng: random.Random) -> list[dict]:
+    """Filas de origen: ~80% pacientes existentes (con otro formato), ~20% nuevos."""
+    rows = []
+    for i in range(n):
+        if rng.random() < 0.8:
+            p = rng.choice(patients)
+            doc = p["id_document_number"]
+            rows.append({
+                "document": f"{doc[:2]}.{doc[2:5]}.{doc[5:8]}-{doc[8:].lower()}" if i % 3 else None,
+                "email": p["emails"][0].upper() if i % 2 else None,
+                "phone": f"+34 {p['phones'][0][:3]} {p['phones'][0][3:]}",
+                "first_name": p["first_name"].upper(),
+                "last_name": p["last_name"],
+                "birthday": p["birthday"].strftime("%d/%m/%Y"),
+            })
+        else:
+            rows.append({"document": f"X{i}", "email": None, "phone": None,
+                         "first_name": "Nuevo", "last_name": f"Paciente {i}", "birthday": None})
+    return rows
+
+
+def run(n_patients: int, n_rows: int):
+    print_header("BENCHMARK: índice de identidad de pacientes")
+    rng = random.Random(42)
+    patients = synthetic_patients(n_patients, rng)
+    rows = source_rows(patients, n_rows, rng)
+    info(f"{n_patients:,} pacientes, {n_rows:,} filas de origen")
+
+    start = time.perf_counter()
+    index = PatientIndex.from_rows(patients)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matched = sum(1 for row in rows if index.find(**row))
+    matching = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "patient_index.pickle")
+        start = time.perf_counter()
+        index.save(path)
+        save = time.perf_counter() - start
+        size = os.path.getsize(path)
+        start = time.perf_counter()
+        PatientIndex.load(path)
+        load = time.perf_counter() - start
+
+    print_table("Resultados", ["Paso", "Tiempo", "Detalle"], [
+        ["Construcción", f"{build:.2f}s", f"{n_patients / build:,.0f} pacientes/s"],
+        ["Matching", f"{matching:.2f}s", f"{n_rows / matching:,.0f} filas/s, {matched:,} coincidencias"],
+        ["Guardar", f"{save:.2f}s", f"{size / (1024 * 1024):.1f} MB en disco"],
+        ["Cargar", f"{load:.2f}s", ""],
+    ])
+    success(f"Coincidencias: {matched / n_rows:.0%} de las filas (esperado ~80%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del índice de identidad de pacientes")
+    parser.add_argument("--patients", type=int, default=300_000, help="Pacientes existentes")
+    parser.add_argument("--rows", type=int, default=500_000, help="Filas de origen a cruzar")
+    args = parser.parse_args()
+    run(args.patients, args.rows)
@@ -0,0 +1,75 @@
+"""
+Benchmark de firma de URLs: generate_presigned_url vs generate_presigned_urls.
+
+Compara, para N keys de evidencias de consentimiento:
+- generate_presigned_url por key (botocore, una llamada por key)
+- generate_presigned_urls sin cache (firma SigV4 local en una pasada)
+- generate_presigned_urls con cache caliente (regenerar el mismo reporte)
+
+La firma es local: no requiere red ni credenciales reales.
+
+Uso:
+    python benchmarks/bench_presigned_urls.py [--keys N]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.storage import S3Client, StorageConfig, consent_evidence_key
+from config.utils import generate_id
+from ui import print_header, print_table, info
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(n_keys: int):
+    client = S3Client(StorageConfig(
+        access_key_id="AKIABENCHMARK",
+        secret_access_key="benchmark-secret",
+        region="eu-west-3",
+        bucket_general="bench-general",
+        bucket_worm="bench-worm",
+    ))
+    keys = [consent_evidence_key(generate_id()) for _ in range(n_keys)]
+
+    print_header("BENCHMARK: firma de URLs prefirmadas")
+    info(f"{n_keys} keys en bucket WORM")
+
+    # Inicializar el cliente boto3 fuera de la medición
+    client.generate_presigned_url(keys[0], "worm")
+
+    per_call = timed(lambda: [client.generate_presigned_url(k, "worm") for k in keys])
+    batch_cold = timed(lambda: client.generate_presigned_urls(keys, "worm", use_cache=False))
+    client.presigned_url_cache.clear()
+    client.generate_presigned_urls(keys, "worm")
+    batch_warm = timed(lambda: client.generate_presigned_urls(keys, "worm"))
+
+    rows = []
+    for label, elapsed in [
+        ("generate_presigned_url (por key)", per_call),
+        ("generate_presigned_urls (sin cache)", batch_cold),
+        ("generate_presigned_urls (cache caliente)", batch_warm),
+    ]:
+        rows.append([
+            label,
+            f"{elapsed:.3f}s",
+            f"{n_keys / elapsed:,.0f}",
+            f"{per_call / elapsed:.1f}x",
+        ])
+
+    print_table("Resultados", ["Modo", "Tiempo", "URLs/s", "Speedup"], rows)
+    info(f"Hit ratio de la cache: {client.presigned_url_cache.hit_ratio:.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de URLs prefirmadas")
+    parser.add_argument("--keys", type=int, default=10000, help="Número de keys")
+    args = parser.parse_args()
+    run(args.keys)
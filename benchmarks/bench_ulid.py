@@ -0,0 +1,60 @@
+"""
+Benchmark de generación de IDs: generate_id vs generate_ids.
+
+Compara, para N IDs:
+- generate_id() en un loop (un objeto ULID + str().upper() por ID)
+- generate_ids(N) en una sola llamada
+- generate_ids en lotes de 1000 (uso típico por bloque de filas)
+
+Verifica además que los IDs en lote son ordenados, únicos y que
+python-ulid los parsea igual que los de generate_id.
+
+Uso:
+    python benchmarks/bench_ulid.py [--ids N]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ulid import ULID
+from config.utils import generate_id, generate_ids
+from ui import print_header, print_table, info, success
+
+
+def timed(func) -> tuple[float, list[str]]:
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run(n_ids: int):
+    print_header("BENCHMARK: generación de ULIDs")
+    info(f"{n_ids:,} IDs por caso")
+
+    per_call, _ = timed(lambda: [generate_id() for _ in range(n_ids)])
+    bulk, ids = timed(lambda: generate_ids(n_ids))
+    chunked, _ = timed(lambda: [i for _ in range(0, n_ids, 1000) for i in generate_ids(1000)])
+
+    rows = []
+    for label, elapsed in [
+        ("generate_id() por ID", per_call),
+        (f"generate_ids({n_ids})", bulk),
+        ("generate_ids(1000) por lote", chunked),
+    ]:
+        rows.append([label, f"{elapsed:.3f}s", f"{n_ids / elapsed:,.0f}", f"{per_call / elapsed:.1f}x"])
+    print_table("Resultados", ["Modo", "Tiempo", "IDs/s", "Speedup"], rows)
+
+    assert ids == sorted(ids), "IDs no ordenados"
+    assert len(set(ids)) == len(ids), "IDs duplicados"
+    assert all(len(i) == 26 and str(ULID.from_str(i)).upper() == i for i in ids[:10000])
+    success("IDs ordenados, únicos y compatibles con python-ulid")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de generación de ULIDs")
+    parser.add_argument("--ids", type=int, default=1_000_000, help="Número de IDs")
+    args = parser.parse_args()
+    run(args.ids)
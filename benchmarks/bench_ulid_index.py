@@ -0,0 +1,125 @@
+"""
+Benchmark de localidad de índice: ULIDs de la migración vs de created_at.
+
+Simula N filas históricas (p.ej. schedule_block de 2015-2024) que llegan
+del sistema de origen agrupadas por paciente, y mide en Postgres el
+tiempo de inserción y el tamaño del índice de la PK (tablas TEMP, no
+toca datos) para:
+- generate_ids: IDs con el timestamp de la migración, filas en orden de origen
+- generate_ids_at sin ordenar: IDs de created_at, filas en orden de origen
+- generate_ids_at ordenado: IDs de created_at, filas ordenadas por created_at
+
+Además mide un rango por fecha (un mes) sobre la PK: con IDs de
+created_at se resuelve con un range scan del índice.
+
+Requiere DATABASE_URL en .env.
+
+Uso:
+    python benchmarks/bench_ulid_index.py [--rows N]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from psycopg2.extras import execute_values
+from config.database import get_connection
+from config.utils import generate_id_at, generate_ids, generate_ids_at
+from ui import print_header, print_table, info
+
+BATCH_SIZE = 5000
+
+
+def source_rows(n_rows: int, n_patients: int) -> list[tuple[int, datetime]]:
+    """Filas (patient_legacy_id, created_at) agrupadas por paciente, como un export legacy."""
+    rng = random.Random(42)
+    start = datetime(2015, 1, 1)
+    span = (datetime(2024, 12, 31) - start).total_seconds()
+    rows = [
+        (rng.randrange(n_patients), start + timedelta(seconds=rng.random() * span))
+        for _ in range(n_rows)
+    ]
+    rows.sort(key=lambda row: row[0])
+    return rows
+
+
+def insert_case(cursor, table: str, ids: list[str], rows: list) -> float:
+    """Crea la tabla TEMP e inserta las filas por lotes. Retorna segundos."""
+    cursor.execute(f"""
+        CREATE TEMP TABLE {table} (
+            id CHAR(26) PRIMARY KEY,
+            patient_legacy_id INTEGER NOT NULL,
+            created_at TIMESTAMP NOT NULL
+        )
+    """)
+    values = [(row_id, patient, created_at) for row_id, (patient, created_at) in zip(ids, rows)]
+    start = time.perf_counter()
+    for i in range(0, len(values), BATCH_SIZE):
+        execute_values(
+            cursor,
+            f"INSERT INTO {table} (id, patient_legacy_id, created_at) VALUES %s",
+            values[i:i + BATCH_SIZE],
+            page_size=BATCH_SIZE,
+        )
+    return time.perf_counter() - start
+
+
+def run(n_rows: int, n_patients: int):
+    print_header("BENCHMARK: localidad del índice PK con ULIDs de created_at")
+    info(f"{n_rows:,} filas de {n_patients:,} pacientes (2015-2024), agrupadas por paciente")
+
+    rows = source_rows(n_rows, n_patients)
+    sorted_rows = sorted(rows, key=lambda row: row[1])
+    cases = [
+        ("generate_ids (orden de origen)", "bench_ulid_run", generate_ids(n_rows), rows),
+        ("generate_ids_at (orden de origen)", "bench_ulid_src", generate_ids_at([r[1] for r in rows]), rows),
+        ("generate_ids_at (por created_at)", "bench_ulid_sorted", generate_ids_at([r[1] for r in sorted_rows]), sorted_rows),
+    ]
+
+    # Rango de un mes expresado como rango de IDs (solo válido para IDs de created_at)
+    month_start = datetime(2019, 6, 1, tzinfo=timezone.utc)
+    month_end = datetime(2019, 7, 1, tzinfo=timezone.utc)
+    low = generate_id_at(month_start)[:10] + "0" * 16
+    high = generate_id_at(month_end)[:10] + "0" * 16
+
+    results = []
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for label, table, ids, case_rows in cases:
+            elapsed = insert_case(cursor, table, ids, case_rows)
+            cursor.execute(f"ANALYZE {table}")
+            cursor.execute("SELECT pg_relation_size(%s)", (f"{table}_pkey",))
+            index_size = cursor.fetchone()[0]
+
+            start = time.perf_counter()
+            cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE id >= %s AND id < %s", (low, high))
+            in_range = cursor.fetchone()[0]
+            range_ms = (time.perf_counter() - start) * 1000
+
+            results.append([
+                label,
+                f"{elapsed:.2f}s",
+                f"{n_rows / elapsed:,.0f}",
+                f"{index_size / (1024 * 1024):.1f} MB",
+                f"{in_range:,} en {range_ms:.1f} ms",
+            ])
+        conn.rollback()
+
+    print_table(
+        "Resultados",
+        ["Caso", "Inserción", "Filas/s", "Índice PK", "Rango junio 2019 por PK"],
+        results,
+    )
+    info("El rango por PK solo corresponde a junio 2019 con IDs de created_at")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de localidad del índice PK")
+    parser.add_argument("--rows", type=int, default=500_000, help="Número de filas")
+    parser.add_argument("--patients", type=int, default=20_000, help="Número de pacientes")
+    args = parser.parse_args()
+    run(args.rows, args.patients)
@@ -0,0 +1,168 @@
+"""
+Benchmark de memoria: upload_stream vs upload_bytes.
+
+Mide el pico de memoria (tracemalloc) al subir objetos generados por
+bloques de distintos tamaños:
+- upload_bytes: el contenido se materializa completo (b"".join) antes de subir
+- upload_stream: el generador se consume por partes
+
+Usa el cliente boto3 real y el TransferManager de s3transfer (partes de
+multipart_chunksize, hasta max_concurrency en memoria) contra un
+endpoint S3 simulado, sin red ni credenciales: un handler before-send de
+botocore que consume el body de cada request en bloques de 1 MB, como lo
+haría el socket, y responde como S3 sin guardar nada. (moto no sirve
+aquí: guarda y copia cada parte en memoria y eso tapa lo que retiene el
+cliente.)
+
+Con upload_stream el pico debe quedar plano, sin importar el tamaño del
+objeto: max_concurrency partes en memoria de s3transfer, la que se está
+leyendo y los buffers de botocore. El benchmark falla (exit 1) si supera
+(max_concurrency + 2) x multipart_chunksize.
+
+Uso:
+    python benchmarks/bench_upload_stream.py [tamaños_mb ...]
+"""
+
+import io
+import os
+import sys
+import time
+import threading
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.storage import S3Client, StorageConfig
+from ui import print_header, print_table, info, success, error
+
+BLOCK_SIZE = 1024 * 1024
+
+
+def generate_blocks(size_mb: int):
+    """Genera size_mb bloques de 1 MB (simula un PDF generado al vuelo)."""
+    block = b"x" * BLOCK_SIZE
+    for _ in range(size_mb):
+        yield block
+
+
+class RawResponse(io.BytesIO):
+    """Body de respuesta con la interfaz stream() que espera botocore."""
+
+    def stream(self, **kwargs):
+        contents = self.read()
+        while contents:
+            yield contents
+            contents = self.read()
+
+
+class S3EndpointStub:
+    """
+    Endpoint S3 simulado en el evento before-send de botocore.
+
+    Consume cada body en bloques (sin retenerlo) y responde
+    PutObject, CreateMultipartUpload, UploadPart y CompleteMultipartUpload.
+    """
+
+    def __init__(self, events):
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        for operation, body in (
+            ("PutObject", b""),
+            ("UploadPart", b""),
+            ("CreateMultipartUpload",
+             b"<InitiateMultipartUploadResult><Bucket>bench</Bucket><Key>bench</Key>"
+             b"<UploadId>bench-upload</UploadId></InitiateMultipartUploadResult>"),
+            ("CompleteMultipartUpload",
+             b"<CompleteMultipartUploadResult><Bucket>bench</Bucket><Key>bench</Key>"
+             b'<ETag>"bench"</ETag></CompleteMultipartUploadResult>'),
+        ):
+            events.register(f"before-send.s3.{operation}", self._handler(body))
+
+    def _drain(self, body):
+        if body is None:
+            return
+        if isinstance(body, (bytes, bytearray)):
+            received = len(body)
+        else:
+            received = 0
+            while chunk := body.read(BLOCK_SIZE):
+                received += len(chunk)
+        with self._lock:
+            self.bytes_received += received
+
+    def _handler(self, response_body: bytes):
+        from botocore.awsrequest import AWSResponse
+
+        def handler(request, **kwargs):
+            self._drain(request.body)
+            headers = {"ETag": '"bench"'}
+            return AWSResponse(request.url, 200, headers, RawResponse(response_body))
+        return handler
+
+
+def measure(func) -> tuple[float, float]:
+    """Ejecuta func y retorna (pico de memoria en MB, segundos)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / (1024 * 1024), elapsed
+
+
+def run(sizes_mb: list[int]) -> bool:
+    config = StorageConfig(
+        access_key_id="bench",
+        secret_access_key="bench",
+        region="eu-west-3",
+        bucket_general="bench-general",
+        bucket_worm="bench-worm",
+    )
+    client = S3Client(config)
+    stub = S3EndpointStub(client.client.meta.events)
+    bound_mb = (config.max_concurrency + 2) * config.multipart_chunksize_mb
+
+    print_header("BENCHMARK: upload_stream vs upload_bytes")
+    info(
+        f"Parte multipart: {config.multipart_chunksize_mb} MB, "
+        f"concurrencia: {config.max_concurrency}, "
+        f"límite esperado para upload_stream: {bound_mb} MB"
+    )
+
+    rows = []
+    within_bound = True
+    for size_mb in sizes_mb:
+        bytes_peak, bytes_time = measure(
+            lambda: client.upload_bytes(b"".join(generate_blocks(size_mb)), "bench/object.pdf")
+        )
+        stub.bytes_received = 0
+        stream_peak, stream_time = measure(
+            lambda: client.upload_stream(generate_blocks(size_mb), "bench/object.pdf")
+        )
+        if stub.bytes_received < size_mb * BLOCK_SIZE:
+            error(f"{size_mb} MB: el endpoint recibió solo {stub.bytes_received:,} bytes")
+            within_bound = False
+        within_bound = within_bound and stream_peak <= bound_mb
+        rows.append([
+            f"{size_mb} MB",
+            f"{bytes_peak:.1f} MB",
+            f"{stream_peak:.1f} MB",
+            f"{bytes_time:.3f}s",
+            f"{stream_time:.3f}s",
+        ])
+
+    print_table(
+        "Pico de memoria por tamaño de objeto",
+        ["Objeto", "upload_bytes", "upload_stream", "t bytes", "t stream"],
+        rows,
+    )
+    if within_bound:
+        success(f"upload_stream se mantuvo bajo {bound_mb} MB en todos los tamaños")
+    else:
+        error(f"upload_stream superó {bound_mb} MB o no subió el objeto completo")
+    return within_bound
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [16, 64, 256, 1024]
+    sys.exit(0 if run(sizes) else 1)
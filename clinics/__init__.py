@@ -2,25 +2,30 @@ from .queries import (
     # Organization
     get_organizations,
     get_organization_by_id,
+    get_organizations_by_ids,
     get_organization_by_name,
     # Clinic
     get_clinics,
     get_clinic_by_id,
+    get_clinics_by_ids,
     get_clinic_by_name,
     get_clinics_by_organization,
     # Site
     get_sites,
     get_site_by_id,
+    get_sites_by_ids,
     get_site_by_name,
     get_sites_by_clinic,
     # Company
     get_companies,
     get_company_by_id,
+    get_companies_by_ids,
     get_companies_by_organization,
     get_clinic_issuer,
     # Professional
     get_professionals,
     get_professional_by_id,
+    get_professionals_by_ids,
     get_professionals_by_clinic,
     get_professionals_by_site,
     # Service & Treatment
@@ -29,11 +34,17 @@ from .queries import (
     # Patient
     get_patients_by_clinic,
     get_patient_by_id,
+    get_patients_by_ids,
     get_patient_count_by_clinic,
+    iter_patients_by_clinic,
     # Room & Equipment
     get_rooms_by_site,
     get_equipment_by_site,
     # Utility
+    iter_clinic_rows,
     get_table_count,
+    get_estimated_counts,
+    get_clinic_table_counts,
+    get_clinic_counts,
     get_clinic_summary,
 )
@@ -11,6 +11,7 @@ import yaml
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.database import execute_query, test_connection
+from config.reference_snapshot import SNAPSHOT_FILENAME, write_snapshot
 from ui import (
     console,
     print_header,
@@ -121,8 +122,14 @@ con los IDs de esta clínica para facilitar scripts de migración.
 import os
 import sys
 
+from psycopg2 import sql
+
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from config.database import execute_query
+from config.reference_snapshot import SNAPSHOT_FILENAME, ReferenceSnapshot, load_reference_snapshot
+
+# Máximo de IDs por query en las consultas get_*_by_ids
+BY_IDS_CHUNK_SIZE = 5000
 
 
 # =============================================================================
@@ -146,11 +153,25 @@ SITE_IDS = [
 {sites_list}
 ]
 
+# Servicios, tratamientos, profesionales, métodos de pago y categorías (ver get_reference)
+REFERENCE_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), SNAPSHOT_FILENAME)
+
 
 # =============================================================================
 # FUNCIONES DE CONSULTA
 # =============================================================================
 
+def _fetch_by_ids(query: str, ids) -> dict[str, dict]:
+    """Ejecuta una query con `id = ANY(%s)` por lotes. Retorna dict id -> fila."""
+    unique_ids = list(dict.fromkeys(i for i in ids if i))
+    results = {{}}
+    for start in range(0, len(unique_ids), BY_IDS_CHUNK_SIZE):
+        chunk = unique_ids[start:start + BY_IDS_CHUNK_SIZE]
+        for row in execute_query(query, (chunk, CLINIC_ID)):
+            results[row["id"]] = dict(row)
+    return results
+
+
 def get_clinic() -> dict | None:
     """Obtiene los datos de esta clínica."""
     query = """
@@ -238,6 +259,18 @@ def get_site_by_id(site_id: str) -> dict | None:
     return dict(results[0]) if results else None
 
 
+def get_sites_by_ids(site_ids: list[str]) -> dict[str, dict]:
+    """Obtiene varios sites por ID. Retorna dict id -> site."""
+    query = """
+        SELECT id, clinic_id, name, address, timezone,
+               site_status, record_status, record_metadata,
+               created_at, updated_at
+        FROM site
+        WHERE id = ANY(%s) AND clinic_id = %s
+    """
+    return _fetch_by_ids(query, site_ids)
+
+
 # =============================================================================
 # PROFESSIONALS
 # =============================================================================
@@ -273,6 +306,20 @@ def get_professional_by_id(professional_id: str) -> dict | None:
     return dict(results[0]) if results else None
 
 
+def get_professionals_by_ids(professional_ids: list[str]) -> dict[str, dict]:
+    """Obtiene varios profesionales por ID. Retorna dict id -> profesional."""
+    query = """
+        SELECT id, clinic_id, name, last_name,
+               professional_type_id, specialties, color,
+               email, phone, employment_type,
+               site_ids, user_id, record_status,
+               created_at, updated_at
+        FROM professional
+        WHERE id = ANY(%s) AND clinic_id = %s
+    """
+    return _fetch_by_ids(query, professional_ids)
+
+
 def get_professionals_by_site(site_id: str, active_only: bool = True) -> list[dict]:
     """Obtiene profesionales que atienden en un site específico."""
     query = """
@@ -295,7 +342,7 @@ def get_professionals_by_site(site_id: str, active_only: bool = True) -> list[di
 # =============================================================================
 
 def get_patients(active_only: bool = True, limit: int = 100, offset: int = 0) -> list[dict]:
-    """Obtiene pacientes de esta clínica."""
+    """Obtiene una página de pacientes de esta clínica (para recorrerlos todos: iter_patients)."""
     query = """
         SELECT id, clinic_id, site_id, first_name, last_name,
                id_document_type, id_document_number, id_document_country,
@@ -326,6 +373,77 @@ def get_patient_by_id(patient_id: str) -> dict | None:
     return dict(results[0]) if results else None
 
 
+def get_patients_by_ids(patient_ids: list[str]) -> dict[str, dict]:
+    """Obtiene varios pacientes por ID. Retorna dict id -> paciente."""
+    query = """
+        SELECT id, clinic_id, site_id, first_name, last_name,
+               id_document_type, id_document_number, id_document_country,
+               birthday, gender_code, phones, emails,
+               scheduling_status, record_status, record_metadata,
+               created_by_user_id, created_at, updated_at
+        FROM patient
+        WHERE id = ANY(%s) AND clinic_id = %s
+    """
+    return _fetch_by_ids(query, patient_ids)
+
+
+def _iter_keyset(query: str | sql.Composable, batch_size: int):
+    """Genera las filas de una query con `clinic_id = %s AND id > %s ORDER BY id LIMIT %s`."""
+    last_id = ""
+    while True:
+        rows = execute_query(query, (CLINIC_ID, last_id, batch_size))
+        for row in rows:
+            yield dict(row)
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1]["id"]
+
+
+def iter_patients(active_only: bool = True, batch_size: int = 1000):
+    """
+    Recorre todos los pacientes de esta clínica por lotes, ordenados por id.
+
+    Paginación keyset sobre la PK: cada lote cuesta lo mismo y no se
+    saltan filas aunque cambien los datos durante el recorrido.
+    """
+    status_filter = "AND record_status = 'ACTIVE'" if active_only else ""
+    query = f"""
+        SELECT id, clinic_id, site_id, first_name, last_name,
+               id_document_type, id_document_number, id_document_country,
+               birthday, gender_code, phones, emails,
+               scheduling_status, record_status, record_metadata,
+               created_by_user_id, created_at, updated_at
+        FROM patient
+        WHERE clinic_id = %s
+          AND id > %s
+          {{status_filter}}
+        ORDER BY id
+        LIMIT %s
+    """
+    return _iter_keyset(query, batch_size)
+
+
+def iter_rows(table_name: str, batch_size: int = 1000, columns: list[str] | None = None):
+    """
+    Recorre por keyset (id) las filas de esta clínica en una tabla con clinic_id.
+    Sin columns se leen todas; id se agrega siempre (es la clave de la paginación).
+    """
+    if columns and "id" not in columns:
+        columns = ["id", *columns]
+    query = sql.SQL("""
+        SELECT {{columns}}
+        FROM {{table}}
+        WHERE clinic_id = %s
+          AND id > %s
+        ORDER BY id
+        LIMIT %s
+    """).format(
+        columns=sql.SQL(", ").join(map(sql.Identifier, columns)) if columns else sql.SQL("*"),
+        table=sql.Identifier(table_name),
+    )
+    return _iter_keyset(query, batch_size)
+
+
 def get_patient_by_document(id_document_type: str, id_document_number: str) -> dict | None:
     """Obtiene un paciente por tipo y número de documento."""
     query = """
@@ -428,35 +546,70 @@ def get_equipment_by_site(site_id: str, active_only: bool = True) -> list[dict]:
 
 
 # =============================================================================
-# RESUMEN
+# DATOS DE REFERENCIA (SNAPSHOT)
 # =============================================================================
 
-def get_summary() -> dict:
-    """Obtiene un resumen de esta clínica."""
-    sites = get_sites()
+def get_reference() -> ReferenceSnapshot:
+    """
+    Snapshot de servicios, tratamientos, profesionales, métodos de pago y
+    categorías. Se carga una vez por proceso y se regenera si cambiaron
+    las tablas desde que se generó.
+    """
+    return load_reference_snapshot(REFERENCE_SNAPSHOT_PATH, CLINIC_ID, SITE_IDS)
 
-    rooms_count = 0
-    equipment_count = 0
-    treatments_count = 0
 
-    for site in sites:
-        rooms_count += len(get_rooms_by_site(site["id"]))
-        equipment_count += len(get_equipment_by_site(site["id"]))
-        treatments_count += len(get_treatments_by_site(site["id"]))
+def find_reference(table: str, name: str | None = None, legacy_code=None, **filters) -> dict | None:
+    """
+    Busca en el snapshot por nombre normalizado o código legacy, sin
+    consultar la BD. Ej: find_reference("treatment", name="Limpieza", site_id=SITE_IDS[0])
+    """
+    return get_reference().find(table, name=name, legacy_code=legacy_code, **filters)
+
+
+# =============================================================================
+# RESUMEN
+# =============================================================================
+
+def get_summary() -> dict:
+    """Obtiene un resumen de esta clínica (una sola query agregada)."""
+    query = """
+        WITH active_site AS (
+            SELECT id, name
+            FROM site
+            WHERE clinic_id = %s AND record_status = 'ACTIVE'
+        )
+        SELECT
+            (SELECT COUNT(*) FROM active_site) AS sites_count,
+            (SELECT COALESCE(array_agg(name::text ORDER BY name), ARRAY[]::text[])
+             FROM active_site) AS site_names,
+            (SELECT COUNT(*) FROM professional
+             WHERE clinic_id = %s AND record_status = 'ACTIVE') AS professionals_count,
+            (SELECT COUNT(*) FROM patient
+             WHERE clinic_id = %s AND record_status = 'ACTIVE') AS patients_count,
+            (SELECT COUNT(*) FROM service
+             WHERE clinic_id = %s AND record_status = 'ACTIVE') AS services_count,
+            (SELECT COUNT(*) FROM room x JOIN active_site a ON x.site_id = a.id
+             WHERE x.record_status = 'ACTIVE') AS rooms_count,
+            (SELECT COUNT(*) FROM equipment x JOIN active_site a ON x.site_id = a.id
+             WHERE x.record_status = 'ACTIVE') AS equipment_count,
+            (SELECT COUNT(*) FROM treatment x JOIN active_site a ON x.site_id = a.id
+             WHERE x.record_status = 'ACTIVE') AS treatments_count
+    """
+    counts = execute_query(query, (CLINIC_ID,) * 4)[0]
 
     return {{
         "clinic_id": CLINIC_ID,
         "clinic_name": CLINIC_NAME,
         "organization_id": ORGANIZATION_ID,
         "organization_name": ORGANIZATION_NAME,
-        "sites_count": len(sites),
-        "sites": [s["name"] for s in sites],
-        "professionals_count": len(get_professionals()),
-        "patients_count": get_patient_count(),
-        "services_count": len(get_services()),
-        "rooms_count": rooms_count,
-        "equipment_count": equipment_count,
-        "treatments_count": treatments_count,
+        "sites_count": counts["sites_count"],
+        "sites": list(counts["site_names"]),
+        "professionals_count": counts["professionals_count"],
+        "patients_count": counts["patients_count"],
+        "services_count": counts["services_count"],
+        "rooms_count": counts["rooms_count"],
+        "equipment_count": counts["equipment_count"],
+        "treatments_count": counts["treatments_count"],
     }}
 
 
@@ -575,6 +728,12 @@ def generate_queries(clinic_name: str = None):
 
     success(f"Archivo generado: [cyan]{output_path}[/cyan]")
 
+    step("Generando snapshot de datos de referencia...")
+    snapshot_path = os.path.join(CLINICS_DIR, clinic_name, SNAPSHOT_FILENAME)
+    snapshot = write_snapshot(snapshot_path, clinic_data["id"], [s["id"] for s in sites_data])
+    counts = ", ".join(f"{table}: {len(snapshot.rows(table))}" for table in snapshot.fingerprint)
+    success(f"Snapshot generado: [cyan]{snapshot_path}[/cyan] ({counts})")
+
     # Mostrar resumen
     console.print()
     print_subheader("Resumen de IDs generados")
@@ -587,7 +746,7 @@ def generate_queries(clinic_name: str = None):
 
     console.print()
     info("Uso del archivo generado:")
-    console.print(f"  [dim]from clinics.{clinic_name}.queries import get_clinic, get_sites, get_patients[/dim]")
+    console.print(f"  [dim]from clinics.{clinic_name}.queries import get_clinic, get_sites, get_patients, find_reference[/dim]")
 
 
 if __name__ == "__main__":
@@ -40,6 +40,8 @@ Orden de borrado (respeta foreign keys):
 32. site
 33. clinic
 34. user_organization, company, organization
+35. (opcional) archivos en almacenamiento: fotos de profesionales/equipos
+    y, con --include-worm, evidencias y firmas de consentimientos
 """
 import importlib.util
 import os
@@ -55,6 +57,8 @@ CLINICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
 sys.path.insert(0, os.path.dirname(CLINICS_DIR))
 
 from config.database import get_db_config
+from config.query_cache import reference_cache
+from config.reference_snapshot import reset_reference_snapshots
 
 
 def load_clinic_queries(clinic_folder: str):
@@ -164,8 +168,102 @@ def delete_all_for_sites(cursor, table: str, site_ids: list) -> int:
     return total
 
 
-def clean_all_clinic_data(clinic_folder: str, force: bool = False):
-    """Función principal de limpieza TOTAL"""
+def consent_id_from_key(key: str) -> str | None:
+    """
+    Extrae el consentInstanceId de una key de consentimiento:
+    consents/evidence/{id}.pdf o consents/signatures/{id}/{timestamp}.png
+    """
+    parts = key.split("/")
+    if len(parts) < 3 or parts[0] != "consents":
+        return None
+    if parts[1] == "evidence":
+        return parts[2].rsplit(".", 1)[0]
+    if parts[1] == "signatures":
+        return parts[2]
+    return None
+
+
+def collect_clinic_storage_keys(storage, clinic_id: str, consent_instance_ids: list,
+                                include_worm: bool = False) -> dict:
+    """
+    Obtiene las keys de archivos de la clínica por bucket.
+    Un listado por prefijo, sin head_object por archivo.
+
+    El bucket WORM solo se lista con include_worm: se listan una vez
+    consents/evidence/ y consents/signatures/ y se filtran en memoria por
+    los consentimientos de la clínica.
+    """
+    general = []
+    for prefix in (f"professionals/{clinic_id}/", f"equipment/{clinic_id}/"):
+        general.extend(storage.list_objects(prefix, bucket_type="general"))
+    keys = {"general": general}
+
+    if include_worm:
+        consent_ids = set(consent_instance_ids)
+        keys["worm"] = [
+            key
+            for prefix in ("consents/evidence/", "consents/signatures/")
+            for key in storage.list_objects(prefix, bucket_type="worm")
+            if consent_id_from_key(key) in consent_ids
+        ]
+    return keys
+
+
+def clean_clinic_files(clinic_folder: str, clinic_id: str, consent_instance_ids: list,
+                       include_worm: bool, dry_run: bool, log) -> int:
+    """
+    Borra los archivos subidos de la clínica con delete_objects en lote.
+
+    Returns:
+        Número de objetos borrados
+    """
+    from config.storage import get_storage_client
+    from config.upload_journal import UploadJournal, get_clinic_journal_path
+
+    storage = get_storage_client()
+    keys = collect_clinic_storage_keys(storage, clinic_id, consent_instance_ids, include_worm)
+
+    journal_path = get_clinic_journal_path(clinic_folder)
+    journal = UploadJournal(journal_path) if os.path.exists(journal_path) else None
+
+    total_deleted = 0
+    try:
+        for bucket_type, bucket_keys in keys.items():
+            report = storage.delete_many(
+                bucket_keys,
+                bucket_type=bucket_type,
+                dry_run=dry_run,
+                allow_worm=include_worm,
+            )
+            print(f"    {report.summary()}")
+            log.write(f"[FILES] {report.summary()}\n")
+            for key, err in report.errors.items():
+                log.write(f"[FILES ERROR] {bucket_type}/{key}: {err}\n")
+
+            if report.deleted and journal is not None:
+                journal.forget(bucket_type, report.deleted)
+            total_deleted += len(report.deleted)
+    finally:
+        if journal is not None:
+            journal.close()
+
+    return total_deleted
+
+
+def clean_all_clinic_data(clinic_folder: str, force: bool = False, delete_files: bool = False,
+                          include_worm: bool = False, files_dry_run: bool = False):
+    """
+    Función principal de limpieza TOTAL.
+
+    Args:
+        clinic_folder: Carpeta de la clínica
+        force: Ejecutar sin confirmación
+        delete_files: Borrar también los archivos subidos al almacenamiento
+        include_worm: Incluir el bucket WORM (consentimientos) en el borrado de archivos
+        files_dry_run: Solo contar los archivos que se borrarían (implica delete_files)
+    """
+    delete_files = delete_files or files_dry_run
+
     # Cargar queries de la clínica
     queries = load_clinic_queries(clinic_folder)
     CLINIC_ID = queries.CLINIC_ID
@@ -193,6 +291,10 @@ def clean_all_clinic_data(clinic_folder: str, force: bool = False):
         if confirmation != "BORRAR TODO":
             print("\nOperación cancelada.", flush=True)
             return
+
+        if not delete_files:
+            print("\n¿Borrar también los archivos subidos (fotos, consentimientos)? (s/N):", flush=True)
+            delete_files = input().strip().lower() == "s"
     else:
         print("\n[--force] Ejecutando sin confirmación...", flush=True)
 
@@ -592,6 +694,21 @@ def clean_all_clinic_data(clinic_folder: str, force: bool = False):
             log_delete("organization", count)
         conn.commit()
 
+        # 35. ARCHIVOS (opcional)
+        if delete_files:
+            print("35. Limpiando archivos del almacenamiento...", flush=True)
+            try:
+                count = clean_clinic_files(
+                    clinic_folder, CLINIC_ID, consent_instance_ids,
+                    include_worm=include_worm, dry_run=files_dry_run, log=log,
+                )
+                if not files_dry_run:
+                    log.write(f"[DELETE] archivos: {count}\n")
+            except Exception as e:
+                # La BD ya está limpia: un error de almacenamiento no revierte nada
+                print(f"    [ERROR] No se pudieron borrar los archivos: {e}")
+                log.write(f"[ERROR] archivos: {e}\n")
+
         # Calcular total
         total_deleted = sum(r[1] for r in results if r[1] > 0)
 
@@ -621,6 +738,9 @@ def clean_all_clinic_data(clinic_folder: str, force: bool = False):
         traceback.print_exc()
         raise
     finally:
+        # Se borraron datos de referencia: descartar lo cacheado en este proceso
+        reference_cache.invalidate()
+        reset_reference_snapshots()
         cursor.close()
         conn.close()
         log.close()
@@ -631,5 +751,14 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Limpia todos los datos de la clínica")
     parser.add_argument("clinic_folder", help="Nombre de la carpeta de la clínica")
     parser.add_argument("--force", "-f", action="store_true", help="Ejecutar sin confirmación")
+    parser.add_argument("--delete-files", action="store_true", help="Borrar también los archivos subidos")
+    parser.add_argument("--include-worm", action="store_true", help="Incluir el bucket WORM (consentimientos)")
+    parser.add_argument("--files-dry-run", action="store_true", help="Solo contar los archivos que se borrarían (implica --delete-files)")
     args = parser.parse_args()
-    clean_all_clinic_data(args.clinic_folder, force=args.force)
+    clean_all_clinic_data(
+        args.clinic_folder,
+        force=args.force,
+        delete_files=args.delete_files,
+        include_worm=args.include_worm,
+        files_dry_run=args.files_dry_run,
+    )
@@ -17,7 +17,6 @@ import os
 import sys
 from datetime import datetime
 
-import boto3
 import psycopg2
 import yaml
 from botocore.exceptions import ClientError
@@ -33,6 +32,7 @@ sys.path.insert(0, ROOT_DIR)
 # Cargar variables de entorno
 load_dotenv(os.path.join(ROOT_DIR, ".env"))
 
+from config.aws import get_client
 from config.database import get_db_config
 
 # AWS Cognito config
@@ -254,10 +254,7 @@ def create_cognito_user_main(clinic_folder: str):
 
         # 2. Crear cliente de Cognito
         print("\n--- Conectando a AWS Cognito ---")
-        cognito_client = boto3.client(
-            "cognito-idp",
-            region_name=AWS_REGION
-        )
+        cognito_client = get_client("cognito-idp", region_name=AWS_REGION)
         print("  Conexión establecida")
         log.write("[OK] Conexión a Cognito establecida\n")
 
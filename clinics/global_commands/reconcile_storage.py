@@ -0,0 +1,326 @@
+"""
+Reconcilia el almacenamiento de objetos contra binaries/document_references.
+
+Detecta, en una sola pasada:
+- Faltantes: filas que referencian un objeto que no existe en el bucket
+- Huérfanos: objetos de la clínica que ninguna fila referencia
+- Tamaño distinto: el tamaño registrado en BD no coincide con el del objeto
+
+Las referencias se leen de Postgres con un cursor del servidor (streaming)
+y cada bucket se lista una sola vez por prefijo; ambos lados se cruzan en
+memoria por key (dicts), sin head_object por archivo.
+
+Las columnas de key, tamaño y bucket se detectan en information_schema
+(ver KEY_COLUMNS, SIZE_COLUMNS y BUCKET_COLUMNS).
+
+Salida: clinics/{clinica}/logs/reconcile_storage_{timestamp}.log y .json
+"""
+import importlib.util
+import json
+import os
+import sys
+from datetime import datetime
+from urllib.parse import urlparse
+
+# Paths
+CLINICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+sys.path.insert(0, os.path.dirname(CLINICS_DIR))
+
+from config.database import execute_query, stream_query
+from clinics.global_commands.clean_migrated_data import consent_id_from_key
+
+REFERENCE_TABLES = ["binaries", "document_references"]
+
+# Columnas candidatas, en orden de preferencia
+KEY_COLUMNS = ["storage_key", "object_key", "s3_key", "file_key", "storage_path", "key", "storage_url", "url"]
+SIZE_COLUMNS = ["size_bytes", "file_size", "content_length", "size"]
+BUCKET_COLUMNS = ["bucket_type", "storage_bucket", "bucket"]
+
+
+def load_clinic_queries(clinic_folder: str):
+    """Carga queries.py de la clínica dinámicamente."""
+    clinic_dir = os.path.join(CLINICS_DIR, clinic_folder)
+    queries_path = os.path.join(clinic_dir, "queries.py")
+    spec = importlib.util.spec_from_file_location("queries", queries_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def setup_logging(clinic_folder: str):
+    """Configura el archivo de log."""
+    logs_dir = os.path.join(CLINICS_DIR, clinic_folder, "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_file = os.path.join(logs_dir, f"reconcile_storage_{timestamp}.log")
+    return open(log_file, "w", encoding="utf-8"), log_file
+
+
+def get_table_columns(table: str) -> set:
+    """Columnas de una tabla (vacío si la tabla no existe)."""
+    rows = execute_query("""
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = %s
+    """, (table,))
+    return {row["column_name"] for row in rows}
+
+
+def pick_column(columns: set, candidates: list) -> str | None:
+    """Primera columna candidata que exista en la tabla."""
+    return next((c for c in candidates if c in columns), None)
+
+
+def resolve_bucket_type(value, key: str, bucket_names: dict) -> str:
+    """
+    Determina el tipo de bucket de una referencia.
+
+    Usa el valor de la columna de bucket si existe (tipo o nombre real);
+    si no, las keys de consentimientos van al bucket WORM.
+    """
+    if value:
+        value = str(value).lower()
+        if value in ("general", "worm"):
+            return value
+        if value in bucket_names:
+            return bucket_names[value]
+    return "worm" if key.startswith("consents/") else "general"
+
+
+def normalize_key(raw: str, bucket_names: dict) -> tuple[str, str | None]:
+    """
+    Normaliza el valor guardado en BD a (key, bucket_type o None).
+    Acepta keys planas, s3://bucket/key y URLs https de S3.
+    """
+    raw = raw.strip()
+    if raw.startswith("s3://"):
+        parsed = urlparse(raw)
+        return parsed.path.lstrip("/"), bucket_names.get(parsed.netloc.lower())
+    if raw.startswith(("http://", "https://")):
+        parsed = urlparse(raw)
+        path = parsed.path.lstrip("/")
+        host_bucket = parsed.netloc.split(".s3.")[0].lower()
+        if host_bucket in bucket_names:
+            return path, bucket_names[host_bucket]
+        # Path-style: /{bucket}/{key}
+        first, _, rest = path.partition("/")
+        if first.lower() in bucket_names:
+            return rest, bucket_names[first.lower()]
+        return path, None
+    return raw.lstrip("/"), None
+
+
+def stream_references(clinic_id: str, bucket_names: dict, log):
+    """
+    Genera las referencias a objetos de la clínica:
+    (bucket_type, key, size o None, tabla, id)
+    """
+    for table in REFERENCE_TABLES:
+        columns = get_table_columns(table)
+        if not columns:
+            log.write(f"[SKIP] {table}: tabla no existe\n")
+            continue
+        if "clinic_id" not in columns:
+            log.write(f"[SKIP] {table}: sin columna clinic_id\n")
+            continue
+
+        key_col = pick_column(columns, KEY_COLUMNS)
+        if not key_col:
+            log.write(f"[SKIP] {table}: sin columna de key ({', '.join(KEY_COLUMNS)})\n")
+            continue
+        size_col = pick_column(columns, SIZE_COLUMNS)
+        bucket_col = pick_column(columns, BUCKET_COLUMNS)
+        log.write(f"[COLUMNS] {table}: key={key_col}, size={size_col}, bucket={bucket_col}\n")
+
+        query = f"""
+            SELECT id,
+                   {key_col} AS object_key,
+                   {size_col if size_col else 'NULL'} AS object_size,
+                   {bucket_col if bucket_col else 'NULL'} AS object_bucket
+            FROM {table}
+            WHERE clinic_id = %s
+              AND {key_col} IS NOT NULL
+        """
+        for row in stream_query(query, (clinic_id,)):
+            key, url_bucket = normalize_key(str(row["object_key"]), bucket_names)
+            if not key:
+                continue
+            bucket_type = url_bucket or resolve_bucket_type(row["object_bucket"], key, bucket_names)
+            size = int(row["object_size"]) if row["object_size"] is not None else None
+            yield bucket_type, key, size, table, row["id"]
+
+
+def get_clinic_consent_ids(clinic_id: str) -> set:
+    """IDs de consent_instance de la clínica (sus archivos viven en consents/)."""
+    if not get_table_columns("consent_instance"):
+        return set()
+    rows = execute_query("SELECT id FROM consent_instance WHERE clinic_id = %s", (clinic_id,))
+    return {row["id"] for row in rows}
+
+
+def belongs_to_clinic(key: str, clinic_id: str, consent_ids: set) -> bool:
+    """Indica si un objeto listado pertenece a la clínica (para detectar huérfanos)."""
+    parts = key.split("/")
+    if len(parts) < 3:
+        return False
+    if parts[0] in ("professionals", "equipment"):
+        return parts[1] == clinic_id
+    return consent_id_from_key(key) in consent_ids
+
+
+def listing_prefixes(clinic_id: str, referenced_keys: dict) -> dict:
+    """
+    Prefijos a listar por bucket: los de la clínica más el directorio
+    de cada key referenciada (p.ej. consents/evidence/).
+    """
+    prefixes = {
+        "general": {f"professionals/{clinic_id}/", f"equipment/{clinic_id}/"},
+        "worm": {"consents/evidence/", "consents/signatures/"},
+    }
+    for bucket_type, keys in referenced_keys.items():
+        for key in keys:
+            parts = key.split("/")
+            depth = min(len(parts) - 1, 2)
+            # Keys en la raíz se listan por su propio nombre (no todo el bucket)
+            prefixes[bucket_type].add("/".join(parts[:depth]) + "/" if depth else key)
+
+    # Quitar prefijos contenidos en otros (se listarían dos veces)
+    result = {}
+    for bucket_type, items in prefixes.items():
+        ordered = sorted(items)
+        result[bucket_type] = [
+            p for p in ordered
+            if not any(p != other and p.startswith(other) for other in ordered)
+        ]
+    return result
+
+
+def reconcile(storage, clinic_id: str, log) -> dict:
+    """
+    Cruza referencias de BD con el inventario del bucket.
+
+    Returns:
+        Dict con missing, orphaned, size_mismatch y conteos
+    """
+    bucket_names = {
+        storage.get_bucket("general").lower(): "general",
+        storage.get_bucket("worm").lower(): "worm",
+    }
+
+    # 1. Referencias de BD (streaming) indexadas por bucket y key
+    referenced = {"general": {}, "worm": {}}
+    reference_count = 0
+    for bucket_type, key, size, table, row_id in stream_references(clinic_id, bucket_names, log):
+        referenced[bucket_type][key] = (size, table, row_id)
+        reference_count += 1
+
+    # 2. Inventario del bucket: un listado por prefijo
+    inventory = {"general": {}, "worm": {}}
+    for bucket_type, prefixes in listing_prefixes(clinic_id, referenced).items():
+        for prefix in prefixes:
+            inventory[bucket_type].update(storage.list_objects(prefix, bucket_type=bucket_type))
+
+    # 3. Cruce en memoria
+    consent_ids = get_clinic_consent_ids(clinic_id)
+    missing, orphaned, size_mismatch = [], [], []
+
+    for bucket_type in ("general", "worm"):
+        objects = inventory[bucket_type]
+        refs = referenced[bucket_type]
+
+        for key, (size, table, row_id) in refs.items():
+            obj = objects.get(key)
+            if obj is None:
+                missing.append({"bucket": bucket_type, "key": key, "table": table, "id": row_id})
+            elif size is not None and size != obj.size:
+                size_mismatch.append({
+                    "bucket": bucket_type, "key": key, "table": table, "id": row_id,
+                    "db_size": size, "object_size": obj.size,
+                })
+
+        for key, obj in objects.items():
+            if key not in refs and belongs_to_clinic(key, clinic_id, consent_ids):
+                orphaned.append({"bucket": bucket_type, "key": key, "size": obj.size})
+
+    return {
+        "references": reference_count,
+        "objects": sum(len(v) for v in inventory.values()),
+        "missing": missing,
+        "orphaned": orphaned,
+        "size_mismatch": size_mismatch,
+    }
+
+
+def reconcile_storage(clinic_folder: str):
+    """Función principal de reconciliación."""
+    from config.storage import get_storage_client
+
+    queries = load_clinic_queries(clinic_folder)
+    CLINIC_ID = queries.CLINIC_ID
+
+    print("=" * 60)
+    print("RECONCILIACIÓN DE ALMACENAMIENTO")
+    print("=" * 60)
+    print(f"\nClinic ID: {CLINIC_ID}")
+
+    log, log_file = setup_logging(clinic_folder)
+    try:
+        log.write(f"Reconciliación de almacenamiento - {datetime.now().isoformat()}\n")
+        log.write(f"Clinic ID: {CLINIC_ID}\n")
+        log.write("-" * 60 + "\n\n")
+
+        storage = get_storage_client()
+        started = datetime.now()
+        print("\n--- Cruzando referencias de BD con el bucket ---")
+        result = reconcile(storage, CLINIC_ID, log)
+        elapsed = (datetime.now() - started).total_seconds()
+
+        for item in result["missing"]:
+            log.write(f"[MISSING] {item['bucket']}/{item['key']} ({item['table']} {item['id']})\n")
+        for item in result["orphaned"]:
+            log.write(f"[ORPHAN] {item['bucket']}/{item['key']} ({item['size']} bytes)\n")
+        for item in result["size_mismatch"]:
+            log.write(
+                f"[SIZE] {item['bucket']}/{item['key']}: BD={item['db_size']} "
+                f"bucket={item['object_size']} ({item['table']} {item['id']})\n"
+            )
+
+        json_file = log_file[:-len(".log")] + ".json"
+        with open(json_file, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2, default=str)
+
+        print("\n" + "=" * 60)
+        print("RESUMEN")
+        print("=" * 60)
+        print(f"  Referencias en BD:   {result['references']}")
+        print(f"  Objetos en bucket:   {result['objects']}")
+        print(f"  Faltantes:           {len(result['missing'])}")
+        print(f"  Huérfanos:           {len(result['orphaned'])}")
+        print(f"  Tamaño distinto:     {len(result['size_mismatch'])}")
+        print(f"  Tiempo:              {elapsed:.1f}s")
+        print(f"\nDetalle: {json_file}")
+
+        log.write("\n" + "=" * 60 + "\n")
+        log.write("RESUMEN\n")
+        log.write("=" * 60 + "\n")
+        log.write(f"Referencias: {result['references']}\n")
+        log.write(f"Objetos: {result['objects']}\n")
+        log.write(f"Faltantes: {len(result['missing'])}\n")
+        log.write(f"Huérfanos: {len(result['orphaned'])}\n")
+        log.write(f"Tamaño distinto: {len(result['size_mismatch'])}\n")
+
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        log.write(f"\nERROR GENERAL: {e}\n")
+        raise
+    finally:
+        log.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Reconcilia el bucket con binaries/document_references")
+    parser.add_argument("clinic_folder", help="Nombre de la carpeta de la clínica")
+    args = parser.parse_args()
+    reconcile_storage(args.clinic_folder)
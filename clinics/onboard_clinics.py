@@ -0,0 +1,278 @@
+"""
+Onboarding en lote: valida e inserta todas las clínicas con config.yaml.
+
+Pensado para oleadas de 10-30 clínicas:
+1. Descubre clinics/*/config.yaml
+2. Valida cada configuración y arma su plan de inserción en procesos
+   paralelos (guarda el script SQL de auditoría de cada una)
+3. Omite las clínicas que ya existen en la BD (por nombre)
+4. Inserta las válidas en paralelo, con un máximo de conexiones
+   simultáneas (cada clínica en su propia transacción)
+5. Muestra un reporte consolidado con tiempos por clínica y lo guarda en
+   clinics/logs/onboarding_{timestamp}.json
+
+Uso:
+    python clinics/onboard_clinics.py [--workers N] [--connections N] [--yes] [--dry-run]
+"""
+
+import os
+import sys
+import json
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.database import execute_query, test_connection
+from config.query_cache import reference_cache
+from config.reference_snapshot import reset_reference_snapshots
+from clinics.validate_and_insert import (
+    OnboardingPlan,
+    list_clinics,
+    load_config,
+    validate_config,
+    build_onboarding_plan,
+    plan_to_sql,
+    save_sql_script,
+    insert_plan,
+)
+from ui import (
+    console,
+    print_header,
+    print_table,
+    info,
+    success,
+    warning,
+    error,
+    step,
+    confirm,
+)
+
+CLINICS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_CONNECTIONS = 4
+
+
+@dataclass
+class ClinicOnboarding:
+    """Resultado del onboarding de una clínica."""
+    folder: str
+    clinic_name: str = ""
+    status: str = "pending"  # invalid | exists | ready | inserted | failed
+    errors: list[str] = field(default_factory=list)
+    sites: int = 0
+    clinic_id: str | None = None
+    script_path: str | None = None
+    validate_seconds: float = 0.0
+    insert_seconds: float = 0.0
+    plan: OnboardingPlan | None = None
+
+
+def prepare_clinic(folder: str) -> ClinicOnboarding:
+    """
+    Carga y valida el config.yaml de una clínica, arma el plan y guarda el
+    script SQL. Se ejecuta en un proceso del pool (no usa la BD).
+    """
+    result = ClinicOnboarding(folder=folder)
+    start = time.perf_counter()
+    try:
+        config = load_config(folder)
+        if not config:
+            result.status = "invalid"
+            result.errors = ["El archivo de configuración está vacío"]
+            return result
+
+        result.clinic_name = config.get("clinic", {}).get("name", "")
+        is_valid, errors = validate_config(config)
+        if not is_valid:
+            result.status = "invalid"
+            result.errors = errors
+            return result
+
+        plan = build_onboarding_plan(config)
+        result.script_path = save_sql_script(folder, plan_to_sql(plan))
+        result.plan = plan
+        result.clinic_id = plan.clinic_id
+        result.sites = len(config["sites"])
+        result.status = "ready"
+    except Exception as e:
+        # Un config malformado (p.ej. sites: ["x"]) no debe cortar el lote
+        result.status = "invalid"
+        result.errors = [f"{type(e).__name__}: {e}"]
+    finally:
+        result.validate_seconds = time.perf_counter() - start
+    return result
+
+
+def mark_duplicates(results: list[ClinicOnboarding]):
+    """Marca como inválidas las clínicas cuyo nombre ya usa otra carpeta del lote."""
+    seen = {}
+    for result in results:
+        if result.status != "ready":
+            continue
+        name = result.clinic_name.lower()
+        if name in seen:
+            result.status = "invalid"
+            result.errors = [f"clinic.name duplicado (también en {seen[name]})"]
+            result.plan = None
+        else:
+            seen[name] = result.folder
+
+
+def mark_existing(results: list[ClinicOnboarding]):
+    """Marca como 'exists' las clínicas listas cuyo nombre ya está en la BD (una query)."""
+    ready = [r for r in results if r.status == "ready"]
+    if not ready:
+        return
+    rows = execute_query(
+        "SELECT id, lower(name) AS name FROM clinic WHERE lower(name) = ANY(%s) AND record_status = 'ACTIVE'",
+        ([r.clinic_name.lower() for r in ready],),
+    )
+    existing = {row["name"]: row["id"] for row in rows}
+    for result in ready:
+        clinic_id = existing.get(result.clinic_name.lower())
+        if clinic_id:
+            result.status = "exists"
+            result.clinic_id = clinic_id
+            result.plan = None
+
+
+def insert_clinic(result: ClinicOnboarding) -> ClinicOnboarding:
+    """Inserta el plan de una clínica en su propia transacción."""
+    start = time.perf_counter()
+    try:
+        insert_plan(result.plan)
+        result.status = "inserted"
+    except Exception as e:
+        result.status = "failed"
+        result.errors = [str(e)]
+    finally:
+        result.insert_seconds = time.perf_counter() - start
+    return result
+
+
+def save_report(results: list[ClinicOnboarding], total_seconds: float) -> str:
+    """Guarda el reporte consolidado en clinics/logs/. Retorna la ruta."""
+    logs_dir = os.path.join(CLINICS_DIR, "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    path = os.path.join(logs_dir, f"onboarding_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    clinics = []
+    for result in results:
+        data = asdict(result)
+        data.pop("plan")
+        clinics.append(data)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"total_seconds": round(total_seconds, 3), "clinics": clinics}, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def print_report(results: list[ClinicOnboarding]):
+    """Tabla consolidada con estado y tiempos por clínica."""
+    labels = {
+        "invalid": "[red]inválida[/red]",
+        "exists": "[yellow]ya existe[/yellow]",
+        "ready": "[cyan]lista[/cyan]",
+        "inserted": "[green]insertada[/green]",
+        "failed": "[red]error[/red]",
+    }
+    rows = [
+        [
+            r.folder,
+            labels.get(r.status, r.status),
+            str(r.sites or "-"),
+            f"{r.validate_seconds * 1000:.0f} ms",
+            f"{r.insert_seconds * 1000:.0f} ms" if r.insert_seconds else "-",
+            r.clinic_id or "-",
+        ]
+        for r in results
+    ]
+    print_table("Onboarding por clínica", ["Clínica", "Estado", "Sites", "Validación", "Inserción", "Clinic ID"], rows)
+
+    for r in results:
+        if r.errors:
+            console.print(f"\n[red]{r.folder}[/red]")
+            for err in r.errors:
+                console.print(f"  [red]•[/red] {err}")
+
+
+def onboard_clinics(max_workers: int | None = None, max_connections: int = DEFAULT_CONNECTIONS,
+                    assume_yes: bool = False, dry_run: bool = False) -> list[ClinicOnboarding]:
+    """
+    Flujo principal del onboarding en lote.
+
+    Args:
+        max_workers: Procesos para validar (default: CPUs)
+        max_connections: Conexiones simultáneas a la BD al insertar
+        assume_yes: No pedir confirmación antes de insertar
+        dry_run: Solo validar y generar los scripts SQL
+    """
+    print_header("ONBOARDING EN LOTE")
+    total_start = time.perf_counter()
+
+    folders = list_clinics()
+    if not folders:
+        warning("No hay clínicas configuradas")
+        return []
+    info(f"Clínicas con config.yaml: {len(folders)}")
+
+    step("Validando configuraciones...")
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(prepare_clinic, folders))
+    mark_duplicates(results)
+
+    ready_count = sum(1 for r in results if r.status == "ready")
+    invalid_count = sum(1 for r in results if r.status == "invalid")
+    success(f"Válidas: {ready_count}")
+    if invalid_count:
+        warning(f"Inválidas: {invalid_count}")
+
+    if not dry_run and ready_count:
+        step("Verificando conexión a la base de datos...")
+        if not test_connection():
+            error("No se pudo conectar a la base de datos")
+            info("Verifique DATABASE_URL en .env")
+            dry_run = True
+        else:
+            mark_existing(results)
+
+    to_insert = [r for r in results if r.status == "ready"]
+    if not dry_run and to_insert:
+        console.print()
+        if assume_yes or confirm(f"¿Insertar {len(to_insert)} clínica(s) en la base de datos?"):
+            step(f"Insertando {len(to_insert)} clínica(s) con hasta {max_connections} conexiones...")
+            with ThreadPoolExecutor(max_workers=max_connections) as pool:
+                list(pool.map(insert_clinic, to_insert))
+            reference_cache.invalidate(
+                "organization", "company", "clinic", "site", "site_billing_line", "payment_method",
+            )
+            reset_reference_snapshots()
+        else:
+            info("Inserción cancelada (los scripts SQL se guardaron en scripts/ de cada clínica)")
+
+    total_seconds = time.perf_counter() - total_start
+    console.print()
+    print_report(results)
+    report_path = save_report(results, total_seconds)
+
+    console.print()
+    inserted = sum(1 for r in results if r.status == "inserted")
+    failed = sum(1 for r in results if r.status == "failed")
+    success(f"Insertadas: {inserted}/{len(results)} en {total_seconds:.1f}s")
+    if failed:
+        error(f"Con error: {failed}")
+    info(f"Reporte guardado en: [cyan]{report_path}[/cyan]")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Valida e inserta todas las clínicas con config.yaml")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos para validar (default: CPUs)")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS,
+                        help=f"Conexiones simultáneas al insertar (default: {DEFAULT_CONNECTIONS})")
+    parser.add_argument("--yes", "-y", action="store_true", help="Insertar sin confirmación")
+    parser.add_argument("--dry-run", action="store_true", help="Solo validar y generar los scripts SQL")
+    args = parser.parse_args()
+    onboard_clinics(args.workers, args.connections, assume_yes=args.yes, dry_run=args.dry_run)
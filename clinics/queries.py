@@ -1,19 +1,46 @@
 """
 Funciones de consulta para obtener datos de clínicas desde la base de datos.
 Utiliza la conexión configurada en DATABASE_URL.
+
+Las queries de datos de referencia (organizaciones, sites, servicios,
+tratamientos, salas y equipos) se cachean en memoria: ver
+config/query_cache.py.
 """
 
 import os
 import sys
 
+from psycopg2 import sql
+
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.database import execute_query
+from config.query_cache import reference_cache
+
+# Máximo de IDs por query en las consultas get_*_by_ids
+BY_IDS_CHUNK_SIZE = 5000
+
+
+def _fetch_by_ids(query: str, ids) -> dict[str, dict]:
+    """
+    Ejecuta una query con `id = ANY(%s)` por lotes de BY_IDS_CHUNK_SIZE IDs.
+
+    Returns:
+        Dict id -> fila (los IDs que no existen no aparecen)
+    """
+    unique_ids = list(dict.fromkeys(i for i in ids if i))
+    results = {}
+    for start in range(0, len(unique_ids), BY_IDS_CHUNK_SIZE):
+        chunk = unique_ids[start:start + BY_IDS_CHUNK_SIZE]
+        for row in execute_query(query, (chunk,)):
+            results[row["id"]] = row
+    return results
 
 
 # =============================================================================
 # ORGANIZATION
 # =============================================================================
 
+@reference_cache.cached("organization")
 def get_organizations(active_only: bool = True) -> list[dict]:
     """Obtiene todas las organizaciones."""
     query = """
@@ -27,6 +54,7 @@ def get_organizations(active_only: bool = True) -> list[dict]:
     return execute_query(query, (active_only,))
 
 
+@reference_cache.cached("organization")
 def get_organization_by_id(organization_id: str) -> dict | None:
     """Obtiene una organización por su ID."""
     query = """
@@ -40,6 +68,19 @@ def get_organization_by_id(organization_id: str) -> dict | None:
     return results[0] if results else None
 
 
+def get_organizations_by_ids(organization_ids: list[str]) -> dict[str, dict]:
+    """Obtiene varias organizaciones por ID. Retorna dict id -> organización."""
+    query = """
+        SELECT id, name, legal_name, country, timezone,
+               plan_type, organization_status, record_status,
+               created_at, updated_at
+        FROM organization
+        WHERE id = ANY(%s)
+    """
+    return _fetch_by_ids(query, organization_ids)
+
+
+@reference_cache.cached("organization")
 def get_organization_by_name(name: str) -> dict | None:
     """Obtiene una organización por su nombre."""
     query = """
@@ -91,6 +132,22 @@ def get_clinic_by_id(clinic_id: str) -> dict | None:
     return results[0] if results else None
 
 
+def get_clinics_by_ids(clinic_ids: list[str]) -> dict[str, dict]:
+    """Obtiene varias clínicas por ID. Retorna dict id -> clínica."""
+    query = """
+        SELECT c.id, c.organization_id, c.name, c.description,
+               c.phone, c.email, c.country, c.timezone,
+               c.default_currency, c.default_issuer_company_id,
+               c.data_sharing_policy, c.clinic_status, c.record_status,
+               c.created_at, c.updated_at,
+               o.name as organization_name
+        FROM clinic c
+        JOIN organization o ON c.organization_id = o.id
+        WHERE c.id = ANY(%s)
+    """
+    return _fetch_by_ids(query, clinic_ids)
+
+
 def get_clinic_by_name(name: str) -> dict | None:
     """Obtiene una clínica por su nombre."""
     query = """
@@ -128,6 +185,7 @@ def get_clinics_by_organization(organization_id: str, active_only: bool = True)
 # SITE
 # =============================================================================
 
+@reference_cache.cached("site", "clinic")
 def get_sites(active_only: bool = True) -> list[dict]:
     """Obtiene todos los sites."""
     query = """
@@ -143,6 +201,7 @@ def get_sites(active_only: bool = True) -> list[dict]:
     return execute_query(query, (active_only,))
 
 
+@reference_cache.cached("site", "clinic")
 def get_site_by_id(site_id: str) -> dict | None:
     """Obtiene un site por su ID."""
     query = """
@@ -158,6 +217,21 @@ def get_site_by_id(site_id: str) -> dict | None:
     return results[0] if results else None
 
 
+def get_sites_by_ids(site_ids: list[str]) -> dict[str, dict]:
+    """Obtiene varios sites por ID. Retorna dict id -> site."""
+    query = """
+        SELECT s.id, s.clinic_id, s.name, s.address, s.timezone,
+               s.site_status, s.record_status, s.record_metadata,
+               s.created_at, s.updated_at,
+               c.name as clinic_name
+        FROM site s
+        JOIN clinic c ON s.clinic_id = c.id
+        WHERE s.id = ANY(%s)
+    """
+    return _fetch_by_ids(query, site_ids)
+
+
+@reference_cache.cached("site")
 def get_site_by_name(clinic_id: str, name: str) -> dict | None:
     """Obtiene un site por nombre dentro de una clínica."""
     query = """
@@ -173,6 +247,7 @@ def get_site_by_name(clinic_id: str, name: str) -> dict | None:
     return results[0] if results else None
 
 
+@reference_cache.cached("site")
 def get_sites_by_clinic(clinic_id: str, active_only: bool = True) -> list[dict]:
     """Obtiene todos los sites de una clínica."""
     query = """
@@ -221,6 +296,19 @@ def get_company_by_id(company_id: str) -> dict | None:
     return results[0] if results else None
 
 
+def get_companies_by_ids(company_ids: list[str]) -> dict[str, dict]:
+    """Obtiene varias companies por ID. Retorna dict id -> company."""
+    query = """
+        SELECT id, organization_id, name, legal_name,
+               tax_id_type, tax_id_number, address_fiscal,
+               country, type, record_status,
+               created_at, updated_at
+        FROM company
+        WHERE id = ANY(%s)
+    """
+    return _fetch_by_ids(query, company_ids)
+
+
 def get_companies_by_organization(organization_id: str, active_only: bool = True) -> list[dict]:
     """Obtiene todas las companies de una organización."""
     query = """
@@ -289,6 +377,20 @@ def get_professional_by_id(professional_id: str) -> dict | None:
     return results[0] if results else None
 
 
+def get_professionals_by_ids(professional_ids: list[str]) -> dict[str, dict]:
+    """Obtiene varios profesionales por ID. Retorna dict id -> profesional."""
+    query = """
+        SELECT id, clinic_id, name, last_name,
+               professional_type_id, specialties, color,
+               email, phone, employment_type,
+               site_ids, user_id, record_status,
+               created_at, updated_at
+        FROM professional
+        WHERE id = ANY(%s)
+    """
+    return _fetch_by_ids(query, professional_ids)
+
+
 def get_professionals_by_clinic(clinic_id: str, active_only: bool = True) -> list[dict]:
     """Obtiene todos los profesionales de una clínica."""
     query = """
@@ -325,6 +427,7 @@ def get_professionals_by_site(site_id: str, active_only: bool = True) -> list[di
 # SERVICE & TREATMENT
 # =============================================================================
 
+@reference_cache.cached("service")
 def get_services_by_clinic(clinic_id: str, active_only: bool = True) -> list[dict]:
     """Obtiene todos los servicios de una clínica."""
     query = """
@@ -338,6 +441,7 @@ def get_services_by_clinic(clinic_id: str, active_only: bool = True) -> list[dic
     return execute_query(query, (clinic_id, active_only))
 
 
+@reference_cache.cached("treatment")
 def get_treatments_by_site(site_id: str, active_only: bool = True) -> list[dict]:
     """Obtiene todos los tratamientos de un site."""
     query = """
@@ -391,6 +495,45 @@ def get_patient_by_id(patient_id: str) -> dict | None:
     return results[0] if results else None
 
 
+def get_patients_by_ids(patient_ids: list[str]) -> dict[str, dict]:
+    """Obtiene varios pacientes por ID. Retorna dict id -> paciente."""
+    query = """
+        SELECT id, clinic_id, site_id, first_name, last_name,
+               id_document_type, id_document_number, id_document_country,
+               birthday, gender_code, phones, emails,
+               scheduling_status, record_status, record_metadata,
+               created_by_user_id, created_at, updated_at
+        FROM patient
+        WHERE id = ANY(%s)
+    """
+    return _fetch_by_ids(query, patient_ids)
+
+
+def iter_patients_by_clinic(clinic_id: str, active_only: bool = True, batch_size: int = 1000):
+    """
+    Recorre todos los pacientes de una clínica por lotes, ordenados por id.
+
+    Usa paginación keyset (id > último id del lote anterior) sobre la PK:
+    cada lote cuesta lo mismo sin importar cuántos se hayan leído, y no se
+    saltan filas si se insertan o borran pacientes durante el recorrido.
+    """
+    status_filter = "AND record_status = 'ACTIVE'" if active_only else ""
+    query = f"""
+        SELECT id, clinic_id, site_id, first_name, last_name,
+               id_document_type, id_document_number, id_document_country,
+               birthday, gender_code, phones, emails,
+               scheduling_status, record_status, record_metadata,
+               created_by_user_id, created_at, updated_at
+        FROM patient
+        WHERE clinic_id = %s
+          AND id > %s
+          {status_filter}
+        ORDER BY id
+        LIMIT %s
+    """
+    return _iter_keyset(query, (clinic_id,), batch_size)
+
+
 def get_patient_count_by_clinic(clinic_id: str, active_only: bool = True) -> int:
     """Obtiene el conteo de pacientes de una clínica."""
     query = """
@@ -407,6 +550,7 @@ def get_patient_count_by_clinic(clinic_id: str, active_only: bool = True) -> int
 # ROOM & EQUIPMENT
 # =============================================================================
 
+@reference_cache.cached("room")
 def get_rooms_by_site(site_id: str, active_only: bool = True) -> list[dict]:
     """Obtiene todas las salas de un site."""
     query = """
@@ -423,6 +567,7 @@ def get_rooms_by_site(site_id: str, active_only: bool = True) -> list[dict]:
     return execute_query(query, (site_id, active_only))
 
 
+@reference_cache.cached("equipment")
 def get_equipment_by_site(site_id: str, active_only: bool = True) -> list[dict]:
     """Obtiene todo el equipamiento de un site."""
     query = """
@@ -443,41 +588,205 @@ def get_equipment_by_site(site_id: str, active_only: bool = True) -> list[dict]:
 # UTILITY FUNCTIONS
 # =============================================================================
 
+def _iter_keyset(query: str | sql.Composable, params: tuple, batch_size: int):
+    """
+    Genera las filas de una query paginada por keyset.
+
+    La query debe filtrar `id > %s`, ordenar por id y terminar en
+    `LIMIT %s`; recibe params + (último id, batch_size).
+    """
+    last_id = ""
+    while True:
+        rows = execute_query(query, params + (last_id, batch_size))
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1]["id"]
+
+
+def iter_clinic_rows(table_name: str, clinic_id: str, batch_size: int = 1000,
+                     columns: list[str] | None = None):
+    """
+    Recorre por keyset (id) todas las filas de una tabla con clinic_id
+    (schedule_block, billing_document, clinical_note...).
+
+    La tabla y las columnas se citan como identificadores (sql.Identifier);
+    sin columns se leen todas. id se agrega siempre a columns: es la
+    clave de la paginación.
+    """
+    if columns and "id" not in columns:
+        columns = ["id", *columns]
+    query = sql.SQL("""
+        SELECT {columns}
+        FROM {table}
+        WHERE clinic_id = %s
+          AND id > %s
+        ORDER BY id
+        LIMIT %s
+    """).format(
+        columns=sql.SQL(", ").join(map(sql.Identifier, columns)) if columns else sql.SQL("*"),
+        table=sql.Identifier(table_name),
+    )
+    return _iter_keyset(query, (clinic_id,), batch_size)
+
+
 def get_table_count(table_name: str) -> int:
-    """Obtiene el conteo de registros de una tabla."""
+    """Obtiene el conteo exacto de registros de una tabla (COUNT(*), recorre la tabla)."""
     query = f"SELECT COUNT(*) as count FROM {table_name}"
     results = execute_query(query)
     return results[0]["count"] if results else 0
 
 
+def get_estimated_counts(table_names: list[str] | None = None) -> dict[str, int]:
+    """
+    Conteo estimado de todas las tablas del schema (o de table_names) en
+    una sola query, sin recorrer las tablas.
+
+    Usa pg_class.reltuples (actualizado por ANALYZE/autovacuum) y, si la
+    tabla nunca se analizó, n_live_tup de pg_stat_user_tables. Sirve para
+    pantallas de estado; para cifras exactas usar get_clinic_table_counts.
+    """
+    query = """
+        SELECT c.relname AS table_name,
+               CASE WHEN c.reltuples >= 0 THEN c.reltuples::bigint
+                    ELSE COALESCE(s.n_live_tup, 0) END AS count
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+        WHERE c.relkind IN ('r', 'p')
+          AND n.nspname = current_schema()
+    """
+    params = None
+    if table_names is not None:
+        query += "  AND c.relname = ANY(%s)\n"
+        params = (list(table_names),)
+    query += "ORDER BY c.relname"
+    return {row["table_name"]: row["count"] for row in execute_query(query, params)}
+
+
+def get_clinic_table_counts(clinic_id: str, table_names: list[str], column: str = "clinic_id") -> dict[str, int]:
+    """
+    Conteo exacto de registros de la clínica en varias tablas, en una sola
+    sentencia (un COUNT(*) por tabla unidos con UNION ALL).
+
+    Las tablas que no existen o no tienen la columna `column` se omiten
+    del resultado.
+
+    Returns:
+        Dict tabla -> conteo, en el orden de table_names
+    """
+    existing = {
+        row["table_name"]
+        for row in execute_query("""
+            SELECT table_name
+            FROM information_schema.columns
+            WHERE table_schema = current_schema()
+              AND column_name = %s
+              AND table_name = ANY(%s)
+        """, (column, list(table_names)))
+    }
+    tables = [t for t in dict.fromkeys(table_names) if t in existing]
+    if not tables:
+        return {}
+
+    query = sql.SQL(" UNION ALL ").join(
+        sql.SQL("SELECT {name} AS table_name, COUNT(*) AS count FROM {table} WHERE {column} = {value}").format(
+            name=sql.Literal(table),
+            table=sql.Identifier(table),
+            column=sql.Identifier(column),
+            value=sql.Placeholder(),
+        )
+        for table in tables
+    )
+    counts = {row["table_name"]: row["count"] for row in execute_query(query, (clinic_id,) * len(tables))}
+    return {table: counts[table] for table in tables}
+
+
+CLINIC_COUNTS_QUERY = """
+    WITH active_site AS (
+        SELECT id, clinic_id, name
+        FROM site
+        WHERE record_status = 'ACTIVE'
+    )
+    SELECT c.id AS clinic_id,
+           c.name AS clinic_name,
+           COALESCE(s.sites_count, 0) AS sites_count,
+           COALESCE(s.site_names, ARRAY[]::text[]) AS site_names,
+           COALESCE(p.professionals_count, 0) AS professionals_count,
+           COALESCE(sv.services_count, 0) AS services_count,
+           COALESCE(pt.patients_count, 0) AS patients_count,
+           COALESCE(r.rooms_count, 0) AS rooms_count,
+           COALESCE(e.equipment_count, 0) AS equipment_count,
+           COALESCE(t.treatments_count, 0) AS treatments_count
+    FROM clinic c
+    LEFT JOIN (
+        SELECT clinic_id, COUNT(*) AS sites_count,
+               array_agg(name::text ORDER BY name) AS site_names
+        FROM active_site GROUP BY clinic_id
+    ) s ON s.clinic_id = c.id
+    LEFT JOIN (
+        SELECT clinic_id, COUNT(*) AS professionals_count
+        FROM professional WHERE record_status = 'ACTIVE' GROUP BY clinic_id
+    ) p ON p.clinic_id = c.id
+    LEFT JOIN (
+        SELECT clinic_id, COUNT(*) AS services_count
+        FROM service WHERE record_status = 'ACTIVE' GROUP BY clinic_id
+    ) sv ON sv.clinic_id = c.id
+    LEFT JOIN (
+        SELECT clinic_id, COUNT(*) AS patients_count
+        FROM patient WHERE record_status = 'ACTIVE' GROUP BY clinic_id
+    ) pt ON pt.clinic_id = c.id
+    LEFT JOIN (
+        SELECT a.clinic_id, COUNT(*) AS rooms_count
+        FROM room x JOIN active_site a ON x.site_id = a.id
+        WHERE x.record_status = 'ACTIVE' GROUP BY a.clinic_id
+    ) r ON r.clinic_id = c.id
+    LEFT JOIN (
+        SELECT a.clinic_id, COUNT(*) AS equipment_count
+        FROM equipment x JOIN active_site a ON x.site_id = a.id
+        WHERE x.record_status = 'ACTIVE' GROUP BY a.clinic_id
+    ) e ON e.clinic_id = c.id
+    LEFT JOIN (
+        SELECT a.clinic_id, COUNT(*) AS treatments_count
+        FROM treatment x JOIN active_site a ON x.site_id = a.id
+        WHERE x.record_status = 'ACTIVE' GROUP BY a.clinic_id
+    ) t ON t.clinic_id = c.id
+"""
+
+
+def get_clinic_counts(clinic_id: str | None = None) -> list[dict]:
+    """
+    Obtiene los conteos (sites, profesionales, servicios, pacientes, salas,
+    equipos y tratamientos activos) de una clínica, o de todas si no se
+    indica clinic_id, en una sola query agregada.
+
+    Salas, equipos y tratamientos se cuentan solo en sites activos.
+    """
+    if clinic_id is None:
+        return execute_query(CLINIC_COUNTS_QUERY + "ORDER BY c.name")
+    # Filtro por igualdad: Postgres lo propaga a cada subquery agrupada
+    return execute_query(CLINIC_COUNTS_QUERY + "WHERE c.id = %s", (clinic_id,))
+
+
 def get_clinic_summary(clinic_id: str) -> dict:
-    """Obtiene un resumen de una clínica con conteos."""
+    """Obtiene un resumen de una clínica con conteos (query agregada, sin N+1)."""
     clinic = get_clinic_by_id(clinic_id)
     if not clinic:
         return None
 
+    counts = get_clinic_counts(clinic_id)[0]
     sites = get_sites_by_clinic(clinic_id)
-    site_ids = [s["id"] for s in sites]
-
-    rooms_count = 0
-    equipment_count = 0
-    treatments_count = 0
-
-    for site_id in site_ids:
-        rooms_count += len(get_rooms_by_site(site_id))
-        equipment_count += len(get_equipment_by_site(site_id))
-        treatments_count += len(get_treatments_by_site(site_id))
 
     return {
         "clinic": clinic,
-        "sites_count": len(sites),
+        "sites_count": counts["sites_count"],
         "sites": sites,
-        "professionals_count": len(get_professionals_by_clinic(clinic_id)),
-        "services_count": len(get_services_by_clinic(clinic_id)),
-        "patients_count": get_patient_count_by_clinic(clinic_id),
-        "rooms_count": rooms_count,
-        "equipment_count": equipment_count,
-        "treatments_count": treatments_count,
+        "professionals_count": counts["professionals_count"],
+        "services_count": counts["services_count"],
+        "patients_count": counts["patients_count"],
+        "rooms_count": counts["rooms_count"],
+        "equipment_count": counts["equipment_count"],
+        "treatments_count": counts["treatments_count"],
     }
 
 
@@ -16,6 +16,7 @@ from rich.panel import Panel
 from rich.text import Text
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.query_cache import reference_cache
 from ui import (
     console,
     print_header,
@@ -209,6 +210,13 @@ def group_commands_by_category(commands: list[dict]) -> dict[str, list[dict]]:
     return groups
 
 
+def print_cache_stats():
+    """Muestra el uso del caché de datos de referencia, si hubo consultas."""
+    stats = reference_cache.stats()
+    if stats.lookups:
+        info(f"Caché de referencia: {stats.summary()}")
+
+
 def run_script(clinic_folder: str, command: dict) -> bool:
     """Ejecuta un script de comando."""
     script_path = command.get("script", "")
@@ -371,6 +379,7 @@ def run_autopilot(clinic: dict):
 
     statuses = {}  # índice -> "pending" | "running" | "completed" | "failed"
     failed_commands = []
+    reference_cache.reset_stats()
 
     console.print()
 
@@ -433,6 +442,7 @@ def run_autopilot(clinic: dict):
     console.print(f"[green]✓ Completados: {completed}[/green]")
     console.print(f"[red]✗ Fallidos: {failed}[/red]")
     console.print(f"[dim]○ Pendientes: {pending}[/dim]")
+    print_cache_stats()
 
     if failed_commands:
         console.print()
@@ -551,6 +561,7 @@ def run_clinic_commands():
             step(f"Ejecutando: [cyan]{command['name']}[/cyan]")
             console.print()
 
+            reference_cache.reset_stats()
             try:
                 run_script(clinic["folder"], command)
             except KeyboardInterrupt:
@@ -559,6 +570,7 @@ def run_clinic_commands():
             except Exception as e:
                 error(f"Error: {e}")
 
+            print_cache_stats()
             console.print()
             ask("Presiona Enter para continuar")
 
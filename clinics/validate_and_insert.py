@@ -1,14 +1,17 @@
 import os
 import sys
 import json
+from dataclasses import dataclass, field
 from datetime import datetime
 
-from ulid import ULID
-
 import yaml
+from psycopg2.extras import Json, execute_values
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.database import execute_script, test_connection
+from config.database import get_cursor, test_connection
+from config.utils import generate_ids
+from config.query_cache import reference_cache
+from config.reference_snapshot import reset_reference_snapshots
 from ui import (
     console,
     print_header,
@@ -202,190 +205,303 @@ def print_config(config: dict):
             console.print(f"  [cyan]•[/cyan] {pm.get('name', '-')} ({pm.get('payment_method_type', '-')})")
 
 
-def generate_sql(config: dict) -> str:
-    """Genera el SQL de inserción para la configuración."""
-    now = datetime.utcnow().isoformat()
+# Metadata de todos los registros creados por la migración
+MIGRATION_METADATA = {"source": "migration"}
+
+
+@dataclass
+class InsertBatch:
+    """Filas a insertar en una tabla con un único INSERT multi-fila."""
+    table: str
+    columns: list[str]
+    rows: list[tuple]
+    comment: str
+    returning: str = "id, name"
+
 
-    org_id = str(ULID()).upper()
-    company_id = str(ULID()).upper()
-    clinic_id = str(ULID()).upper()
+@dataclass
+class OnboardingPlan:
+    """Inserciones de una clínica, en orden de foreign keys, con sus IDs ya asignados."""
+    organization_id: str
+    company_id: str
+    clinic_id: str
+    batches: list[InsertBatch] = field(default_factory=list)
+
+
+def optional(value):
+    """
+    Strings vacíos como NULL. Se aplica al armar el plan, así el script
+    de auditoría (sql_value) y la inserción parametrizada reciben el mismo None.
+    """
+    if isinstance(value, str) and not value.strip():
+        return None
+    return value
+
+
+def build_onboarding_plan(config: dict) -> OnboardingPlan:
+    """
+    Arma las filas a insertar para la configuración. Los IDs (ULID) se
+    asignan aquí, así el script SQL de auditoría y la inserción usan los
+    mismos.
+    """
+    now = datetime.utcnow()
 
     org = config["organization"]
     comp = config["company"]
     clinic = config["clinic"]
     sites = config["sites"]
+    payment_methods = config.get("payment_methods", [])
 
-    sql_parts = []
-
-    sql_parts.append(f"""
--- ORGANIZATION
-INSERT INTO organization (
-    id, name, legal_name, country, timezone,
-    plan_type, organization_status, record_status,
-    record_metadata, created_at, updated_at
-) VALUES (
-    '{org_id}',
-    '{escape_sql(org.get("name", ""))}',
-    {sql_str(org.get("legal_name"))},
-    {sql_str(org.get("country"))},
-    {sql_str(org.get("timezone"))},
-    {sql_str(org.get("plan_type", "professional"))},
-    '{org.get("organization_status", "ONBOARDING")}',
-    'ACTIVE',
-    '{{"source": "migration"}}'::jsonb,
-    '{now}',
-    '{now}'
-);""")
-
-    sql_parts.append(f"""
--- COMPANY
-INSERT INTO company (
-    id, organization_id, name, legal_name,
-    tax_id_type, tax_id_number, address_fiscal, country, type,
-    legal_rep_name, legal_rep_id_type, legal_rep_id_number, legal_rep_position,
-    record_status, record_metadata, created_at, updated_at
-) VALUES (
-    '{company_id}',
-    '{org_id}',
-    '{escape_sql(comp.get("name", ""))}',
-    {sql_str(comp.get("legal_name"))},
-    {sql_str(comp.get("tax_id_type"))},
-    {sql_str(comp.get("tax_id_number"))},
-    {sql_str(comp.get("address_fiscal"))},
-    {sql_str(comp.get("country"))},
-    '{comp.get("type", "CLINIC_ISSUER")}',
-    {sql_str(comp.get("legal_rep_name"))},
-    {sql_str(comp.get("legal_rep_id_type"))},
-    {sql_str(comp.get("legal_rep_id_number"))},
-    {sql_str(comp.get("legal_rep_position"))},
-    'ACTIVE',
-    '{{"source": "migration"}}'::jsonb,
-    '{now}',
-    '{now}'
-);""")
-
-    sql_parts.append(f"""
--- CLINIC
-INSERT INTO clinic (
-    id, organization_id, default_issuer_company_id,
-    name, description, phone, email,
-    country, timezone, default_currency,
-    data_sharing_policy, clinic_status, record_status,
-    record_metadata, created_at, updated_at
-) VALUES (
-    '{clinic_id}',
-    '{org_id}',
-    '{company_id}',
-    '{escape_sql(clinic.get("name", ""))}',
-    {sql_str(clinic.get("description"))},
-    {sql_str(clinic.get("phone"))},
-    {sql_str(clinic.get("email"))},
-    {sql_str(clinic.get("country"))},
-    {sql_str(clinic.get("timezone"))},
-    {sql_str(clinic.get("default_currency"))},
-    '{clinic.get("data_sharing_policy", "ISOLATED")}',
-    '{clinic.get("clinic_status", "ONBOARDING")}',
-    'ACTIVE',
-    '{{"source": "migration"}}'::jsonb,
-    '{now}',
-    '{now}'
-);""")
-
-    site_ids = []  # Para guardar los IDs generados
+    org_id, company_id, clinic_id = generate_ids(3)
+    plan = OnboardingPlan(organization_id=org_id, company_id=company_id, clinic_id=clinic_id)
+
+    plan.batches.append(InsertBatch(
+        table="organization",
+        columns=[
+            "id", "name", "legal_name", "country", "timezone",
+            "plan_type", "organization_status", "record_status",
+            "record_metadata", "created_at", "updated_at",
+        ],
+        rows=[(
+            org_id,
+            org.get("name", ""),
+            optional(org.get("legal_name")),
+            optional(org.get("country")),
+            optional(org.get("timezone")),
+            optional(org.get("plan_type", "professional")),
+            org.get("organization_status", "ONBOARDING"),
+            "ACTIVE",
+            MIGRATION_METADATA,
+            now,
+            now,
+        )],
+        comment="ORGANIZATION",
+    ))
 
-    for i, site in enumerate(sites):
-        site_id = str(ULID()).upper()
-        site_ids.append((site_id, site))  # Guardar para billing_lines
+    plan.batches.append(InsertBatch(
+        table="company",
+        columns=[
+            "id", "organization_id", "name", "legal_name",
+            "tax_id_type", "tax_id_number", "address_fiscal", "country", "type",
+            "legal_rep_name", "legal_rep_id_type", "legal_rep_id_number", "legal_rep_position",
+            "record_status", "record_metadata", "created_at", "updated_at",
+        ],
+        rows=[(
+            company_id,
+            org_id,
+            comp.get("name", ""),
+            optional(comp.get("legal_name")),
+            optional(comp.get("tax_id_type")),
+            optional(comp.get("tax_id_number")),
+            optional(comp.get("address_fiscal")),
+            optional(comp.get("country")),
+            comp.get("type", "CLINIC_ISSUER"),
+            optional(comp.get("legal_rep_name")),
+            optional(comp.get("legal_rep_id_type")),
+            optional(comp.get("legal_rep_id_number")),
+            optional(comp.get("legal_rep_position")),
+            "ACTIVE",
+            MIGRATION_METADATA,
+            now,
+            now,
+        )],
+        comment="COMPANY",
+    ))
+
+    plan.batches.append(InsertBatch(
+        table="clinic",
+        columns=[
+            "id", "organization_id", "default_issuer_company_id",
+            "name", "description", "phone", "email",
+            "country", "timezone", "default_currency",
+            "data_sharing_policy", "clinic_status", "record_status",
+            "record_metadata", "created_at", "updated_at",
+        ],
+        rows=[(
+            clinic_id,
+            org_id,
+            company_id,
+            clinic.get("name", ""),
+            optional(clinic.get("description")),
+            optional(clinic.get("phone")),
+            optional(clinic.get("email")),
+            optional(clinic.get("country")),
+            optional(clinic.get("timezone")),
+            optional(clinic.get("default_currency")),
+            clinic.get("data_sharing_policy", "ISOLATED"),
+            clinic.get("clinic_status", "ONBOARDING"),
+            "ACTIVE",
+            MIGRATION_METADATA,
+            now,
+            now,
+        )],
+        comment="CLINIC",
+    ))
+
+    site_ids = generate_ids(len(sites))
+    site_rows = []
+    billing_rows = []
+    for site_id, site in zip(site_ids, sites):
         addr = site.get("address", {})
+        site_rows.append((
+            site_id,
+            clinic_id,
+            site.get("name", ""),
+            {
+                "country": addr.get("country", ""),
+                "region": addr.get("region", ""),
+                "city": addr.get("city", ""),
+                "district": addr.get("district", ""),
+                "postalCode": addr.get("postal_code", ""),
+                "streetLine1": addr.get("street_line1", ""),
+                "streetLine2": addr.get("street_line2", ""),
+            },
+            optional(site.get("timezone")),
+            site.get("site_status", "ACTIVE"),
+            "ACTIVE",
+            MIGRATION_METADATA,
+            now,
+            now,
+        ))
 
-        address_json = json.dumps({
-            "country": addr.get("country", ""),
-            "region": addr.get("region", ""),
-            "city": addr.get("city", ""),
-            "district": addr.get("district", ""),
-            "postalCode": addr.get("postal_code", ""),
-            "streetLine1": addr.get("street_line1", ""),
-            "streetLine2": addr.get("street_line2", ""),
-        }, ensure_ascii=False)
-
-        sql_parts.append(f"""
--- SITE {i + 1}: {site.get("name", "")}
-INSERT INTO site (
-    id, clinic_id, name, address, timezone,
-    site_status, record_status, record_metadata,
-    created_at, updated_at
-) VALUES (
-    '{site_id}',
-    '{clinic_id}',
-    '{escape_sql(site.get("name", ""))}',
-    '{escape_sql(address_json)}'::jsonb,
-    {sql_str(site.get("timezone"))},
-    '{site.get("site_status", "ACTIVE")}',
-    'ACTIVE',
-    '{{"source": "migration"}}'::jsonb,
-    '{now}',
-    '{now}'
-);""")
-
-    # Site Billing Lines
-    for site_id, site in site_ids:
-        billing_lines = site.get("billing_lines", [])
         # Si no hay billing_lines configuradas, crear una por defecto
-        if not billing_lines:
-            billing_lines = [{"name": "Línea Principal", "is_default": True}]
-
-        for j, bl in enumerate(billing_lines):
-            bl_id = str(ULID()).upper()
-            sql_parts.append(f"""
--- BILLING LINE: {site.get("name", "")} - {bl.get("name", "")}
-INSERT INTO site_billing_line (
-    id, site_id, company_id, name, description,
-    is_default, record_status, record_metadata,
-    created_at, updated_at
-) VALUES (
-    '{bl_id}',
-    '{site_id}',
-    '{company_id}',
-    '{escape_sql(bl.get("name", "Línea Principal"))}',
-    {sql_str(bl.get("description"))},
-    {str(bl.get("is_default", j == 0)).lower()},
-    'ACTIVE',
-    '{{"source": "migration"}}'::jsonb,
-    '{now}',
-    '{now}'
-);""")
+        billing_lines = site.get("billing_lines", []) or [{"name": "Línea Principal", "is_default": True}]
+        for j, (bl_id, bl) in enumerate(zip(generate_ids(len(billing_lines)), billing_lines)):
+            billing_rows.append((
+                bl_id,
+                site_id,
+                company_id,
+                bl.get("name", "Línea Principal"),
+                optional(bl.get("description")),
+                bool(bl.get("is_default", j == 0)),
+                "ACTIVE",
+                MIGRATION_METADATA,
+                now,
+                now,
+            ))
 
-    # Payment Methods
-    payment_methods = config.get("payment_methods", [])
-    for i, pm in enumerate(payment_methods):
-        pm_id = str(ULID()).upper()
-
-        sql_parts.append(f"""
--- PAYMENT METHOD {i + 1}: {pm.get("name", "")}
-INSERT INTO payment_method (
-    id, clinic_id, name, payment_method_type,
-    requires_reference, allows_refunds, is_online_method,
-    sort_order, payment_method_status, record_status,
-    record_metadata, created_at, updated_at
-) VALUES (
-    '{pm_id}',
-    '{clinic_id}',
-    '{escape_sql(pm.get("name", ""))}',
-    '{pm.get("payment_method_type", "OTHER")}',
-    {str(pm.get("requires_reference", False)).lower()},
-    {str(pm.get("allows_refunds", True)).lower()},
-    {str(pm.get("is_online_method", False)).lower()},
-    {pm.get("sort_order") or "NULL"},
-    'ACTIVE',
-    'ACTIVE',
-    '{{"source": "migration"}}'::jsonb,
-    '{now}',
-    '{now}'
-);""")
+    plan.batches.append(InsertBatch(
+        table="site",
+        columns=[
+            "id", "clinic_id", "name", "address", "timezone",
+            "site_status", "record_status", "record_metadata",
+            "created_at", "updated_at",
+        ],
+        rows=site_rows,
+        comment=f"SITES ({len(site_rows)})",
+    ))
 
+    plan.batches.append(InsertBatch(
+        table="site_billing_line",
+        columns=[
+            "id", "site_id", "company_id", "name", "description",
+            "is_default", "record_status", "record_metadata",
+            "created_at", "updated_at",
+        ],
+        rows=billing_rows,
+        comment=f"BILLING LINES ({len(billing_rows)})",
+        returning="id, site_id, name",
+    ))
+
+    plan.batches.append(InsertBatch(
+        table="payment_method",
+        columns=[
+            "id", "clinic_id", "name", "payment_method_type",
+            "requires_reference", "allows_refunds", "is_online_method",
+            "sort_order", "payment_method_status", "record_status",
+            "record_metadata", "created_at", "updated_at",
+        ],
+        rows=[
+            (
+                pm_id,
+                clinic_id,
+                pm.get("name", ""),
+                pm.get("payment_method_type", "OTHER"),
+                bool(pm.get("requires_reference", False)),
+                bool(pm.get("allows_refunds", True)),
+                bool(pm.get("is_online_method", False)),
+                pm.get("sort_order") or None,
+                "ACTIVE",
+                "ACTIVE",
+                MIGRATION_METADATA,
+                now,
+                now,
+            )
+            for pm_id, pm in zip(generate_ids(len(payment_methods)), payment_methods)
+        ],
+        comment=f"PAYMENT METHODS ({len(payment_methods)})",
+    ))
+
+    return plan
+
+
+def sql_value(value) -> str:
+    """Literal SQL de un valor del plan (para el script de auditoría)."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, dict):
+        return f"'{escape_sql(json.dumps(value, ensure_ascii=False))}'::jsonb"
+    if isinstance(value, datetime):
+        return f"'{value.isoformat()}'"
+    return f"'{escape_sql(value)}'"
+
+
+def plan_to_sql(plan: OnboardingPlan) -> str:
+    """Script SQL equivalente al plan (un INSERT multi-fila por tabla, en una transacción)."""
+    sql_parts = ["BEGIN;"]
+    for batch in plan.batches:
+        if not batch.rows:
+            continue
+        values = ",\n".join(
+            "    (" + ", ".join(sql_value(value) for value in row) + ")"
+            for row in batch.rows
+        )
+        sql_parts.append(
+            f"\n-- {batch.comment}\n"
+            f"INSERT INTO {batch.table} ({', '.join(batch.columns)}) VALUES\n{values};"
+        )
+    sql_parts.append("\nCOMMIT;")
     return "\n".join(sql_parts)
 
 
+def generate_sql(config: dict) -> str:
+    """Genera el SQL de inserción para la configuración."""
+    return plan_to_sql(build_onboarding_plan(config))
+
+
+def insert_plan(plan: OnboardingPlan) -> dict[str, list[dict]]:
+    """
+    Inserta el plan en una sola transacción con sentencias parametrizadas
+    (execute_values, un INSERT multi-fila por tabla). Si algo falla no se
+    inserta nada.
+
+    Returns:
+        Dict tabla -> filas devueltas por RETURNING (IDs insertados)
+    """
+    inserted = {}
+    with get_cursor(commit=True) as cursor:
+        for batch in plan.batches:
+            if not batch.rows:
+                inserted[batch.table] = []
+                continue
+            rows = [
+                tuple(Json(value) if isinstance(value, dict) else value for value in row)
+                for row in batch.rows
+            ]
+            inserted[batch.table] = execute_values(
+                cursor,
+                f"INSERT INTO {batch.table} ({', '.join(batch.columns)}) VALUES %s RETURNING {batch.returning}",
+                rows,
+                page_size=len(rows),
+                fetch=True,
+            )
+    return inserted
+
+
 def escape_sql(value: str) -> str:
     """Escapa comillas simples para SQL."""
     if value is None:
@@ -393,13 +509,6 @@ def escape_sql(value: str) -> str:
     return str(value).replace("'", "''")
 
 
-def sql_str(value) -> str:
-    """Convierte un valor a string SQL (NULL o 'valor')."""
-    if value is None or (isinstance(value, str) and not value.strip()):
-        return "NULL"
-    return f"'{escape_sql(value)}'"
-
-
 def save_sql_script(clinic_name: str, sql: str) -> str:
     """Guarda el script SQL en la carpeta de scripts de la clínica."""
     scripts_dir = os.path.join(CLINICS_DIR, clinic_name, "scripts")
@@ -480,7 +589,8 @@ def validate_and_insert(clinic_name: str = None):
     # Generar SQL
     console.print()
     step("Generando SQL...")
-    sql = generate_sql(config)
+    plan = build_onboarding_plan(config)
+    sql = plan_to_sql(plan)
 
     # Guardar SQL
     script_path = save_sql_script(clinic_name, sql)
@@ -509,7 +619,18 @@ def validate_and_insert(clinic_name: str = None):
     step("Insertando datos...")
 
     try:
-        execute_script(sql)
+        inserted = insert_plan(plan)
+        reference_cache.invalidate(*inserted)
+        reset_reference_snapshots()
+        console.print()
+        print_key_value({
+            "Organization ID": plan.organization_id,
+            "Company ID": plan.company_id,
+            "Clinic ID": plan.clinic_id,
+            "Sites": ", ".join(f"{row['name']} ({row['id']})" for row in inserted["site"]),
+            "Billing lines": len(inserted["site_billing_line"]),
+            "Payment methods": len(inserted["payment_method"]),
+        })
         console.print()
         print_panel(
             f"[green]Clínica '{clinic_name}' configurada exitosamente[/green]\n\n"
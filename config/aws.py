@@ -0,0 +1,116 @@
+"""
+Sesión AWS compartida (boto3) con import diferido.
+
+boto3/botocore tardan ~200 ms en importarse; este módulo no los importa
+hasta que se pide el primer cliente, así los comandos que no usan AWS
+no pagan ese costo.
+
+- Una sola boto3 Session por proceso (se recrea tras un fork)
+- Clientes cacheados y creados bajo lock (Session.client no es thread-safe)
+- Pool HTTP configurable y keep-alive TCP
+
+Configuración via .env:
+- AWS_MAX_POOL_CONNECTIONS (opcional, default 10)
+- AWS_TCP_KEEPALIVE (opcional, default true)
+
+Uso:
+    from config.aws import get_client
+    cognito = get_client("cognito-idp", region_name="eu-west-3")
+"""
+
+import os
+import threading
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_MAX_POOL_CONNECTIONS = 10
+
+_lock = threading.Lock()
+_session = None
+_session_pid = None
+_clients: dict[tuple, object] = {}
+
+
+def get_max_pool_connections() -> int:
+    """Conexiones HTTP por cliente (AWS_MAX_POOL_CONNECTIONS)."""
+    return int(os.getenv("AWS_MAX_POOL_CONNECTIONS", str(DEFAULT_MAX_POOL_CONNECTIONS)))
+
+
+def get_tcp_keepalive() -> bool:
+    """Keep-alive TCP en las conexiones del pool (AWS_TCP_KEEPALIVE)."""
+    return os.getenv("AWS_TCP_KEEPALIVE", "true").lower() in ("true", "1", "yes")
+
+
+def _get_session():
+    """Session del proceso actual. Requiere tener _lock."""
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        import boto3
+
+        _session = boto3.session.Session()
+        _session_pid = os.getpid()
+        _clients.clear()
+    return _session
+
+
+def get_session():
+    """Session boto3 compartida del proceso (importa boto3 en el primer uso)."""
+    with _lock:
+        return _get_session()
+
+
+def get_client(
+    service_name: str,
+    region_name: str | None = None,
+    endpoint_url: str | None = None,
+    aws_access_key_id: str | None = None,
+    aws_secret_access_key: str | None = None,
+    max_pool_connections: int | None = None,
+    **config_options,
+):
+    """
+    Cliente boto3 creado desde la sesión compartida.
+
+    Los clientes se reutilizan por combinación de argumentos: pedir dos
+    veces el mismo servicio con la misma configuración devuelve el mismo
+    cliente (los clientes boto3 son thread-safe).
+
+    Args:
+        service_name: "s3", "cognito-idp", ...
+        region_name: Región AWS
+        endpoint_url: Endpoint custom (MinIO)
+        aws_access_key_id / aws_secret_access_key: Credenciales explícitas
+            (si no, la cadena por defecto de boto3)
+        max_pool_connections: Tamaño del pool HTTP (default AWS_MAX_POOL_CONNECTIONS)
+        **config_options: Opciones extra de botocore.config.Config (p.ej. s3={...})
+    """
+    max_pool_connections = max_pool_connections or get_max_pool_connections()
+    cache_key = (
+        service_name, region_name, endpoint_url, aws_access_key_id,
+        aws_secret_access_key, max_pool_connections, repr(sorted(config_options.items())),
+    )
+
+    with _lock:
+        session = _get_session()
+        client = _clients.get(cache_key)
+        if client is None:
+            from botocore.config import Config
+
+            config = Config(
+                region_name=region_name,
+                max_pool_connections=max_pool_connections,
+                tcp_keepalive=get_tcp_keepalive(),
+                **config_options,
+            )
+            client = session.client(
+                service_name,
+                region_name=region_name,
+                endpoint_url=endpoint_url,
+                aws_access_key_id=aws_access_key_id,
+                aws_secret_access_key=aws_secret_access_key,
+                config=config,
+            )
+            _clients[cache_key] = client
+        return client
@@ -70,6 +70,23 @@ def execute_query(query: str, params: tuple = None) -> list:
         return []
 
 
+def stream_query(query: str, params: tuple = None, batch_size: int = 5000):
+    """
+    Ejecuta una query con cursor del lado del servidor y genera las filas
+    por lotes, sin cargar el resultado completo en memoria.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor(name="stream_query", cursor_factory=RealDictCursor)
+        cursor.itersize = batch_size
+        try:
+            cursor.execute(query, params)
+            for row in cursor:
+                yield row
+        finally:
+            cursor.close()
+            conn.rollback()
+
+
 def execute_insert(query: str, params: tuple = None) -> None:
     """Ejecuta un INSERT/UPDATE/DELETE."""
     with get_cursor(commit=True) as cursor:
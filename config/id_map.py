@@ -0,0 +1,204 @@
+"""
+Mapa persistente de IDs legacy -> ULID por clínica.
+
+Cada script de inserción asigna ULIDs a los registros del sistema de
+origen (número de paciente, ID de cita...). El mapa guarda esa relación
+en SQLite, clave (entidad, legacy_id), para que:
+- Las etapas posteriores resuelvan FKs sin consultar Postgres
+- Relanzar la migración reutilice los mismos ULIDs (IDs estables)
+
+Cada entidad se carga completa en memoria la primera vez que se usa,
+así cada lookup es O(1).
+
+Ubicación por clínica: clinics/{clinica}/processed/id_map.sqlite
+(clean_files solo borra los .json de processed/, el mapa se conserva)
+
+Uso:
+    with IdMap(get_clinic_id_map_path("mi_clinica")) as id_map:
+        ids = id_map.assign_many("patient", [row["num_paciente"] for row in rows])
+        patient_id = id_map.get("patient", cita["num_paciente"])
+"""
+
+import os
+import sqlite3
+import threading
+
+from config.utils import generate_ids, generate_ids_at
+
+CLINICS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "clinics")
+
+
+def get_clinic_id_map_path(clinic_folder: str) -> str:
+    """Ruta del mapa de IDs de una clínica (crea processed/ si no existe)."""
+    processed_dir = os.path.join(CLINICS_DIR, clinic_folder, "processed")
+    os.makedirs(processed_dir, exist_ok=True)
+    return os.path.join(processed_dir, "id_map.sqlite")
+
+
+class IdMap:
+    """Mapa durable (SQLite) de (entidad, legacy_id) -> ULID. Thread-safe."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS id_map (
+                entity TEXT NOT NULL,
+                legacy_id TEXT NOT NULL,
+                id TEXT NOT NULL,
+                PRIMARY KEY (entity, legacy_id)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+        # Índice en memoria por entidad: legacy_id -> ULID (carga diferida)
+        self._entities: dict[str, dict[str, str]] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _entity(self, entity: str) -> dict[str, str]:
+        """Mapa en memoria de una entidad. Requiere tener _lock."""
+        mapping = self._entities.get(entity)
+        if mapping is None:
+            mapping = dict(self._conn.execute(
+                "SELECT legacy_id, id FROM id_map WHERE entity = ?", (entity,)
+            ))
+            self._entities[entity] = mapping
+        return mapping
+
+    def get(self, entity: str, legacy_id) -> str | None:
+        """ULID asignado a un legacy_id, o None si no tiene."""
+        with self._lock:
+            return self._entity(entity).get(str(legacy_id))
+
+    def resolve(self, entity: str, legacy_ids: list) -> list[str | None]:
+        """ULIDs de varios legacy_id, en el mismo orden (None si no tiene)."""
+        with self._lock:
+            mapping = self._entity(entity)
+            return [mapping.get(str(legacy_id)) for legacy_id in legacy_ids]
+
+    def get_all(self, entity: str) -> dict[str, str]:
+        """Copia del mapa completo de una entidad (legacy_id -> ULID)."""
+        with self._lock:
+            return dict(self._entity(entity))
+
+    def assign_many(self, entity: str, legacy_ids: list, timestamps: list | None = None) -> dict[str, str]:
+        """
+        Asigna ULIDs a varios legacy_id en una transacción.
+
+        Los que ya tienen ULID lo conservan; los nuevos reciben IDs de
+        generate_ids (ordenados según el orden de legacy_ids) o, si se
+        pasa timestamps (created_at de cada registro, alineado con
+        legacy_ids), de generate_ids_at.
+
+        Returns:
+            Dict legacy_id (str) -> ULID de todos los legacy_ids pedidos
+
+        Raises:
+            ValueError: Si timestamps no tiene el mismo largo que legacy_ids
+        """
+        if timestamps is not None:
+            legacy_ids, timestamps = list(legacy_ids), list(timestamps)
+            if len(legacy_ids) != len(timestamps):
+                raise ValueError(
+                    f"timestamps ({len(timestamps)}) no está alineado con legacy_ids ({len(legacy_ids)})"
+                )
+        with self._lock:
+            mapping = self._entity(entity)
+            if timestamps is None:
+                keys = list(dict.fromkeys(str(legacy_id) for legacy_id in legacy_ids))
+            else:
+                timestamp_by_key = {}
+                for legacy_id, timestamp in zip(legacy_ids, timestamps):
+                    timestamp_by_key.setdefault(str(legacy_id), timestamp)
+                keys = list(timestamp_by_key)
+            missing = [k for k in keys if k not in mapping]
+            if missing:
+                if timestamps is None:
+                    new_ids = generate_ids(len(missing))
+                else:
+                    new_ids = generate_ids_at([timestamp_by_key[k] for k in missing])
+                new_rows = list(zip(missing, new_ids))
+                self._conn.executemany(
+                    "INSERT INTO id_map (entity, legacy_id, id) VALUES (?, ?, ?)",
+                    [(entity, legacy_id, new_id) for legacy_id, new_id in new_rows],
+                )
+                self._conn.commit()
+                mapping.update(new_rows)
+            return {k: mapping[k] for k in keys}
+
+    def assign(self, entity: str, legacy_id, timestamp=None) -> str:
+        """ULID de un legacy_id, asignando uno nuevo si no tiene."""
+        timestamps = None if timestamp is None else [timestamp]
+        return self.assign_many(entity, [legacy_id], timestamps)[str(legacy_id)]
+
+    def load(self, entity: str, pairs: dict) -> int:
+        """
+        Carga en bloque pares legacy_id -> ULID ya existentes
+        (p.ej. de un JSON de processed/ o de registros ya insertados).
+
+        Los legacy_id que ya tienen ULID no se sobrescriben.
+
+        Returns:
+            Cantidad de pares nuevos cargados
+        """
+        with self._lock:
+            mapping = self._entity(entity)
+            new_rows = [(str(k), v) for k, v in pairs.items() if str(k) not in mapping]
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO id_map (entity, legacy_id, id) VALUES (?, ?, ?)",
+                [(entity, legacy_id, ulid) for legacy_id, ulid in new_rows],
+            )
+            self._conn.commit()
+            mapping.update(new_rows)
+            return len(new_rows)
+
+    def count(self, entity: str | None = None) -> int:
+        """Cantidad de IDs mapeados (de una entidad o en total)."""
+        with self._lock:
+            if entity is not None:
+                return len(self._entity(entity))
+            return self._conn.execute("SELECT COUNT(*) FROM id_map").fetchone()[0]
+
+    def entities(self) -> list[str]:
+        """Entidades con IDs mapeados."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT entity FROM id_map ORDER BY entity")]
+
+    def forget(self, entity: str) -> int:
+        """Elimina el mapa de una entidad. Retorna cuántos IDs se eliminaron."""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM id_map WHERE entity = ?", (entity,)).rowcount
+            self._conn.commit()
+            self._entities.pop(entity, None)
+            return deleted
+
+    def close(self):
+        """Cierra la conexión SQLite."""
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resumen del mapa de IDs legacy -> ULID de una clínica")
+    parser.add_argument("clinic_folder", help="Nombre de la carpeta de la clínica")
+    args = parser.parse_args()
+
+    path = get_clinic_id_map_path(args.clinic_folder)
+    if not os.path.exists(path):
+        print(f"No existe mapa de IDs: {path}")
+        sys.exit(0)
+    with IdMap(path) as id_map:
+        print(f"Mapa de IDs: {path}")
+        for name in id_map.entities():
+            print(f"  {name}: {id_map.count(name)}")
@@ -0,0 +1,304 @@
+"""
+Optimización de imágenes antes de subirlas al almacenamiento.
+
+Las fotos de profesionales, de equipos y las firmas de consentimiento
+suelen venir como escaneos de varios MB. Antes de subirlas:
+- Se aplica la orientación EXIF y se reducen a las dimensiones del perfil
+- Se re-codifican en el formato de la key (jpg/png/webp) con la calidad del perfil
+- Se eliminan metadatos (EXIF, GPS, perfiles ICC, XMP, comentarios),
+  conservando la transparencia
+
+El resultado se cachea por hash del contenido (+ perfil y formato) en
+.cache/images/, así relanzar un lote no vuelve a procesar nada.
+Si la versión optimizada no es menor que la original, se usa la original,
+salvo en perfiles con strip_metadata (todos los actuales): ahí se sube
+siempre la re-codificada, para no publicar el EXIF/GPS del original.
+
+Uso típico:
+    items = [UploadItem(path, professional_photo_key(clinic_id, prof_id)), ...]
+    items, report = optimize_upload_items(items)
+    print(report.summary())
+    storage.upload_many(items)
+"""
+
+import io
+import os
+import time
+import hashlib
+from dataclasses import dataclass, field, replace
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(ROOT_DIR, ".cache", "images")
+
+
+# =============================================================================
+# PERFILES
+# =============================================================================
+
+@dataclass(frozen=True)
+class ImageProfile:
+    """Dimensiones máximas y calidad de re-codificación."""
+    name: str
+    max_width: int
+    max_height: int
+    quality: int = 85
+    # Subir siempre la versión sin metadatos, aunque no sea menor
+    strip_metadata: bool = True
+
+
+PROFILES = {
+    "professional_photo": ImageProfile("professional_photo", 800, 800, quality=85),
+    "equipment_photo": ImageProfile("equipment_photo", 1600, 1600, quality=82),
+    "consent_signature": ImageProfile("consent_signature", 1200, 600, quality=90),
+}
+
+# Prefijo de key -> perfil (ver *_key en config/storage.py)
+KEY_PREFIX_PROFILES = {
+    "professionals/": "professional_photo",
+    "equipment/": "equipment_photo",
+    "consents/signatures/": "consent_signature",
+}
+
+# Extensión de la key -> (formato Pillow, content type)
+FORMATS = {
+    "jpg": ("JPEG", "image/jpeg"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+    "webp": ("WEBP", "image/webp"),
+}
+
+
+def profile_for_key(key: str) -> ImageProfile | None:
+    """Perfil de optimización según la key de destino (None si no aplica)."""
+    for prefix, name in KEY_PREFIX_PROFILES.items():
+        if key.startswith(prefix):
+            return PROFILES[name]
+    return None
+
+
+def format_for_key(key: str) -> tuple[str, str] | None:
+    """(formato Pillow, content type) según la extensión de la key."""
+    return FORMATS.get(os.path.splitext(key)[1].lstrip(".").lower())
+
+
+# =============================================================================
+# OPTIMIZACIÓN
+# =============================================================================
+
+@dataclass
+class OptimizedImage:
+    """Resultado de optimizar una imagen."""
+    source_path: str
+    output_path: str
+    original_size: int
+    optimized_size: int
+    content_hash: str
+    cached: bool = False
+    error: str | None = None
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_size - self.optimized_size
+
+
+# Claves de image.info con metadatos que no se deben publicar
+METADATA_KEYS = ("exif", "icc_profile", "comment", "xmp", "XML:com.adobe.xmp")
+
+
+def encode_image(data: bytes, profile: ImageProfile, image_format: str) -> bytes:
+    """
+    Reduce, re-codifica y limpia metadatos de una imagen.
+
+    Returns:
+        Bytes de la imagen optimizada
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        image.thumbnail((profile.max_width, profile.max_height), Image.Resampling.LANCZOS)
+
+        if image_format == "JPEG":
+            # JPEG no admite transparencia: aplanar sobre blanco
+            if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+                image = image.convert("RGBA")
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+            elif image.mode != "RGB":
+                image = image.convert("RGB")
+        elif "transparency" in image.info or image.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+            # Transparencia de paleta (tRNS) -> canal alfa, que no depende de image.info
+            image = image.convert("RGBA")
+
+        # Sin EXIF/ICC/XMP/comentarios
+        for key in METADATA_KEYS:
+            image.info.pop(key, None)
+
+        options = {"optimize": True}
+        if image_format == "JPEG":
+            options.update(quality=profile.quality, progressive=True)
+        elif image_format == "WEBP":
+            options = {"quality": profile.quality, "method": 6}
+
+        output = io.BytesIO()
+        image.save(output, format=image_format, **options)
+        return output.getvalue()
+
+
+def optimize_image(
+    source_path: str,
+    profile: ImageProfile,
+    image_format: str = "JPEG",
+    cache_dir: str = DEFAULT_CACHE_DIR,
+) -> OptimizedImage:
+    """
+    Optimiza una imagen (o la toma de la cache si ya se procesó).
+
+    Si falla la decodificación, output_path apunta al archivo original.
+    Si el resultado no es menor también, salvo que el perfil tenga
+    strip_metadata (entonces se usa siempre la versión sin metadatos).
+    """
+    with open(source_path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    original_size = len(data)
+
+    extension = image_format.lower().replace("jpeg", "jpg")
+    variant = f"{profile.name}_{profile.max_width}x{profile.max_height}_q{profile.quality}"
+    cache_path = os.path.join(cache_dir, digest[:2], f"{digest}_{variant}.{extension}")
+
+    if os.path.exists(cache_path):
+        return OptimizedImage(
+            source_path, cache_path, original_size, os.path.getsize(cache_path), digest, cached=True,
+        )
+
+    try:
+        optimized = encode_image(data, profile, image_format)
+    except Exception as e:
+        return OptimizedImage(source_path, source_path, original_size, original_size, digest, error=str(e))
+
+    if len(optimized) >= original_size and not profile.strip_metadata:
+        return OptimizedImage(source_path, source_path, original_size, original_size, digest)
+
+    # Escritura atómica: otro proceso puede estar generando la misma entrada
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(optimized)
+    os.replace(tmp_path, cache_path)
+
+    return OptimizedImage(source_path, cache_path, original_size, len(optimized), digest)
+
+
+def _optimize_task(args: tuple) -> OptimizedImage:
+    """Punto de entrada para los procesos del pool."""
+    return optimize_image(*args)
+
+
+# =============================================================================
+# LOTES
+# =============================================================================
+
+@dataclass
+class ImageOptimizationReport:
+    """Resumen de un lote de optimización."""
+    results: list[OptimizedImage] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def original_bytes(self) -> int:
+        return sum(r.original_size for r in self.results)
+
+    @property
+    def optimized_bytes(self) -> int:
+        return sum(r.optimized_size for r in self.results)
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.optimized_bytes
+
+    @property
+    def cached(self) -> int:
+        return sum(1 for r in self.results if r.cached)
+
+    @property
+    def failed(self) -> list[OptimizedImage]:
+        return [r for r in self.results if r.error]
+
+    def summary(self) -> str:
+        saved_mb = self.bytes_saved / (1024 * 1024)
+        ratio = self.bytes_saved / self.original_bytes if self.original_bytes else 0.0
+        return (
+            f"{len(self.results)} imágenes ({self.cached} en cache, {len(self.failed)} con error): "
+            f"{saved_mb:.1f} MB ahorrados ({ratio:.0%}) en {self.elapsed:.1f}s"
+        )
+
+
+def optimize_upload_items(
+    items: list,
+    max_workers: int | None = None,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+) -> tuple[list, ImageOptimizationReport]:
+    """
+    Optimiza en un pool de procesos las imágenes de un lote de UploadItem.
+
+    Solo se procesan items cuya key corresponde a una foto o firma
+    (ver KEY_PREFIX_PROFILES) con extensión de imagen conocida; el resto
+    se devuelve sin cambios.
+
+    Returns:
+        (items con file_path apuntando a la versión optimizada, reporte)
+    """
+    start = time.time()
+    tasks = {}
+    for index, item in enumerate(items):
+        profile = profile_for_key(item.key)
+        image_format = format_for_key(item.key)
+        if profile and image_format:
+            tasks[index] = (item.file_path, profile, image_format[0], cache_dir)
+
+    report = ImageOptimizationReport()
+    if not tasks:
+        return list(items), report
+
+    indexes = list(tasks)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_optimize_task, [tasks[i] for i in indexes], chunksize=8))
+
+    optimized_items = list(items)
+    for index, result in zip(indexes, results):
+        item = items[index]
+        optimized_items[index] = replace(
+            item,
+            file_path=result.output_path,
+            content_type=item.content_type or format_for_key(item.key)[1],
+        )
+    report.results = results
+    report.elapsed = time.time() - start
+    return optimized_items, report
+
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Optimiza imágenes con un perfil de subida")
+    parser.add_argument("files", nargs="+", help="Imágenes a optimizar")
+    parser.add_argument("--profile", choices=list(PROFILES), default="professional_photo")
+    parser.add_argument("--format", choices=["jpg", "png", "webp"], default="jpg")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT_DIR)
+    from config.storage import UploadItem
+
+    prefix = next(p for p, name in KEY_PREFIX_PROFILES.items() if name == args.profile)
+    upload_items = [
+        UploadItem(path, f"{prefix}{i}/image.{args.format}")
+        for i, path in enumerate(args.files)
+    ]
+    upload_items, batch_report = optimize_upload_items(upload_items)
+    for upload_item, image in zip(upload_items, batch_report.results):
+        print(f"{image.source_path}: {image.original_size} -> {image.optimized_size} bytes ({upload_item.file_path})")
+    print(batch_report.summary())
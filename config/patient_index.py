@@ -0,0 +1,345 @@
+"""
+Índice en memoria de identidad de pacientes para hacer matching.
+
+Los scripts de extracción cruzan cada fila de origen con los pacientes ya
+migrados (por documento, teléfono, email o nombre + fecha de nacimiento).
+Con una query por fila, 500k filas tardan horas; el índice carga los
+pacientes de la clínica una sola vez (lectura en streaming) y resuelve
+cada lookup con un acceso a un dict.
+
+Almacenamiento compacto:
+- Los IDs de paciente se guardan una sola vez en una lista
+- Cada clave normalizada se reduce a un hash de 64 bits (int), que
+  apunta a la posición del paciente en esa lista (o a una tupla de
+  posiciones si varios pacientes comparten la clave, p.ej. un teléfono
+  familiar)
+
+Persistencia opcional en clinics/{clinica}/processed/patient_index.pickle.
+Al cargarlo se compara la huella de la tabla patient (conteo y último
+updated_at de la clínica) y se reconstruye si cambió.
+
+Uso:
+    index = PatientIndex.for_clinic(CLINIC_ID, path=get_clinic_patient_index_path("mi_clinica"))
+    patient_id = index.find(document=row["dni"], phone=row["movil"], email=row["email"])
+"""
+
+import os
+import re
+import pickle
+import hashlib
+from datetime import date, datetime
+
+from config.database import execute_query, stream_query
+from config.utils import normalize_name
+
+CLINICS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "clinics")
+
+INDEX_VERSION = 1
+
+# Orden de prioridad al buscar: el identificador más fiable primero
+KINDS = ("document", "email", "phone", "name_birthday")
+
+# Dígitos significativos de un teléfono (sin prefijo de país)
+PHONE_DIGITS = 9
+
+
+def get_clinic_patient_index_path(clinic_folder: str) -> str:
+    """Ruta del índice persistido de una clínica (crea processed/ si no existe)."""
+    processed_dir = os.path.join(CLINICS_DIR, clinic_folder, "processed")
+    os.makedirs(processed_dir, exist_ok=True)
+    return os.path.join(processed_dir, "patient_index.pickle")
+
+
+# =============================================================================
+# NORMALIZACIÓN
+# =============================================================================
+
+def normalize_document(value) -> str | None:
+    """Documento en mayúsculas, solo letras y dígitos (12.345.678-z -> 12345678Z)."""
+    if not value:
+        return None
+    normalized = re.sub(r"[^0-9A-Z]", "", str(value).upper())
+    return normalized or None
+
+
+def normalize_email(value) -> str | None:
+    """Email en minúsculas y sin espacios."""
+    if not value:
+        return None
+    normalized = str(value).strip().lower()
+    return normalized if "@" in normalized else None
+
+
+def normalize_phone(value) -> str | None:
+    """Últimos PHONE_DIGITS dígitos del teléfono (+34 600 11 22 33 -> 600112233)."""
+    if not value:
+        return None
+    digits = re.sub(r"\D", "", str(value))
+    if len(digits) < 6:
+        return None
+    return digits[-PHONE_DIGITS:]
+
+
+def normalize_birthday(value) -> str | None:
+    """Fecha de nacimiento como YYYY-MM-DD."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value).strip()
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d"):
+        try:
+            return datetime.strptime(text[:10], fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def normalize_name_birthday(first_name, last_name, birthday) -> str | None:
+    """Clave nombre completo + fecha de nacimiento ("ana garcia lopez|1980-05-02")."""
+    full_name = normalize_name(f"{first_name or ''} {last_name or ''}")
+    birthday = normalize_birthday(birthday)
+    if not full_name or not birthday:
+        return None
+    return f"{full_name}|{birthday}"
+
+
+def _contact_values(value) -> list[str]:
+    """
+    Valores de una columna de contactos (phones/emails): lista de strings,
+    lista de objetos ({"number": ...}, {"email": ...}, {"value": ...}) o string.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        value = [value]
+    result = []
+    for item in value:
+        if isinstance(item, dict):
+            item = item.get("number") or item.get("phone") or item.get("email") or item.get("value")
+        if item:
+            result.append(str(item))
+    return result
+
+
+def _hash_key(kind: str, key: str) -> int:
+    """Hash estable de 64 bits (no depende de PYTHONHASHSEED, se puede persistir)."""
+    return int.from_bytes(hashlib.blake2b(f"{kind}:{key}".encode(), digest_size=8).digest(), "big")
+
+
+# =============================================================================
+# ÍNDICE
+# =============================================================================
+
+class PatientIndex:
+    """Índice de pacientes por documento, email, teléfono y nombre + nacimiento."""
+
+    def __init__(self, clinic_id: str | None = None):
+        self.clinic_id = clinic_id
+        self.fingerprint = None
+        self._ids: list[str] = []
+        self._keys: dict[str, dict[int, int | tuple]] = {kind: {} for kind in KINDS}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    # -------------------------------------------------------------------------
+    # Construcción
+    # -------------------------------------------------------------------------
+
+    def _add_key(self, kind: str, key: str | None, position: int):
+        if not key:
+            return
+        mapping = self._keys[kind]
+        hashed = _hash_key(kind, key)
+        current = mapping.get(hashed)
+        if current is None:
+            mapping[hashed] = position
+        elif isinstance(current, int):
+            if current != position:
+                mapping[hashed] = (current, position)
+        elif position not in current:
+            mapping[hashed] = current + (position,)
+
+    def add(self, patient: dict):
+        """Agrega un paciente (fila de la tabla patient)."""
+        position = len(self._ids)
+        self._ids.append(patient["id"])
+        self._add_key("document", normalize_document(patient.get("id_document_number")), position)
+        for email in _contact_values(patient.get("emails")):
+            self._add_key("email", normalize_email(email), position)
+        for phone in _contact_values(patient.get("phones")):
+            self._add_key("phone", normalize_phone(phone), position)
+        self._add_key(
+            "name_birthday",
+            normalize_name_birthday(patient.get("first_name"), patient.get("last_name"), patient.get("birthday")),
+            position,
+        )
+
+    @classmethod
+    def from_rows(cls, rows, clinic_id: str | None = None) -> "PatientIndex":
+        """Construye el índice desde un iterable de filas de patient."""
+        index = cls(clinic_id)
+        for row in rows:
+            index.add(row)
+        return index
+
+    @classmethod
+    def from_database(cls, clinic_id: str, active_only: bool = True) -> "PatientIndex":
+        """Construye el índice leyendo los pacientes de la clínica en streaming."""
+        status_filter = "AND record_status = 'ACTIVE'" if active_only else ""
+        query = f"""
+            SELECT id, id_document_number, first_name, last_name,
+                   birthday, phones, emails
+            FROM patient
+            WHERE clinic_id = %s
+              {status_filter}
+        """
+        index = cls.from_rows(stream_query(query, (clinic_id,)), clinic_id)
+        index.fingerprint = table_fingerprint(clinic_id, active_only)
+        return index
+
+    @classmethod
+    def for_clinic(cls, clinic_id: str, path: str | None = None, active_only: bool = True) -> "PatientIndex":
+        """
+        Índice de la clínica. Si se indica path, reutiliza el índice
+        persistido mientras la huella de la tabla patient no cambie, y
+        guarda el nuevo cuando lo reconstruye.
+        """
+        if path and os.path.exists(path):
+            cached = cls.load(path)
+            if (cached is not None and cached.clinic_id == clinic_id
+                    and cached.fingerprint == table_fingerprint(clinic_id, active_only)):
+                return cached
+        index = cls.from_database(clinic_id, active_only)
+        if path:
+            index.save(path)
+        return index
+
+    # -------------------------------------------------------------------------
+    # Búsqueda
+    # -------------------------------------------------------------------------
+
+    def _lookup(self, kind: str, key: str | None) -> list[str]:
+        if not key:
+            return []
+        found = self._keys[kind].get(_hash_key(kind, key))
+        if found is None:
+            return []
+        if isinstance(found, int):
+            return [self._ids[found]]
+        return [self._ids[position] for position in found]
+
+    def by_document(self, document) -> list[str]:
+        return self._lookup("document", normalize_document(document))
+
+    def by_email(self, email) -> list[str]:
+        return self._lookup("email", normalize_email(email))
+
+    def by_phone(self, phone) -> list[str]:
+        return self._lookup("phone", normalize_phone(phone))
+
+    def by_name_birthday(self, first_name, last_name, birthday) -> list[str]:
+        return self._lookup("name_birthday", normalize_name_birthday(first_name, last_name, birthday))
+
+    def find(self, document=None, email=None, phone=None,
+             first_name=None, last_name=None, birthday=None) -> str | None:
+        """
+        ID del paciente que coincide, probando en orden documento, email,
+        teléfono y nombre + nacimiento. Solo se acepta una coincidencia
+        única; si un identificador es ambiguo se pasa al siguiente.
+        """
+        lookups = (
+            lambda: self.by_document(document),
+            lambda: self.by_email(email),
+            lambda: self.by_phone(phone),
+            lambda: self.by_name_birthday(first_name, last_name, birthday),
+        )
+        for lookup in lookups:
+            matches = lookup()
+            if len(matches) == 1:
+                return matches[0]
+        return None
+
+    def stats(self) -> dict:
+        """Pacientes indexados y claves por tipo."""
+        return {"patients": len(self._ids), **{kind: len(keys) for kind, keys in self._keys.items()}}
+
+    # -------------------------------------------------------------------------
+    # Persistencia
+    # -------------------------------------------------------------------------
+
+    def save(self, path: str):
+        """Guarda el índice en disco (escritura atómica)."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({
+                "version": INDEX_VERSION,
+                "clinic_id": self.clinic_id,
+                "fingerprint": self.fingerprint,
+                "ids": self._ids,
+                "keys": self._keys,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "PatientIndex | None":
+        """Carga un índice guardado con save(). None si es de otra versión."""
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != INDEX_VERSION:
+            return None
+        index = cls(data["clinic_id"])
+        index.fingerprint = data["fingerprint"]
+        index._ids = data["ids"]
+        index._keys = data["keys"]
+        return index
+
+
+def table_fingerprint(clinic_id: str, active_only: bool = True) -> tuple:
+    """Huella de los pacientes de la clínica: (conteo, último updated_at)."""
+    status_filter = "AND record_status = 'ACTIVE'" if active_only else ""
+    query = f"""
+        SELECT COUNT(*) AS count, MAX(updated_at) AS last_updated
+        FROM patient
+        WHERE clinic_id = %s
+          {status_filter}
+    """
+    row = execute_query(query, (clinic_id,))[0]
+    last_updated = row["last_updated"].isoformat() if row["last_updated"] else None
+    return (row["count"], last_updated)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import argparse
+    import importlib.util
+
+    parser = argparse.ArgumentParser(description="Construye el índice de identidad de pacientes de una clínica")
+    parser.add_argument("clinic_folder", help="Nombre de la carpeta de la clínica")
+    parser.add_argument("--rebuild", action="store_true", help="Ignorar el índice guardado")
+    args = parser.parse_args()
+
+    queries_path = os.path.join(CLINICS_DIR, args.clinic_folder, "queries.py")
+    if not os.path.exists(queries_path):
+        print(f"No existe {queries_path} (genere primero las queries de la clínica)")
+        sys.exit(1)
+    spec = importlib.util.spec_from_file_location("queries", queries_path)
+    queries = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(queries)
+
+    path = get_clinic_patient_index_path(args.clinic_folder)
+    if args.rebuild and os.path.exists(path):
+        os.remove(path)
+
+    start = time.perf_counter()
+    index = PatientIndex.for_clinic(queries.CLINIC_ID, path=path)
+    elapsed = time.perf_counter() - start
+    print(f"Índice de pacientes: {path} ({elapsed:.2f}s)")
+    for name, count in index.stats().items():
+        print(f"  {name}: {count}")
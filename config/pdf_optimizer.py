@@ -0,0 +1,303 @@
+"""
+Optimización de PDFs de evidencia de consentimiento antes de subirlos.
+
+Los PDFs de sistemas legacy suelen traer fuentes duplicadas y streams
+sin comprimir. Antes de subirlos al bucket WORM (donde no se pueden
+reemplazar después) se puede aplicar una pasada opcional con pypdf:
+- Comprime los content streams de cada página (Flate, nivel 9)
+- Deduplica objetos idénticos y elimina objetos huérfanos
+- Linealiza (fast web view) si se pide y qpdf está instalado
+
+Los PDFs firmados (campos /Sig o /ByteRange) o cifrados se suben sin
+tocar: reescribirlos invalida la firma o no se pueden descifrar.
+Si el ahorro no alcanza el umbral (min_saving), se sube el original.
+Los resultados se cachean por hash del contenido en .cache/pdfs/.
+
+Uso típico:
+    items = [UploadItem(path, consent_evidence_key(consent_id), "worm"), ...]
+    items, report = optimize_evidence_items(items)
+    print(report.summary())
+    storage.upload_many(items)
+"""
+
+import os
+import time
+import shutil
+import hashlib
+import subprocess
+from dataclasses import dataclass, field, replace
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(ROOT_DIR, ".cache", "pdfs")
+
+EVIDENCE_PREFIX = "consents/evidence/"
+
+# Ahorro mínimo (fracción del tamaño original) para usar la versión optimizada
+DEFAULT_MIN_SAVING = 0.05
+
+
+@dataclass
+class OptimizedPdf:
+    """Resultado de optimizar un PDF."""
+    source_path: str
+    output_path: str
+    original_size: int
+    optimized_size: int
+    content_hash: str
+    cached: bool = False
+    skipped: bool = False
+    linearized: bool = False
+    # "firmado" o "cifrado" si se subió sin tocar por eso
+    protected: str | None = None
+    error: str | None = None
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_size - self.optimized_size
+
+
+def linearize(input_path: str, output_path: str) -> bool:
+    """
+    Linealiza un PDF con qpdf (pypdf no lo soporta).
+
+    Returns:
+        True si se linealizó; False si qpdf no está disponible o falla
+    """
+    qpdf = shutil.which("qpdf")
+    if not qpdf:
+        return False
+    result = subprocess.run(
+        [qpdf, "--linearize", "--object-streams=generate", input_path, output_path],
+        capture_output=True,
+    )
+    # qpdf retorna 3 cuando termina con advertencias
+    return result.returncode in (0, 3) and os.path.exists(output_path)
+
+
+def _has_signature_field(fields) -> bool:
+    """True si algún campo (o sus hijos) es de firma o tiene un valor firmado."""
+    for field_ref in fields or []:
+        form_field = field_ref.get_object()
+        if form_field.get("/FT") == "/Sig":
+            return True
+        value = form_field.get("/V")
+        if value is not None and "/ByteRange" in value.get_object():
+            return True
+        if _has_signature_field(form_field.get("/Kids")):
+            return True
+    return False
+
+
+def protection_reason(reader) -> str | None:
+    """
+    "cifrado" o "firmado" si el PDF no se debe reescribir; None si se puede.
+
+    Firmado: el AcroForm tiene SigFlags, un campo /Sig o un valor con
+    /ByteRange, o el catálogo declara permisos (/Perms, DocMDP).
+    """
+    if reader.is_encrypted:
+        return "cifrado"
+    root = reader.trailer["/Root"].get_object()
+    if "/Perms" in root:
+        return "firmado"
+    acroform = root.get("/AcroForm")
+    if acroform is None:
+        return None
+    acroform = acroform.get_object()
+    if acroform.get("/SigFlags", 0) or _has_signature_field(acroform.get("/Fields")):
+        return "firmado"
+    return None
+
+
+def compress_pdf(source_path: str, output_path: str):
+    """Comprime streams y deduplica objetos con pypdf."""
+    from pypdf import PdfReader, PdfWriter
+
+    reader = PdfReader(source_path)
+    reason = protection_reason(reader)
+    if reason:
+        raise ValueError(f"PDF {reason}: no se puede reescribir")
+    writer = PdfWriter(clone_from=reader)
+    for page in writer.pages:
+        page.compress_content_streams(level=9)
+    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+    with open(output_path, "wb") as f:
+        writer.write(f)
+
+
+def optimize_pdf(
+    source_path: str,
+    min_saving: float = DEFAULT_MIN_SAVING,
+    linearize_output: bool = False,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+) -> OptimizedPdf:
+    """
+    Optimiza un PDF (o lo toma de la cache si ya se procesó).
+
+    Si falla, el PDF está firmado o cifrado, o el ahorro es menor que
+    min_saving, output_path apunta al archivo original.
+    """
+    from pypdf import PdfReader
+
+    sha = hashlib.sha256()
+    with open(source_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+    original_size = os.path.getsize(source_path)
+
+    try:
+        reason = protection_reason(PdfReader(source_path))
+    except Exception as e:
+        return OptimizedPdf(source_path, source_path, original_size, original_size, digest, error=str(e))
+    if reason:
+        return OptimizedPdf(source_path, source_path, original_size, original_size, digest, protected=reason)
+
+    # Sin qpdf no se linealiza: la entrada de cache es la comprimida
+    linearize_output = linearize_output and shutil.which("qpdf") is not None
+    suffix = "_lin" if linearize_output else ""
+    cache_path = os.path.join(cache_dir, digest[:2], f"{digest}{suffix}.pdf")
+    cached = os.path.exists(cache_path)
+
+    if not cached:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            compress_pdf(source_path, tmp_path)
+            if linearize_output:
+                lin_path = f"{tmp_path}.lin"
+                if linearize(tmp_path, lin_path):
+                    os.replace(lin_path, tmp_path)
+        except Exception as e:
+            for path in (tmp_path, f"{tmp_path}.lin"):
+                if os.path.exists(path):
+                    os.remove(path)
+            return OptimizedPdf(source_path, source_path, original_size, original_size, digest, error=str(e))
+        os.replace(tmp_path, cache_path)
+
+    optimized_size = os.path.getsize(cache_path)
+    if original_size - optimized_size < original_size * min_saving:
+        return OptimizedPdf(source_path, source_path, original_size, original_size, digest, cached=cached, skipped=True)
+
+    return OptimizedPdf(
+        source_path, cache_path, original_size, optimized_size, digest,
+        cached=cached, linearized=linearize_output,
+    )
+
+
+def _optimize_task(args: tuple) -> OptimizedPdf:
+    """Punto de entrada para los procesos del pool."""
+    return optimize_pdf(*args)
+
+
+@dataclass
+class PdfOptimizationReport:
+    """Resumen de un lote de optimización de PDFs."""
+    results: list[OptimizedPdf] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def original_bytes(self) -> int:
+        return sum(r.original_size for r in self.results)
+
+    @property
+    def bytes_saved(self) -> int:
+        return sum(r.bytes_saved for r in self.results)
+
+    @property
+    def optimized(self) -> int:
+        return sum(1 for r in self.results if r.output_path != r.source_path)
+
+    @property
+    def skipped(self) -> int:
+        return sum(1 for r in self.results if r.skipped)
+
+    @property
+    def protected(self) -> int:
+        return sum(1 for r in self.results if r.protected)
+
+    @property
+    def failed(self) -> list[OptimizedPdf]:
+        return [r for r in self.results if r.error]
+
+    def summary(self) -> str:
+        saved_mb = self.bytes_saved / (1024 * 1024)
+        ratio = self.bytes_saved / self.original_bytes if self.original_bytes else 0.0
+        return (
+            f"{len(self.results)} PDFs: {self.optimized} optimizados, {self.skipped} bajo el umbral, "
+            f"{self.protected} firmados/cifrados sin tocar, "
+            f"{len(self.failed)} con error; {saved_mb:.1f} MB ahorrados ({ratio:.0%}) en {self.elapsed:.1f}s"
+        )
+
+
+def optimize_evidence_items(
+    items: list,
+    min_saving: float = DEFAULT_MIN_SAVING,
+    linearize_output: bool = False,
+    max_workers: int | None = None,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+) -> tuple[list, PdfOptimizationReport]:
+    """
+    Optimiza en un pool de procesos los PDFs de evidencia de un lote de UploadItem.
+
+    Solo se procesan keys bajo consents/evidence/ terminadas en .pdf;
+    el resto se devuelve sin cambios.
+
+    Returns:
+        (items con file_path apuntando a la versión optimizada, reporte)
+    """
+    start = time.time()
+    indexes = [
+        i for i, item in enumerate(items)
+        if item.key.startswith(EVIDENCE_PREFIX) and item.key.lower().endswith(".pdf")
+    ]
+
+    report = PdfOptimizationReport()
+    if not indexes:
+        return list(items), report
+
+    tasks = [(items[i].file_path, min_saving, linearize_output, cache_dir) for i in indexes]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_optimize_task, tasks))
+
+    optimized_items = list(items)
+    for index, result in zip(indexes, results):
+        optimized_items[index] = replace(
+            items[index],
+            file_path=result.output_path,
+            content_type=items[index].content_type or "application/pdf",
+        )
+    report.results = results
+    report.elapsed = time.time() - start
+    return optimized_items, report
+
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Optimiza PDFs de evidencia de consentimiento")
+    parser.add_argument("files", nargs="+", help="PDFs a optimizar")
+    parser.add_argument("--min-saving", type=float, default=DEFAULT_MIN_SAVING, help="Ahorro mínimo (0-1)")
+    parser.add_argument("--linearize", action="store_true", help="Linealizar con qpdf si está instalado")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT_DIR)
+    from config.storage import UploadItem
+
+    upload_items = [
+        UploadItem(path, f"{EVIDENCE_PREFIX}{i}.pdf", "worm")
+        for i, path in enumerate(args.files)
+    ]
+    upload_items, batch_report = optimize_evidence_items(
+        upload_items, min_saving=args.min_saving, linearize_output=args.linearize,
+    )
+    for pdf in batch_report.results:
+        status = (
+            "error: " + pdf.error if pdf.error
+            else f"sin tocar ({pdf.protected})" if pdf.protected
+            else "omitido" if pdf.skipped else "ok"
+        )
+        print(f"{pdf.source_path}: {pdf.original_size} -> {pdf.optimized_size} bytes ({status})")
+    print(batch_report.summary())
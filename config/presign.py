@@ -0,0 +1,169 @@
+"""
+Firma de URLs prefirmadas en lote.
+
+- SigV4Presigner: firma URLs GET de S3 (AWS Signature V4, query string)
+  localmente, derivando la signing key una sola vez por lote en lugar
+  de pasar por el pipeline de botocore en cada key.
+- PresignedUrlCache: cache LRU acotada que reutiliza cada URL hasta poco
+  antes de su expiración.
+"""
+
+import hmac
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from urllib.parse import quote, urlparse
+
+
+def _hmac_sha256(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+class SigV4Presigner:
+    """
+    Firma URLs GET de S3 con AWS Signature Version 4 (query string).
+
+    Soporta estilo virtual-host (default en AWS) y path-style
+    (endpoints S3-compatibles como MinIO).
+    """
+
+    ALGORITHM = "AWS4-HMAC-SHA256"
+
+    def __init__(
+        self,
+        access_key_id: str,
+        secret_access_key: str,
+        region: str,
+        endpoint_url: str | None = None,
+        force_path_style: bool = False,
+        session_token: str | None = None,
+    ):
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.region = region
+        self.session_token = session_token
+
+        if endpoint_url:
+            parsed = urlparse(endpoint_url)
+            self.scheme = parsed.scheme or "https"
+            self.host = parsed.netloc
+            # Los endpoints custom (MinIO) usan path-style
+            self.path_style = True
+        else:
+            self.scheme = "https"
+            self.host = f"s3.{region}.amazonaws.com"
+            self.path_style = force_path_style
+
+    def _signing_key(self, datestamp: str) -> bytes:
+        k_date = _hmac_sha256(f"AWS4{self.secret_access_key}".encode("utf-8"), datestamp)
+        k_region = _hmac_sha256(k_date, self.region)
+        k_service = _hmac_sha256(k_region, "s3")
+        return _hmac_sha256(k_service, "aws4_request")
+
+    def presign_many(
+        self,
+        bucket: str,
+        keys: list[str],
+        expiration: int = 3600,
+        now: datetime | None = None,
+    ) -> dict[str, str]:
+        """
+        Firma todas las keys en una pasada con la misma fecha y signing key.
+
+        Returns:
+            Dict key -> URL firmada
+        """
+        now = now or datetime.now(timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        datestamp = now.strftime("%Y%m%d")
+        scope = f"{datestamp}/{self.region}/s3/aws4_request"
+        signing_key = self._signing_key(datestamp)
+
+        # Buckets con puntos no son válidos como subdominio con TLS
+        if self.path_style or "." in bucket:
+            host = self.host
+            base_path = f"/{bucket}/"
+        else:
+            host = f"{bucket}.{self.host}"
+            base_path = "/"
+
+        params = {
+            "X-Amz-Algorithm": self.ALGORITHM,
+            "X-Amz-Credential": f"{self.access_key_id}/{scope}",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(expiration),
+            "X-Amz-SignedHeaders": "host",
+        }
+        if self.session_token:
+            params["X-Amz-Security-Token"] = self.session_token
+        canonical_query = "&".join(
+            f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}"
+            for k, v in sorted(params.items())
+        )
+        # Partes constantes del canonical request y del string to sign
+        headers_part = f"host:{host}\n\nhost\nUNSIGNED-PAYLOAD"
+        sign_prefix = f"{self.ALGORITHM}\n{amz_date}\n{scope}\n"
+
+        urls = {}
+        for key in keys:
+            path = base_path + quote(key, safe="/-_.~")
+            canonical_request = f"GET\n{path}\n{canonical_query}\n{headers_part}"
+            string_to_sign = sign_prefix + hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()
+            signature = hmac.new(signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+            urls[key] = f"{self.scheme}://{host}{path}?{canonical_query}&X-Amz-Signature={signature}"
+        return urls
+
+
+class PresignedUrlCache:
+    """
+    Cache LRU de URLs firmadas, con expiración.
+
+    La entrada se identifica por (bucket, key, expiration): una URL solo
+    se reutiliza para pedidos con la misma validez, mientras le quede más
+    de refresh_before segundos; después se vuelve a firmar. Thread-safe.
+    """
+
+    def __init__(self, max_size: int = 10000, refresh_before: int = 300):
+        self.max_size = max_size
+        self.refresh_before = refresh_before
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str, int], tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, bucket_type: str, key: str, expiration: int) -> str | None:
+        """URL vigente de la key firmada con esa expiración, o None si no está o expira pronto."""
+        cache_key = (bucket_type, key, expiration)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None or entry[1] - time.time() <= self.refresh_before:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, bucket_type: str, key: str, expiration: int, url: str, expires_at: float):
+        """Guarda una URL (desaloja la menos usada si se excede max_size)."""
+        cache_key = (bucket_type, key, expiration)
+        with self._lock:
+            self._entries[cache_key] = (url, expires_at)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -0,0 +1,155 @@
+"""
+Caché en memoria para queries de datos de referencia.
+
+Organizaciones, sites, servicios, tratamientos, salas y equipos casi no
+cambian durante una migración, pero los scripts los consultan miles de
+veces. El caché guarda el resultado por (función, argumentos) con:
+- TTL: una entrada expira a los QUERY_CACHE_TTL_SECONDS segundos
+- LRU: como máximo QUERY_CACHE_MAX_ENTRIES entradas, se descartan las
+  menos usadas
+
+Cada función cacheada declara las tablas que lee. Los comandos que
+escriben en esas tablas (validate_and_insert, clean_migrated_data)
+llaman a reference_cache.invalidate(...) al terminar, así el resto de
+comandos del mismo proceso (piloto automático) no ve datos viejos.
+
+Los resultados se comparten entre llamadas: no modificarlos.
+
+Uso:
+    @reference_cache.cached("site")
+    def get_sites_by_clinic(clinic_id): ...
+
+    reference_cache.invalidate("site", "clinic")
+    print(reference_cache.stats().summary())
+"""
+
+import os
+import time
+import threading
+import functools
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+@dataclass
+class CacheStats:
+    """Contadores de uso del caché."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    entries: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.hits}/{self.lookups} aciertos ({self.hit_ratio:.0%}), "
+            f"{self.entries} entradas, {self.evictions} descartadas, "
+            f"{self.invalidations} invalidadas"
+        )
+
+
+class QueryCache:
+    """Caché TTL + LRU de resultados de queries, invalidable por tabla. Thread-safe."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # (función, args, kwargs) -> (expira_en, resultado)
+        self._entries: OrderedDict[tuple, tuple[float, object]] = OrderedDict()
+        # función -> tablas que lee
+        self._tables: dict[str, frozenset[str]] = {}
+        self._stats = CacheStats()
+        # Se incrementa en cada invalidate: descarta resultados leídos antes
+        self._generation = 0
+
+    def cached(self, *tables: str):
+        """Decorador: cachea el resultado de la función, que lee de `tables`."""
+        def decorator(func):
+            name = f"{func.__module__}.{func.__qualname__}"
+            self._tables[name] = frozenset(tables)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = (name, args, tuple(sorted(kwargs.items())))
+                now = time.monotonic()
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None and entry[0] > now:
+                        self._entries.move_to_end(key)
+                        self._stats.hits += 1
+                        return entry[1]
+                    self._stats.misses += 1
+                    generation = self._generation
+
+                result = func(*args, **kwargs)
+
+                with self._lock:
+                    if generation != self._generation:
+                        # Hubo una invalidación mientras se ejecutaba la query
+                        return result
+                    self._entries[key] = (now + self.ttl_seconds, result)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self._stats.evictions += 1
+                return result
+
+            wrapper.cache = self
+            return wrapper
+        return decorator
+
+    def invalidate(self, *tables: str) -> int:
+        """
+        Descarta las entradas de funciones que leen alguna de `tables`
+        (todas si no se indica ninguna).
+
+        Returns:
+            Cantidad de entradas descartadas
+        """
+        with self._lock:
+            if tables:
+                affected = {name for name, used in self._tables.items() if used & set(tables)}
+                keys = [key for key in self._entries if key[0] in affected]
+            else:
+                keys = list(self._entries)
+            for key in keys:
+                del self._entries[key]
+            self._generation += 1
+            self._stats.invalidations += len(keys)
+            return len(keys)
+
+    def stats(self) -> CacheStats:
+        """Copia de los contadores actuales."""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                invalidations=self._stats.invalidations,
+                entries=len(self._entries),
+            )
+
+    def reset_stats(self):
+        """Pone los contadores a cero (las entradas se conservan)."""
+        with self._lock:
+            self._stats = CacheStats()
+
+
+# Caché compartido por las queries de referencia de clinics.queries
+reference_cache = QueryCache(
+    max_entries=int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.getenv("QUERY_CACHE_TTL_SECONDS", "300")),
+)
@@ -0,0 +1,240 @@
+"""
+Snapshot de tablas de referencia de una clínica.
+
+Los scripts de inserción resuelven servicios, tratamientos, profesionales,
+métodos de pago y categorías por nombre (o por código del sistema legacy)
+con una query por búsqueda. El snapshot guarda esas tablas en un archivo
+JSON compacto junto al queries.py generado de la clínica:
+
+    clinics/{clinica}/reference_snapshot.json
+
+El queries.py generado lo carga la primera vez que se usa (una vez por
+proceso) con get_reference(). Antes de cargarlo compara la huella de las
+tablas (conteo y último updated_at por tabla, una sola query) con la
+guardada en el archivo y lo regenera si cambió.
+
+La huella solo se verifica en esa primera carga: los comandos que
+escriben en las tablas de referencia llaman a reset_reference_snapshots()
+(junto con reference_cache.invalidate) para que el próximo uso en el
+mismo proceso vuelva a verificarla.
+
+Cada fila se indexa por nombre normalizado (config.utils.normalize_name)
+y por código legacy (record_metadata.legacy_id o legacy_code).
+
+Uso (desde el queries.py generado):
+    treatment = find_reference("treatment", name="Limpieza facial", site_id=SITES["Centro"])
+    service = find_reference("service", legacy_code="SRV-012")
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+
+from config.database import execute_query
+from config.utils import normalize_name
+
+SNAPSHOT_FILENAME = "reference_snapshot.json"
+SNAPSHOT_VERSION = 1
+
+# tabla -> (columna de alcance, columnas guardadas además de id/name/legacy_code)
+# El alcance es la clínica, salvo treatment que cuelga de los sites.
+REFERENCE_TABLES = {
+    "service": ("clinic_id", ["description"]),
+    "category": ("clinic_id", ["parent_id"]),
+    "treatment": ("site_id", ["site_id", "service_id", "category_id", "duration_default_minutes"]),
+    "professional": ("clinic_id", ["last_name", "email", "site_ids"]),
+    "payment_method": ("clinic_id", ["payment_method_type"]),
+}
+
+_lock = threading.Lock()
+_loaded: dict[str, "ReferenceSnapshot"] = {}
+
+
+def _scope_filter(scope_column: str) -> str:
+    if scope_column == "site_id":
+        return "t.site_id = ANY(%s)"
+    return "t.clinic_id = %s"
+
+
+def _scope_param(scope_column: str, clinic_id: str, site_ids: list[str]):
+    return list(site_ids) if scope_column == "site_id" else clinic_id
+
+
+def existing_tables() -> list[str]:
+    """Tablas de REFERENCE_TABLES que existen en la base de datos."""
+    rows = execute_query(
+        "SELECT name FROM unnest(%s::text[]) AS name WHERE to_regclass(name) IS NOT NULL",
+        (list(REFERENCE_TABLES),),
+    )
+    return [row["name"] for row in rows]
+
+
+def tables_with_column(tables: list[str], column: str) -> set[str]:
+    """Tablas de `tables` que tienen la columna `column` (information_schema)."""
+    rows = execute_query("""
+        SELECT table_name
+        FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND column_name = %s
+          AND table_name = ANY(%s)
+    """, (column, list(tables)))
+    return {row["table_name"] for row in rows}
+
+
+def tables_fingerprint(clinic_id: str, site_ids: list[str], tables: list[str] | None = None) -> dict:
+    """
+    Huella de las tablas de referencia: tabla -> [conteo, último updated_at],
+    en una sola query (UNION ALL). Si una tabla no tiene updated_at, su
+    huella es solo el conteo (último updated_at = None).
+    """
+    tables = existing_tables() if tables is None else tables
+    if not tables:
+        return {}
+    with_updated_at = tables_with_column(tables, "updated_at")
+    parts = []
+    params = []
+    for table in tables:
+        scope_column, _ = REFERENCE_TABLES[table]
+        last_updated = "MAX(t.updated_at)::text" if table in with_updated_at else "NULL::text"
+        parts.append(
+            f"SELECT '{table}' AS table_name, COUNT(*) AS count, {last_updated} AS last_updated "
+            f"FROM {table} t WHERE {_scope_filter(scope_column)}"
+        )
+        params.append(_scope_param(scope_column, clinic_id, site_ids))
+    rows = execute_query(" UNION ALL ".join(parts), tuple(params))
+    return {row["table_name"]: [row["count"], row["last_updated"]] for row in rows}
+
+
+def fetch_snapshot(clinic_id: str, site_ids: list[str]) -> dict:
+    """Lee las tablas de referencia y arma el contenido del snapshot."""
+    tables = existing_tables()
+    data = {
+        "version": SNAPSHOT_VERSION,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "clinic_id": clinic_id,
+        "fingerprint": tables_fingerprint(clinic_id, site_ids, tables),
+        "tables": {},
+    }
+    for table in tables:
+        scope_column, extra_columns = REFERENCE_TABLES[table]
+        # to_jsonb(t): no falla si alguna columna opcional no existe
+        query = f"""
+            SELECT t.id, t.name, to_jsonb(t) AS row
+            FROM {table} t
+            WHERE {_scope_filter(scope_column)}
+            ORDER BY t.name, t.id
+        """
+        columns = ["id", "name", "legacy_code"] + extra_columns
+        rows = []
+        for result in execute_query(query, (_scope_param(scope_column, clinic_id, site_ids),)):
+            row = result["row"]
+            if row.get("record_status", "ACTIVE") != "ACTIVE":
+                continue
+            metadata = row.get("record_metadata") or {}
+            legacy_code = metadata.get("legacy_id") or metadata.get("legacy_code")
+            rows.append(
+                [result["id"], result["name"], str(legacy_code) if legacy_code is not None else None]
+                + [row.get(column) for column in extra_columns]
+            )
+        data["tables"][table] = {"columns": columns, "rows": rows}
+    return data
+
+
+def write_snapshot(path: str, clinic_id: str, site_ids: list[str]) -> "ReferenceSnapshot":
+    """Genera el snapshot y lo guarda en path (escritura atómica)."""
+    data = fetch_snapshot(clinic_id, site_ids)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"), default=str)
+    os.replace(tmp_path, path)
+    return ReferenceSnapshot(data)
+
+
+class ReferenceSnapshot:
+    """Tablas de referencia en memoria, indexadas por nombre normalizado y código legacy."""
+
+    def __init__(self, data: dict):
+        self.clinic_id = data.get("clinic_id")
+        self.generated_at = data.get("generated_at")
+        self.fingerprint = data.get("fingerprint", {})
+        self._rows: dict[str, list[dict]] = {}
+        self._by_name: dict[str, dict[str, list[dict]]] = {}
+        self._by_code: dict[str, dict[str, list[dict]]] = {}
+        for table, content in data.get("tables", {}).items():
+            columns = content["columns"]
+            rows = [dict(zip(columns, values)) for values in content["rows"]]
+            by_name: dict[str, list[dict]] = {}
+            by_code: dict[str, list[dict]] = {}
+            for row in rows:
+                by_name.setdefault(normalize_name(row["name"]), []).append(row)
+                if row["legacy_code"]:
+                    by_code.setdefault(row["legacy_code"], []).append(row)
+            self._rows[table] = rows
+            self._by_name[table] = by_name
+            self._by_code[table] = by_code
+
+    @classmethod
+    def load(cls, path: str) -> "ReferenceSnapshot | None":
+        """Carga un snapshot guardado. None si no existe o es de otra versión."""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != SNAPSHOT_VERSION:
+            return None
+        return cls(data)
+
+    def rows(self, table: str) -> list[dict]:
+        """Todas las filas de una tabla del snapshot."""
+        return self._rows.get(table, [])
+
+    def find_all(self, table: str, name: str | None = None, legacy_code=None, **filters) -> list[dict]:
+        """
+        Filas que coinciden por código legacy (si se indica) o por nombre
+        normalizado, y además con los filtros exactos (p.ej. site_id=...).
+        """
+        if legacy_code is not None:
+            candidates = self._by_code.get(table, {}).get(str(legacy_code), [])
+        elif name is not None:
+            candidates = self._by_name.get(table, {}).get(normalize_name(name), [])
+        else:
+            candidates = self.rows(table)
+        return [row for row in candidates if all(row.get(k) == v for k, v in filters.items())]
+
+    def find(self, table: str, name: str | None = None, legacy_code=None, **filters) -> dict | None:
+        """Primera fila que coincide (ver find_all), o None."""
+        matches = self.find_all(table, name=name, legacy_code=legacy_code, **filters)
+        return matches[0] if matches else None
+
+
+def load_reference_snapshot(path: str, clinic_id: str, site_ids: list[str],
+                            check_fingerprint: bool = True) -> ReferenceSnapshot:
+    """
+    Snapshot de la clínica, cargado una sola vez por proceso.
+
+    La primera carga compara la huella de las tablas con la del archivo
+    y lo regenera si cambió (o si no existe). Las siguientes devuelven el
+    snapshot en memoria sin consultar la BD, hasta que se llame a
+    reset_reference_snapshots().
+    """
+    with _lock:
+        snapshot = _loaded.get(path)
+        if snapshot is not None:
+            return snapshot
+
+        snapshot = ReferenceSnapshot.load(path)
+        if snapshot is None or snapshot.clinic_id != clinic_id:
+            snapshot = write_snapshot(path, clinic_id, site_ids)
+        elif check_fingerprint and snapshot.fingerprint != tables_fingerprint(
+                clinic_id, site_ids, list(snapshot.fingerprint)):
+            snapshot = write_snapshot(path, clinic_id, site_ids)
+
+        _loaded[path] = snapshot
+        return snapshot
+
+
+def reset_reference_snapshots():
+    """Olvida los snapshots cargados en este proceso (se recargan y verifican al próximo uso)."""
+    with _lock:
+        _loaded.clear()
@@ -5,25 +5,53 @@ Soporta:
 - Bucket GENERAL: archivos mutables (fotos de perfil, etc.)
 - Bucket WORM: archivos inmutables (consentimientos firmados, evidencias)
 
+Backends (OBJECT_STORAGE_PROVIDER):
+- aws-s3 / minio: S3Client (default)
+- local: LocalStorageClient, emula los buckets en el filesystem
+
 Configuración via .env:
+- OBJECT_STORAGE_PROVIDER
+- OBJECT_STORAGE_LOCAL_PATH (solo provider local)
 - AWS_ACCESS_KEY_ID
 - AWS_SECRET_ACCESS_KEY
 - AWS_REGION
 - OBJECT_STORAGE_S3_BUCKET_GENERAL
 - OBJECT_STORAGE_S3_BUCKET_WORM
 - OBJECT_STORAGE_S3_ENDPOINT (opcional)
+- OBJECT_STORAGE_UPLOAD_WORKERS (opcional, subidas en lote)
+- OBJECT_STORAGE_MULTIPART_THRESHOLD_MB (opcional)
+- OBJECT_STORAGE_MULTIPART_CHUNKSIZE_MB (opcional)
+- OBJECT_STORAGE_MAX_CONCURRENCY (opcional)
+- OBJECT_STORAGE_UPLOAD_MAX_MB_PER_SEC (opcional, límite global de subida, 0 = sin límite)
+- OBJECT_STORAGE_ADAPTIVE_CONCURRENCY (opcional, true/false)
 """
 
+import io
 import os
+import hmac
+import json
+import time
+import hashlib
+import mmap
 import mimetypes
-from typing import Literal
-from dataclasses import dataclass
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import datetime
+from typing import BinaryIO, Callable, Iterable, Literal
+from urllib.parse import parse_qs, urlencode, urlparse
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
 
-import boto3
-from botocore.config import Config
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
+from config.aws import get_client, get_max_pool_connections
+from config.presign import PresignedUrlCache, SigV4Presigner
+from config.storage_throttle import AdaptiveConcurrency, TokenBucket, is_throttling_error
+from config.upload_journal import UploadJournal
+
 load_dotenv()
 
 
@@ -37,10 +65,22 @@ class StorageConfig:
     bucket_worm: str
     endpoint_url: str | None = None
     force_path_style: bool = False
+    upload_workers: int = 8
+    multipart_threshold_mb: int = 16
+    multipart_chunksize_mb: int = 16
+    max_concurrency: int = 4
+    provider: str = "aws-s3"
+    local_path: str | None = None
+    upload_max_mb_per_sec: float = 0.0
+    adaptive_concurrency: bool = False
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
 def get_storage_config() -> StorageConfig:
     """Obtiene la configuración de S3 desde variables de entorno."""
+    provider = os.getenv("OBJECT_STORAGE_PROVIDER", "aws-s3").strip().lower() or "aws-s3"
     access_key = os.getenv("AWS_ACCESS_KEY_ID", "").strip()
     secret_key = os.getenv("AWS_SECRET_ACCESS_KEY", "").strip()
     region = os.getenv("AWS_REGION", "eu-west-3").strip()
@@ -48,6 +88,30 @@ def get_storage_config() -> StorageConfig:
     bucket_worm = os.getenv("OBJECT_STORAGE_S3_BUCKET_WORM", "").strip()
     endpoint = os.getenv("OBJECT_STORAGE_S3_ENDPOINT", "").strip() or None
     force_path = os.getenv("OBJECT_STORAGE_S3_FORCE_PATH_STYLE", "false").lower() == "true"
+    upload_workers = int(os.getenv("OBJECT_STORAGE_UPLOAD_WORKERS", "8"))
+    multipart_threshold = int(os.getenv("OBJECT_STORAGE_MULTIPART_THRESHOLD_MB", "16"))
+    multipart_chunksize = int(os.getenv("OBJECT_STORAGE_MULTIPART_CHUNKSIZE_MB", "16"))
+    max_concurrency = int(os.getenv("OBJECT_STORAGE_MAX_CONCURRENCY", "4"))
+    upload_max_mb_per_sec = float(os.getenv("OBJECT_STORAGE_UPLOAD_MAX_MB_PER_SEC", "0") or 0)
+    adaptive_concurrency = os.getenv("OBJECT_STORAGE_ADAPTIVE_CONCURRENCY", "false").lower() == "true"
+
+    if provider == "local":
+        local_path = os.getenv("OBJECT_STORAGE_LOCAL_PATH", "").strip() or os.path.join(ROOT_DIR, ".storage")
+        return StorageConfig(
+            access_key_id=access_key,
+            secret_access_key=secret_key,
+            region=region,
+            bucket_general=bucket_general or "general",
+            bucket_worm=bucket_worm or "worm",
+            upload_workers=upload_workers,
+            multipart_threshold_mb=multipart_threshold,
+            multipart_chunksize_mb=multipart_chunksize,
+            max_concurrency=max_concurrency,
+            provider=provider,
+            local_path=local_path,
+            upload_max_mb_per_sec=upload_max_mb_per_sec,
+            adaptive_concurrency=adaptive_concurrency,
+        )
 
     if not access_key:
         raise ValueError("AWS_ACCESS_KEY_ID no configurado en .env")
@@ -66,33 +130,359 @@ def get_storage_config() -> StorageConfig:
         bucket_worm=bucket_worm,
         endpoint_url=endpoint,
         force_path_style=force_path,
+        upload_workers=upload_workers,
+        multipart_threshold_mb=multipart_threshold,
+        multipart_chunksize_mb=multipart_chunksize,
+        max_concurrency=max_concurrency,
+        provider=provider,
+        upload_max_mb_per_sec=upload_max_mb_per_sec,
+        adaptive_concurrency=adaptive_concurrency,
     )
 
 
-class S3Client:
-    """Cliente para operaciones S3."""
+# =============================================================================
+# Subidas en lote
+# =============================================================================
+
+@dataclass
+class UploadItem:
+    """Archivo a subir dentro de un lote."""
+    file_path: str
+    key: str
+    bucket_type: Literal["general", "worm"] = "general"
+    content_type: str | None = None
+    metadata: dict | None = None
+
+
+@dataclass
+class UploadResult:
+    """Resultado de la subida de un archivo del lote."""
+    item: UploadItem
+    success: bool
+    url: str | None = None
+    size: int = 0
+    elapsed: float = 0.0
+    error: str | None = None
+    checksum: str | None = None
+
+
+@dataclass
+class UploadProgress:
+    """Progreso agregado de un lote (se pasa al progress_callback)."""
+    files_total: int
+    bytes_total: int
+    files_done: int = 0
+    files_failed: int = 0
+    bytes_done: int = 0
+    elapsed: float = 0.0
+
+
+@dataclass
+class BatchUploadReport:
+    """Resumen de un lote de subidas."""
+    results: list[UploadResult] = field(default_factory=list)
+    elapsed: float = 0.0
+    skipped: list[UploadItem] = field(default_factory=list)
+    max_mb_per_sec: float = 0.0
+    peak_concurrency: int = 0
+    throttled: int = 0
+
+    @property
+    def succeeded(self) -> list[UploadResult]:
+        return [r for r in self.results if r.success]
+
+    @property
+    def failed(self) -> list[UploadResult]:
+        return [r for r in self.results if not r.success]
+
+    @property
+    def total_bytes(self) -> int:
+        """Bytes subidos correctamente."""
+        return sum(r.size for r in self.results if r.success)
+
+    @property
+    def files_per_second(self) -> float:
+        return len(self.succeeded) / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.total_bytes / (1024 * 1024) / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        """Resumen en una línea para logs."""
+        text = (
+            f"{len(self.succeeded)} subidos, {len(self.failed)} fallidos, "
+            f"{len(self.skipped)} omitidos "
+            f"en {self.elapsed:.1f}s "
+            f"({self.files_per_second:.1f} archivos/s, {self.mb_per_second:.2f} MB/s)"
+        )
+        if self.max_mb_per_sec:
+            text += f" [límite {self.max_mb_per_sec:.2f} MB/s]"
+        if self.peak_concurrency:
+            text += f" [concurrencia máx. {self.peak_concurrency}, {self.throttled} throttling]"
+        return text
+
+
+@dataclass
+class BatchDeleteReport:
+    """Resumen de un borrado en lote."""
+    bucket_type: str
+    requested: int = 0
+    deleted: list[str] = field(default_factory=list)
+    errors: dict[str, str] = field(default_factory=dict)
+    skipped_worm: int = 0
+    dry_run: bool = False
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        """Resumen en una línea para logs."""
+        if self.dry_run:
+            return f"[dry-run] {self.requested} objetos se borrarían del bucket {self.bucket_type}"
+        text = (
+            f"{len(self.deleted)} borrados, {len(self.errors)} con error "
+            f"de {self.requested} en bucket {self.bucket_type} ({self.elapsed:.1f}s)"
+        )
+        if self.skipped_worm:
+            text += f", {self.skipped_worm} omitidos (bucket WORM protegido)"
+        return text
+
+
+@dataclass
+class RemoteObject:
+    """Objeto existente en el bucket (resultado de list_objects)."""
+    key: str
+    size: int
+    etag: str
+
+
+def compute_etag(file_path: str, multipart_threshold: int, multipart_chunksize: int) -> str:
+    """
+    Calcula el ETag que S3 asignaría al archivo al subirlo.
+
+    - Subida simple: MD5 del contenido
+    - Multipart: MD5 de los MD5 de cada parte + "-{n_partes}"
+
+    Nota: no aplica a objetos cifrados con SSE-KMS (su ETag no es un MD5).
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        if size < multipart_threshold:
+            md5 = hashlib.md5()
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                md5.update(chunk)
+            return md5.hexdigest()
+
+        part_digests = []
+        for chunk in iter(lambda: f.read(multipart_chunksize), b""):
+            part_digests.append(hashlib.md5(chunk).digest())
+        combined = hashlib.md5(b"".join(part_digests)).hexdigest()
+        return f"{combined}-{len(part_digests)}"
+
+
+def common_key_prefix(keys: list[str]) -> str:
+    """Prefijo común de un conjunto de keys, cortado en el último '/'."""
+    if not keys:
+        return ""
+    prefix = os.path.commonprefix(keys)
+    return prefix[:prefix.rfind("/") + 1]
+
+
+class StreamReader(io.RawIOBase):
+    """
+    File object de solo lectura sobre un buffer o un generador de bloques.
+
+    Copia los datos directamente al buffer del lector (readinto), o una
+    sola vez a bytes (read), sin concatenar el contenido completo en
+    memoria. No es seekable, por lo que boto3 lo lee secuencialmente y
+    solo mantiene en memoria las partes multipart en curso.
+    """
+
+    def __init__(self, source: bytes | bytearray | memoryview | Iterable[bytes]):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._view = memoryview(source).cast("B")
+            self._chunks = None
+        else:
+            self._view = memoryview(b"")
+            self._chunks = iter(source)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _take(self, size: int):
+        """Genera vistas consecutivas del origen hasta sumar size bytes (o EOF)."""
+        while size > 0:
+            if self._pos >= len(self._view):
+                if self._chunks is None:
+                    return
+                try:
+                    self._view = memoryview(next(self._chunks)).cast("B")
+                except StopIteration:
+                    self._chunks = None
+                    return
+                self._pos = 0
+                continue
+            piece = self._view[self._pos:self._pos + size]
+            self._pos += len(piece)
+            size -= len(piece)
+            yield piece
+
+    def read(self, size: int = -1) -> bytes:
+        # RawIOBase.read crea un bytearray y lo vuelve a copiar a bytes (dos
+        # copias de cada parte multipart); aquí se copia una sola vez.
+        if size is None or size < 0:
+            return self.readall()
+        return b"".join(self._take(size))
+
+    def readinto(self, buffer) -> int:
+        # Llena el buffer completo (salvo EOF): boto3 usa cada read() como
+        # una parte multipart y S3 exige partes de al menos 5 MB.
+        buffer = memoryview(buffer).cast("B")
+        filled = 0
+        for piece in self._take(len(buffer)):
+            buffer[filled:filled + len(piece)] = piece
+            filled += len(piece)
+        return filled
+
+
+class ChecksumReader(StreamReader):
+    """
+    StreamReader que calcula el SHA-256 del contenido en la misma pasada
+    en que boto3 lo lee para subirlo (sin segunda lectura del archivo).
+
+    Sobre un buffer (p.ej. la vista de un mmap) es seekable: boto3 conoce
+    el tamaño de antemano y lee las partes directamente de la vista, sin
+    acumular el stream en memoria. Las relecturas tras un seek (reintentos,
+    cálculo del checksum de botocore) no se vuelven a sumar al hash.
+    """
+
+    def __init__(self, source: bytes | bytearray | memoryview | Iterable[bytes]):
+        super().__init__(source)
+        self._sha256 = hashlib.sha256()
+        self._seekable = self._chunks is None
+        self._hashed = 0  # Bytes desde el inicio ya incluidos en el hash
+
+    def seekable(self) -> bool:
+        return self._seekable
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if not self._seekable:
+            return super().seek(offset, whence)
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"whence inválido: {whence}")
+        if offset < 0:
+            raise ValueError(f"Posición negativa: {offset}")
+        self._pos = offset
+        return self._pos
+
+    def tell(self) -> int:
+        if not self._seekable:
+            return super().tell()
+        return self._pos
+
+    def _take(self, size: int):
+        for piece in super()._take(size):
+            if not self._seekable:
+                self._sha256.update(piece)
+            else:
+                end = self._pos
+                if end - len(piece) <= self._hashed < end:
+                    self._sha256.update(self._view[self._hashed:end])
+                    self._hashed = end
+            yield piece
+
+    def _hash_remaining(self):
+        # Tramos que el lector saltó con seek (sobre un buffer)
+        if self._seekable and not self.closed and self._hashed < len(self._view):
+            self._sha256.update(self._view[self._hashed:])
+            self._hashed = len(self._view)
+
+    def hexdigest(self) -> str:
+        """SHA-256 (hex) de lo leído hasta ahora (sobre un buffer: del contenido completo)."""
+        self._hash_remaining()
+        return self._sha256.hexdigest()
+
+    def close(self):
+        # s3transfer cierra el file object al terminar: completar el hash
+        # antes de liberar la vista (necesario para cerrar el mmap de origen)
+        self._hash_remaining()
+        self._view.release()
+        super().close()
+
+
+@contextmanager
+def mapped_file(file_path: str):
+    """
+    Vista de solo lectura (mmap) de un archivo local: las páginas se leen
+    del page cache bajo demanda, sin copiar el archivo a buffers de Python.
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield memoryview(b"")
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+
+
+class StorageClient(ABC):
+    """
+    Interfaz común de almacenamiento de objetos.
+
+    Implementaciones:
+    - S3Client: AWS S3 o compatible (MinIO)
+    - LocalStorageClient: filesystem local, para tests y benchmarks sin bucket
+
+    Las operaciones de lote (upload_many, sync_many) se implementan aquí
+    sobre las primitivas de cada backend.
+    """
+
+    THROTTLE_RETRIES = 3  # Reintentos por archivo ante SlowDown/503 (concurrencia adaptativa)
 
     def __init__(self, config: StorageConfig | None = None):
         self.config = config or get_storage_config()
-        self._client = None
+        self._transfer_config = None
+        self._lock = threading.Lock()
+        self.presigned_url_cache = PresignedUrlCache()
 
     @property
-    def client(self):
-        """Lazy initialization del cliente S3."""
-        if self._client is None:
-            boto_config = Config(
-                region_name=self.config.region,
-                s3={"addressing_style": "path" if self.config.force_path_style else "auto"},
-            )
-            self._client = boto3.client(
-                "s3",
-                aws_access_key_id=self.config.access_key_id,
-                aws_secret_access_key=self.config.secret_access_key,
-                region_name=self.config.region,
-                endpoint_url=self.config.endpoint_url,
-                config=boto_config,
+    def multipart_threshold(self) -> int:
+        """Tamaño (bytes) a partir del cual una subida es multipart."""
+        return self.config.multipart_threshold_mb * 1024 * 1024
+
+    @property
+    def multipart_chunksize(self) -> int:
+        """Tamaño (bytes) de cada parte multipart."""
+        return self.config.multipart_chunksize_mb * 1024 * 1024
+
+    @property
+    def transfer_config(self):
+        """
+        TransferConfig de boto3 (umbral y concurrencia multipart), importado en el primer uso.
+
+        Las partes leídas por adelantado se limitan a max_concurrency (el
+        default de s3transfer es 10): la memoria de una subida queda
+        acotada por max_concurrency x multipart_chunksize.
+        """
+        if self._transfer_config is None:
+            from boto3.s3.transfer import TransferConfig
+
+            self._transfer_config = TransferConfig(
+                multipart_threshold=self.multipart_threshold,
+                multipart_chunksize=self.multipart_chunksize,
+                max_concurrency=self.config.max_concurrency,
+                max_io_queue=self.config.max_concurrency,
             )
-        return self._client
+            # boto3 no lo acepta en el constructor (es atributo de s3transfer)
+            self._transfer_config.max_in_memory_upload_chunks = self.config.max_concurrency
+        return self._transfer_config
 
     def get_bucket(self, bucket_type: Literal["general", "worm"]) -> str:
         """Obtiene el nombre del bucket según el tipo."""
@@ -100,6 +490,416 @@ class S3Client:
             return self.config.bucket_worm
         return self.config.bucket_general
 
+    def upload_many(
+        self,
+        items: list[UploadItem],
+        max_workers: int | None = None,
+        progress_callback: Callable[[UploadProgress], None] | None = None,
+        journal: UploadJournal | None = None,
+        max_mb_per_sec: float | None = None,
+        adaptive: bool | None = None,
+    ) -> BatchUploadReport:
+        """
+        Sube un lote de archivos en paralelo.
+
+        Un error en un archivo no aborta el lote: cada archivo tiene su
+        UploadResult con el error correspondiente.
+
+        Args:
+            items: Archivos a subir
+            max_workers: Subidas simultáneas (default: OBJECT_STORAGE_UPLOAD_WORKERS)
+            progress_callback: Recibe un UploadProgress agregado en cada avance.
+                Se invoca desde los hilos de subida.
+            journal: Journal de subidas completadas. Los archivos ya registrados
+                (misma key y tamaño) se omiten sin consultar el bucket, y cada subida
+                correcta se registra con su SHA-256 (calculado durante la subida,
+                ver upload_file_checksummed; también queda en UploadResult.checksum).
+            max_mb_per_sec: Límite global de subida en MB/s para todo el lote
+                (default: OBJECT_STORAGE_UPLOAD_MAX_MB_PER_SEC; 0 = sin límite)
+            adaptive: Concurrencia adaptativa: empieza con 2 subidas simultáneas,
+                sube hasta max_workers mientras el throughput mejora y se reduce
+                a la mitad ante SlowDown/503 (el archivo se reintenta).
+                Default: OBJECT_STORAGE_ADAPTIVE_CONCURRENCY
+
+        Returns:
+            BatchUploadReport con resultados por archivo y throughput
+        """
+        max_workers = max_workers or self.config.upload_workers
+        if max_mb_per_sec is None:
+            max_mb_per_sec = self.config.upload_max_mb_per_sec
+        if adaptive is None:
+            adaptive = self.config.adaptive_concurrency
+
+        bandwidth = TokenBucket(max_mb_per_sec * 1024 * 1024) if max_mb_per_sec else None
+        concurrency = AdaptiveConcurrency(max_workers) if adaptive else None
+
+        sizes = {}
+        for item in items:
+            try:
+                sizes[id(item)] = os.path.getsize(item.file_path)
+            except OSError:
+                sizes[id(item)] = 0
+
+        skipped = []
+        if journal is not None:
+            skipped = [i for i in items if journal.is_done(i.bucket_type, i.key, sizes[id(i)])]
+            done_ids = {id(i) for i in skipped}
+            items = [i for i in items if id(i) not in done_ids]
+
+        progress = UploadProgress(
+            files_total=len(items),
+            bytes_total=sum(sizes[id(i)] for i in items),
+        )
+        progress_lock = threading.Lock()
+        start = time.perf_counter()
+
+        def notify(bytes_delta: int = 0, done: bool = False, failed: bool = False):
+            if progress_callback is None:
+                return
+            with progress_lock:
+                progress.bytes_done += bytes_delta
+                progress.files_done += 1 if done else 0
+                progress.files_failed += 1 if failed else 0
+                progress.elapsed = time.perf_counter() - start
+                progress_callback(progress)
+
+        def on_bytes(n: int):
+            if bandwidth is not None:
+                bandwidth.consume(n)
+            if concurrency is not None:
+                concurrency.add_bytes(n)
+            notify(bytes_delta=n)
+
+        def upload_with_backoff(item: UploadItem) -> tuple[str, str]:
+            if concurrency is None:
+                return self.upload_file_checksummed(
+                    item.file_path,
+                    item.key,
+                    bucket_type=item.bucket_type,
+                    content_type=item.content_type,
+                    metadata=item.metadata,
+                    callback=on_bytes,
+                )
+            for attempt in range(self.THROTTLE_RETRIES + 1):
+                sent = [0]
+
+                def on_attempt_bytes(n: int):
+                    sent[0] += n
+                    on_bytes(n)
+
+                try:
+                    with concurrency:
+                        return self.upload_file_checksummed(
+                            item.file_path,
+                            item.key,
+                            bucket_type=item.bucket_type,
+                            content_type=item.content_type,
+                            metadata=item.metadata,
+                            callback=on_attempt_bytes,
+                        )
+                except Exception as e:
+                    if not is_throttling_error(e) or attempt == self.THROTTLE_RETRIES:
+                        raise
+                    # Descontar del progreso lo enviado en el intento fallido
+                    notify(bytes_delta=-sent[0])
+                    concurrency.on_throttle()
+                    time.sleep(2 ** attempt)
+
+        def upload_one(item: UploadItem) -> UploadResult:
+            item_start = time.perf_counter()
+            try:
+                url, checksum = upload_with_backoff(item)
+                if journal is not None:
+                    journal.record(item.bucket_type, item.key, sizes[id(item)], checksum)
+                notify(done=True)
+                return UploadResult(
+                    item=item,
+                    success=True,
+                    url=url,
+                    size=sizes[id(item)],
+                    elapsed=time.perf_counter() - item_start,
+                    checksum=checksum,
+                )
+            except Exception as e:
+                notify(done=True, failed=True)
+                return UploadResult(
+                    item=item,
+                    success=False,
+                    size=sizes[id(item)],
+                    elapsed=time.perf_counter() - item_start,
+                    error=str(e),
+                )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(upload_one, item) for item in items]
+            report = BatchUploadReport(
+                results=[future.result() for future in futures],
+                skipped=skipped,
+                max_mb_per_sec=max_mb_per_sec or 0.0,
+            )
+
+        report.elapsed = time.perf_counter() - start
+        if concurrency is not None:
+            report.peak_concurrency = concurrency.peak
+            report.throttled = concurrency.throttled
+        return report
+
+    def sync_many(
+        self,
+        items: list[UploadItem],
+        prefix: str | None = None,
+        compare: Literal["etag", "size"] = "etag",
+        max_workers: int | None = None,
+        progress_callback: Callable[[UploadProgress], None] | None = None,
+        journal: UploadJournal | None = None,
+    ) -> BatchUploadReport:
+        """
+        Sube solo los archivos nuevos o modificados (modo sync).
+
+        En lugar de un head_object por archivo, lista una sola vez el prefijo
+        destino de cada bucket y compara tamaño (y ETag si compare="etag")
+        contra los archivos locales. Los archivos sin cambios quedan en
+        report.skipped.
+
+        Args:
+            items: Archivos a sincronizar
+            prefix: Prefijo a listar (default: prefijo común de las keys)
+            compare: "etag" (tamaño + MD5/ETag) o "size" (solo tamaño)
+            max_workers: Subidas simultáneas
+            progress_callback: Ver upload_many
+            journal: Ver upload_many
+
+        Returns:
+            BatchUploadReport con los omitidos en report.skipped
+        """
+        start = time.perf_counter()
+        max_workers = max_workers or self.config.upload_workers
+
+        by_bucket: dict[str, list[UploadItem]] = {}
+        for item in items:
+            by_bucket.setdefault(item.bucket_type, []).append(item)
+
+        indexes = {
+            bucket_type: self.list_objects(
+                prefix if prefix is not None else common_key_prefix([i.key for i in bucket_items]),
+                bucket_type=bucket_type,
+            )
+            for bucket_type, bucket_items in by_bucket.items()
+        }
+
+        def is_unchanged(item: UploadItem) -> bool:
+            remote = indexes[item.bucket_type].get(item.key)
+            if remote is None:
+                return False
+            try:
+                if os.path.getsize(item.file_path) != remote.size:
+                    return False
+                if compare == "size":
+                    return True
+                local_etag = compute_etag(
+                    item.file_path,
+                    self.multipart_threshold,
+                    self.multipart_chunksize,
+                )
+            except OSError:
+                # Se deja que upload_many reporte el error del archivo
+                return False
+            return local_etag == remote.etag
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            unchanged = list(executor.map(is_unchanged, items))
+
+        pending = [item for item, same in zip(items, unchanged) if not same]
+        report = self.upload_many(
+            pending,
+            max_workers=max_workers,
+            progress_callback=progress_callback,
+            journal=journal,
+        )
+        report.skipped.extend(item for item, same in zip(items, unchanged) if same)
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def generate_presigned_urls(
+        self,
+        keys: list[str],
+        bucket_type: Literal["general", "worm"] = "general",
+        expiration: int = 3600,
+        use_cache: bool = True,
+    ) -> dict[str, str]:
+        """
+        Genera URLs firmadas para muchas keys en una pasada.
+
+        Las URLs se guardan en presigned_url_cache (LRU acotada, por key y
+        expiración) y se reutilizan hasta poco antes de expirar, así
+        regenerar un reporte no vuelve a firmar los mismos documentos.
+
+        Args:
+            keys: Keys de los objetos
+            bucket_type: "general" o "worm"
+            expiration: Validez de las URLs nuevas en segundos
+            use_cache: Si False, firma todas las keys de nuevo
+
+        Returns:
+            Dict key -> URL firmada (en el orden de keys)
+        """
+        urls = {}
+        missing = []
+        for key in keys:
+            url = self.presigned_url_cache.get(bucket_type, key, expiration) if use_cache else None
+            if url:
+                urls[key] = url
+            else:
+                missing.append(key)
+
+        if missing:
+            expires_at = time.time() + expiration
+            for key, url in self._presign_many(missing, bucket_type, expiration).items():
+                urls[key] = url
+                if use_cache:
+                    self.presigned_url_cache.put(bucket_type, key, expiration, url, expires_at)
+
+        return {key: urls[key] for key in keys}
+
+    def _presign_many(
+        self,
+        keys: list[str],
+        bucket_type: Literal["general", "worm"],
+        expiration: int,
+    ) -> dict[str, str]:
+        """Firma varias keys (por defecto, una llamada por key)."""
+        return {key: self.generate_presigned_url(key, bucket_type, expiration) for key in keys}
+
+    DELETE_BATCH_SIZE = 1000  # Máximo de keys por request delete_objects
+
+    def delete_many(
+        self,
+        keys: list[str],
+        bucket_type: Literal["general", "worm"] = "general",
+        dry_run: bool = False,
+        allow_worm: bool = False,
+        max_workers: int | None = None,
+    ) -> BatchDeleteReport:
+        """
+        Borra una lista de objetos en lotes de 1000 keys, en paralelo.
+
+        El bucket WORM está protegido: sin allow_worm no se borra nada y
+        las keys se cuentan en skipped_worm. En S3 con Object Lock, borrar
+        sin VersionId solo agrega un delete marker; las versiones bloqueadas
+        se conservan hasta que vence su retención.
+
+        Args:
+            keys: Keys a borrar
+            bucket_type: "general" o "worm"
+            dry_run: Solo cuenta, no borra
+            allow_worm: Permite borrar en el bucket WORM
+            max_workers: Requests simultáneos (default: OBJECT_STORAGE_UPLOAD_WORKERS)
+
+        Returns:
+            BatchDeleteReport con borrados y errores por key
+        """
+        start = time.perf_counter()
+        keys = list(dict.fromkeys(keys))
+        report = BatchDeleteReport(bucket_type=bucket_type, requested=len(keys), dry_run=dry_run)
+
+        if bucket_type == "worm" and not allow_worm:
+            report.skipped_worm = len(keys)
+            return report
+        if dry_run or not keys:
+            return report
+
+        chunks = [
+            keys[i:i + self.DELETE_BATCH_SIZE]
+            for i in range(0, len(keys), self.DELETE_BATCH_SIZE)
+        ]
+        with ThreadPoolExecutor(max_workers=max_workers or self.config.upload_workers) as executor:
+            for deleted, errors in executor.map(
+                lambda chunk: self._delete_objects_chunk(chunk, bucket_type), chunks
+            ):
+                report.deleted.extend(deleted)
+                report.errors.update(errors)
+
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def delete_prefix(
+        self,
+        prefix: str,
+        bucket_type: Literal["general", "worm"] = "general",
+        dry_run: bool = False,
+        allow_worm: bool = False,
+        max_workers: int | None = None,
+    ) -> BatchDeleteReport:
+        """
+        Borra todos los objetos bajo un prefijo (un listado + delete_many).
+
+        Raises:
+            ValueError: Si el prefijo está vacío (borraría el bucket completo)
+        """
+        if not prefix.strip("/"):
+            raise ValueError("Prefijo vacío: no se permite borrar el bucket completo")
+        keys = list(self.list_objects(prefix, bucket_type=bucket_type))
+        return self.delete_many(
+            keys,
+            bucket_type=bucket_type,
+            dry_run=dry_run,
+            allow_worm=allow_worm,
+            max_workers=max_workers,
+        )
+
+    def _delete_objects_chunk(
+        self,
+        keys: list[str],
+        bucket_type: Literal["general", "worm"],
+    ) -> tuple[list[str], dict[str, str]]:
+        """Borra un lote de keys. Retorna (borradas, errores por key)."""
+        deleted, errors = [], {}
+        for key in keys:
+            if self.delete_file(key, bucket_type):
+                deleted.append(key)
+            else:
+                errors[key] = "Objeto protegido (WORM)" if bucket_type == "worm" else "No se pudo borrar"
+        return deleted, errors
+
+    def upload_file_checksummed(
+        self,
+        file_path: str,
+        key: str,
+        bucket_type: Literal["general", "worm"] = "general",
+        content_type: str | None = None,
+        metadata: dict | None = None,
+        callback: Callable[[int], None] | None = None,
+    ) -> tuple[str, str]:
+        """
+        Sube un archivo calculando su SHA-256 en la misma lectura.
+
+        El archivo se mapea en memoria (mmap) y se sube a través de un
+        ChecksumReader seekable sobre el mapa; en S3 el checksum también se envía
+        (ChecksumAlgorithm=SHA256) para que el bucket verifique la subida.
+
+        Returns:
+            (URL del objeto, SHA-256 hex del archivo)
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Archivo no encontrado: {file_path}")
+
+        if content_type is None:
+            content_type, _ = mimetypes.guess_type(file_path)
+            content_type = content_type or "application/octet-stream"
+
+        with mapped_file(file_path) as view:
+            reader = ChecksumReader(view)
+            try:
+                url = self.upload_stream(reader, key, bucket_type, content_type, metadata, callback)
+                return url, reader.hexdigest()
+            finally:
+                reader.close()
+
+    # -------------------------------------------------------------------------
+    # Primitivas que implementa cada backend
+    # -------------------------------------------------------------------------
+
+    @abstractmethod
     def upload_file(
         self,
         file_path: str,
@@ -107,6 +907,105 @@ class S3Client:
         bucket_type: Literal["general", "worm"] = "general",
         content_type: str | None = None,
         metadata: dict | None = None,
+        callback: Callable[[int], None] | None = None,
+    ) -> str:
+        """Sube un archivo. Retorna la URL del objeto."""
+
+    @abstractmethod
+    def upload_bytes(
+        self,
+        data: bytes,
+        key: str,
+        bucket_type: Literal["general", "worm"] = "general",
+        content_type: str = "application/octet-stream",
+        metadata: dict | None = None,
+    ) -> str:
+        """Sube bytes directamente. Retorna la URL del objeto."""
+
+    @abstractmethod
+    def upload_stream(
+        self,
+        source: BinaryIO | bytes | bytearray | memoryview | Iterable[bytes],
+        key: str,
+        bucket_type: Literal["general", "worm"] = "general",
+        content_type: str = "application/octet-stream",
+        metadata: dict | None = None,
+        callback: Callable[[int], None] | None = None,
+    ) -> str:
+        """Sube un stream sin materializarlo en memoria. Retorna la URL del objeto."""
+
+    @abstractmethod
+    def list_objects(
+        self,
+        prefix: str = "",
+        bucket_type: Literal["general", "worm"] = "general",
+    ) -> dict[str, RemoteObject]:
+        """Lista los objetos bajo un prefijo (key -> RemoteObject)."""
+
+    @abstractmethod
+    def file_exists(self, key: str, bucket_type: Literal["general", "worm"] = "general") -> bool:
+        """Verifica si un objeto existe."""
+
+    @abstractmethod
+    def get_public_url(self, key: str, bucket_type: Literal["general", "worm"] = "general") -> str:
+        """URL pública del objeto."""
+
+    @abstractmethod
+    def generate_presigned_url(
+        self,
+        key: str,
+        bucket_type: Literal["general", "worm"] = "general",
+        expiration: int = 3600,
+    ) -> str:
+        """URL firmada temporal para acceso al objeto."""
+
+    @abstractmethod
+    def delete_file(self, key: str, bucket_type: Literal["general", "worm"] = "general") -> bool:
+        """Elimina un objeto. Retorna True si se eliminó."""
+
+    @abstractmethod
+    def test_connection(self) -> tuple[bool, str]:
+        """Prueba el acceso al almacenamiento. Retorna (success, message)."""
+
+
+class S3Client(StorageClient):
+    """Cliente para operaciones S3."""
+
+    def __init__(self, config: StorageConfig | None = None):
+        super().__init__(config)
+        self._client = None
+        self._presigner = None
+
+    @property
+    def client(self):
+        """Lazy initialization del cliente S3 (thread-safe)."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = get_client(
+                        "s3",
+                        region_name=self.config.region,
+                        endpoint_url=self.config.endpoint_url,
+                        aws_access_key_id=self.config.access_key_id,
+                        aws_secret_access_key=self.config.secret_access_key,
+                        # Una conexión por worker del lote y parte multipart en curso,
+                        # sin bajar de AWS_MAX_POOL_CONNECTIONS
+                        max_pool_connections=max(
+                            self.config.upload_workers * self.config.max_concurrency,
+                            get_max_pool_connections(),
+                        ),
+                        s3={"addressing_style": "path" if self.config.force_path_style else "auto"},
+                    )
+        return self._client
+
+    def upload_file(
+        self,
+        file_path: str,
+        key: str,
+        bucket_type: Literal["general", "worm"] = "general",
+        content_type: str | None = None,
+        metadata: dict | None = None,
+        callback: Callable[[int], None] | None = None,
     ) -> str:
         """
         Sube un archivo a S3.
@@ -117,6 +1016,7 @@ class S3Client:
             bucket_type: "general" o "worm"
             content_type: MIME type (auto-detectado si no se especifica)
             metadata: Metadata adicional para el objeto
+            callback: Función llamada con los bytes transferidos en cada bloque
 
         Returns:
             URL del archivo subido (s3://bucket/key format)
@@ -146,6 +1046,8 @@ class S3Client:
             Bucket=bucket,
             Key=key,
             ExtraArgs=extra_args,
+            Callback=callback,
+            Config=self.transfer_config,
         )
 
         return f"s3://{bucket}/{key}"
@@ -188,6 +1090,82 @@ class S3Client:
 
         return f"s3://{bucket}/{key}"
 
+    def upload_stream(
+        self,
+        source: BinaryIO | bytes | bytearray | memoryview | Iterable[bytes],
+        key: str,
+        bucket_type: Literal["general", "worm"] = "general",
+        content_type: str = "application/octet-stream",
+        metadata: dict | None = None,
+        callback: Callable[[int], None] | None = None,
+    ) -> str:
+        """
+        Sube un stream sin materializar el contenido completo en memoria.
+
+        A partir de OBJECT_STORAGE_MULTIPART_THRESHOLD_MB se usa subida
+        multipart, por lo que el pico de memoria queda acotado por
+        tamaño de parte x concurrencia, independiente del tamaño del objeto.
+
+        Args:
+            source: File object (con read), bytes/bytearray/memoryview
+                o generador de bloques de bytes
+            key: Key (path) en S3
+            bucket_type: "general" o "worm"
+            content_type: MIME type
+            metadata: Metadata adicional
+            callback: Función llamada con los bytes transferidos en cada bloque
+
+        Returns:
+            URL del archivo subido
+        """
+        bucket = self.get_bucket(bucket_type)
+
+        fileobj = source if hasattr(source, "read") else StreamReader(source)
+
+        extra_args = {
+            "ContentType": content_type,
+        }
+        if metadata:
+            extra_args["Metadata"] = {k: str(v) for k, v in metadata.items()}
+        if isinstance(fileobj, ChecksumReader):
+            # S3 verifica el SHA-256 de cada request (checksum en trailer)
+            extra_args["ChecksumAlgorithm"] = "SHA256"
+
+        self.client.upload_fileobj(
+            Fileobj=fileobj,
+            Bucket=bucket,
+            Key=key,
+            ExtraArgs=extra_args,
+            Callback=callback,
+            Config=self.transfer_config,
+        )
+
+        return f"s3://{bucket}/{key}"
+
+    def list_objects(
+        self,
+        prefix: str = "",
+        bucket_type: Literal["general", "worm"] = "general",
+    ) -> dict[str, RemoteObject]:
+        """
+        Lista todos los objetos bajo un prefijo (list_objects_v2 paginado).
+
+        Returns:
+            Dict key -> RemoteObject, para búsquedas O(1) en memoria
+        """
+        bucket = self.get_bucket(bucket_type)
+        paginator = self.client.get_paginator("list_objects_v2")
+
+        index = {}
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                index[obj["Key"]] = RemoteObject(
+                    key=obj["Key"],
+                    size=obj["Size"],
+                    etag=obj["ETag"].strip('"'),
+                )
+        return index
+
     def file_exists(self, key: str, bucket_type: Literal["general", "worm"] = "general") -> bool:
         """Verifica si un archivo existe en S3."""
         bucket = self.get_bucket(bucket_type)
@@ -232,6 +1210,23 @@ class S3Client:
             ExpiresIn=expiration,
         )
 
+    def _presign_many(
+        self,
+        keys: list[str],
+        bucket_type: Literal["general", "worm"],
+        expiration: int,
+    ) -> dict[str, str]:
+        """Firma localmente (SigV4) todas las keys con una sola signing key."""
+        if self._presigner is None:
+            self._presigner = SigV4Presigner(
+                access_key_id=self.config.access_key_id,
+                secret_access_key=self.config.secret_access_key,
+                region=self.config.region,
+                endpoint_url=self.config.endpoint_url,
+                force_path_style=self.config.force_path_style,
+            )
+        return self._presigner.presign_many(self.get_bucket(bucket_type), keys, expiration)
+
     def delete_file(self, key: str, bucket_type: Literal["general", "worm"] = "general") -> bool:
         """
         Elimina un archivo de S3.
@@ -247,6 +1242,29 @@ class S3Client:
         except ClientError:
             return False
 
+    def _delete_objects_chunk(
+        self,
+        keys: list[str],
+        bucket_type: Literal["general", "worm"],
+    ) -> tuple[list[str], dict[str, str]]:
+        """Borra hasta 1000 keys con un solo request delete_objects."""
+        bucket = self.get_bucket(bucket_type)
+        try:
+            response = self.client.delete_objects(
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+            )
+        except ClientError as e:
+            message = e.response["Error"].get("Message", str(e))
+            return [], {key: message for key in keys}
+
+        # En modo Quiet S3 solo devuelve los errores
+        errors = {
+            err["Key"]: f"[{err.get('Code')}] {err.get('Message', '')}".strip()
+            for err in response.get("Errors", [])
+        }
+        return [key for key in keys if key not in errors], errors
+
     def test_connection(self) -> tuple[bool, str]:
         """
         Prueba la conexión a S3.
@@ -276,15 +1294,279 @@ class S3Client:
             return False, f"Error de conexión: {str(e)}"
 
 
+class LocalStorageClient(StorageClient):
+    """
+    Backend de almacenamiento en el filesystem local.
+
+    Emula la interfaz de S3Client para tests y benchmarks sin bucket real:
+    - Cada bucket es un directorio bajo OBJECT_STORAGE_LOCAL_PATH
+    - Content type, metadata y ETag se guardan en {raíz}/.meta/{bucket}/{key}.json
+    - Bucket WORM: los objetos no se pueden sobrescribir ni borrar
+    - URLs firmadas: file:// con expiración y firma HMAC (verify_presigned_url)
+    """
+
+    META_DIR = ".meta"
+    BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, config: StorageConfig | None = None):
+        super().__init__(config)
+        self.root = os.path.abspath(self.config.local_path or os.path.join(ROOT_DIR, ".storage"))
+
+    def _object_path(self, key: str, bucket_type: Literal["general", "worm"]) -> str:
+        """Ruta local del objeto (rechaza keys fuera del bucket)."""
+        bucket_dir = os.path.join(self.root, self.get_bucket(bucket_type))
+        path = os.path.normpath(os.path.join(bucket_dir, key))
+        if not path.startswith(bucket_dir + os.sep):
+            raise ValueError(f"Key inválida: {key}")
+        return path
+
+    def _meta_path(self, key: str, bucket_type: Literal["general", "worm"]) -> str:
+        """Ruta del JSON de metadata del objeto."""
+        return os.path.join(self.root, self.META_DIR, self.get_bucket(bucket_type), key + ".json")
+
+    def _read_meta(self, key: str, bucket_type: Literal["general", "worm"]) -> dict:
+        try:
+            with open(self._meta_path(key, bucket_type), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_object(
+        self,
+        fileobj: BinaryIO,
+        key: str,
+        bucket_type: Literal["general", "worm"],
+        content_type: str,
+        metadata: dict | None,
+        callback: Callable[[int], None] | None,
+    ) -> str:
+        """
+        Escribe el objeto de forma atómica (archivo temporal + rename)
+        calculando el ETag estilo S3 en la misma lectura.
+        """
+        path = self._object_path(key, bucket_type)
+        if bucket_type == "worm" and os.path.exists(path):
+            raise PermissionError(f"Objeto WORM inmutable, no se puede sobrescribir: {key}")
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp-{threading.get_ident()}"
+
+        threshold = self.multipart_threshold
+        chunksize = self.multipart_chunksize
+        whole_md5 = hashlib.md5()
+        part_md5 = hashlib.md5()
+        part_bytes = 0
+        part_digests = []
+        size = 0
+
+        try:
+            with open(tmp_path, "wb") as out:
+                for block in iter(lambda: fileobj.read(self.BLOCK_SIZE), b""):
+                    out.write(block)
+                    whole_md5.update(block)
+                    view = memoryview(block)
+                    while view:
+                        take = min(len(view), chunksize - part_bytes)
+                        part_md5.update(view[:take])
+                        part_bytes += take
+                        view = view[take:]
+                        if part_bytes == chunksize:
+                            part_digests.append(part_md5.digest())
+                            part_md5 = hashlib.md5()
+                            part_bytes = 0
+                    size += len(block)
+                    if callback:
+                        callback(len(block))
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        if size < threshold:
+            etag = whole_md5.hexdigest()
+        else:
+            if part_bytes:
+                part_digests.append(part_md5.digest())
+            etag = f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+
+        meta_path = self._meta_path(key, bucket_type)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "content_type": content_type,
+                "metadata": {k: str(v) for k, v in (metadata or {}).items()},
+                "size": size,
+                "etag": etag,
+                "uploaded_at": datetime.now().isoformat(),
+            }, f)
+
+        return f"file://{self.get_bucket(bucket_type)}/{key}"
+
+    def upload_file(
+        self,
+        file_path: str,
+        key: str,
+        bucket_type: Literal["general", "worm"] = "general",
+        content_type: str | None = None,
+        metadata: dict | None = None,
+        callback: Callable[[int], None] | None = None,
+    ) -> str:
+        """Copia un archivo al bucket local."""
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Archivo no encontrado: {file_path}")
+
+        if content_type is None:
+            content_type, _ = mimetypes.guess_type(file_path)
+            content_type = content_type or "application/octet-stream"
+
+        with open(file_path, "rb") as f:
+            return self._write_object(f, key, bucket_type, content_type, metadata, callback)
+
+    def upload_bytes(
+        self,
+        data: bytes,
+        key: str,
+        bucket_type: Literal["general", "worm"] = "general",
+        content_type: str = "application/octet-stream",
+        metadata: dict | None = None,
+    ) -> str:
+        """Escribe bytes en el bucket local."""
+        return self._write_object(StreamReader(data), key, bucket_type, content_type, metadata, None)
+
+    def upload_stream(
+        self,
+        source: BinaryIO | bytes | bytearray | memoryview | Iterable[bytes],
+        key: str,
+        bucket_type: Literal["general", "worm"] = "general",
+        content_type: str = "application/octet-stream",
+        metadata: dict | None = None,
+        callback: Callable[[int], None] | None = None,
+    ) -> str:
+        """Escribe un stream en el bucket local por bloques."""
+        fileobj = source if hasattr(source, "read") else StreamReader(source)
+        return self._write_object(fileobj, key, bucket_type, content_type, metadata, callback)
+
+    def list_objects(
+        self,
+        prefix: str = "",
+        bucket_type: Literal["general", "worm"] = "general",
+    ) -> dict[str, RemoteObject]:
+        """Lista los objetos del bucket local bajo un prefijo."""
+        bucket_dir = os.path.join(self.root, self.get_bucket(bucket_type))
+        # Directorio más profundo que contiene el prefijo
+        start_dir = os.path.join(bucket_dir, prefix[:prefix.rfind("/") + 1])
+
+        index = {}
+        for dirpath, _, filenames in os.walk(start_dir):
+            for filename in filenames:
+                if ".tmp-" in filename:
+                    continue
+                path = os.path.join(dirpath, filename)
+                key = os.path.relpath(path, bucket_dir).replace(os.sep, "/")
+                if not key.startswith(prefix):
+                    continue
+                meta = self._read_meta(key, bucket_type)
+                index[key] = RemoteObject(
+                    key=key,
+                    size=os.path.getsize(path),
+                    etag=meta.get("etag") or compute_etag(
+                        path,
+                        self.multipart_threshold,
+                        self.multipart_chunksize,
+                    ),
+                )
+        return index
+
+    def file_exists(self, key: str, bucket_type: Literal["general", "worm"] = "general") -> bool:
+        """Verifica si un objeto existe en el bucket local."""
+        return os.path.isfile(self._object_path(key, bucket_type))
+
+    def get_metadata(self, key: str, bucket_type: Literal["general", "worm"] = "general") -> dict:
+        """Metadata guardada del objeto (content_type, metadata, size, etag)."""
+        return self._read_meta(key, bucket_type)
+
+    def get_public_url(self, key: str, bucket_type: Literal["general", "worm"] = "general") -> str:
+        """URL file:// del objeto."""
+        return Path(self._object_path(key, bucket_type)).as_uri()
+
+    def _sign(self, url: str, expires: int) -> str:
+        secret = (self.config.secret_access_key or "local").encode()
+        return hmac.new(secret, f"{url}:{expires}".encode(), hashlib.sha256).hexdigest()
+
+    def generate_presigned_url(
+        self,
+        key: str,
+        bucket_type: Literal["general", "worm"] = "general",
+        expiration: int = 3600,
+    ) -> str:
+        """URL file:// con expiración y firma HMAC (estilo URL prefirmada)."""
+        url = self.get_public_url(key, bucket_type)
+        expires = int(time.time()) + expiration
+        query = urlencode({"X-Expires": expires, "X-Signature": self._sign(url, expires)})
+        return f"{url}?{query}"
+
+    def verify_presigned_url(self, presigned_url: str) -> bool:
+        """Verifica firma y expiración de una URL de generate_presigned_url."""
+        parsed = urlparse(presigned_url)
+        params = parse_qs(parsed.query)
+        try:
+            expires = int(params["X-Expires"][0])
+            signature = params["X-Signature"][0]
+        except (KeyError, ValueError):
+            return False
+        url = parsed._replace(query="").geturl()
+        return expires >= time.time() and hmac.compare_digest(signature, self._sign(url, expires))
+
+    def delete_file(self, key: str, bucket_type: Literal["general", "worm"] = "general") -> bool:
+        """
+        Elimina un objeto del bucket local.
+        Los objetos del bucket WORM no se pueden borrar (retorna False).
+        Igual que S3, borrar una key inexistente se considera correcto.
+        """
+        if bucket_type == "worm":
+            return False
+        try:
+            os.remove(self._object_path(key, bucket_type))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+        try:
+            os.remove(self._meta_path(key, bucket_type))
+        except OSError:
+            pass
+        return True
+
+    def test_connection(self) -> tuple[bool, str]:
+        """Verifica que los directorios de los buckets sean escribibles."""
+        try:
+            for bucket_type in ["general", "worm"]:
+                bucket_dir = os.path.join(self.root, self.get_bucket(bucket_type))
+                os.makedirs(bucket_dir, exist_ok=True)
+                if not os.access(bucket_dir, os.W_OK):
+                    return False, f"Sin permisos de escritura en '{bucket_dir}'"
+            return True, f"Almacenamiento local en {self.root}"
+        except OSError as e:
+            return False, f"Error de almacenamiento local: {e}"
+
+
+def create_storage_client(config: StorageConfig | None = None) -> StorageClient:
+    """Crea el cliente según OBJECT_STORAGE_PROVIDER ("local" o S3)."""
+    config = config or get_storage_config()
+    if config.provider == "local":
+        return LocalStorageClient(config)
+    return S3Client(config)
+
+
 # Instancia global para uso conveniente
-_storage_client: S3Client | None = None
+_storage_client: StorageClient | None = None
 
 
-def get_storage_client() -> S3Client:
-    """Obtiene la instancia global del cliente S3."""
+def get_storage_client() -> StorageClient:
+    """Obtiene la instancia global del cliente de almacenamiento."""
     global _storage_client
     if _storage_client is None:
-        _storage_client = S3Client()
+        _storage_client = create_storage_client()
     return _storage_client
 
 
@@ -329,12 +1611,13 @@ def equipment_photo_key(clinic_id: str, equipment_id: str, extension: str = "jpg
 # =============================================================================
 
 if __name__ == "__main__":
-    print("Testing S3 connection...")
+    print("Testing storage connection...")
     try:
         client = get_storage_client()
         success, message = client.test_connection()
         if success:
             print(f"[OK] {message}")
+            print(f"  Provider: {client.config.provider}")
             print(f"  Bucket General: {client.config.bucket_general}")
             print(f"  Bucket WORM: {client.config.bucket_worm}")
             print(f"  Region: {client.config.region}")
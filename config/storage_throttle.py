@@ -0,0 +1,152 @@
+"""
+Control de ancho de banda y concurrencia para subidas en lote.
+
+- TokenBucket: límite global de bytes/s compartido por todos los hilos
+  de un lote (el TransferConfig.max_bandwidth de boto3 es por archivo).
+  Se aplica desde el callback de progreso de cada subida, que boto3
+  invoca a medida que lee el archivo para enviarlo.
+- AdaptiveConcurrency: número de subidas simultáneas que sube mientras
+  el throughput mejora y se reduce a la mitad ante throttling
+  (SlowDown / 503 / 429).
+"""
+
+import time
+import threading
+
+# Códigos de error de S3/AWS que indican throttling
+THROTTLING_CODES = {
+    "SlowDown",
+    "Throttling",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "RequestThrottled",
+    "ServiceUnavailable",
+    "TooManyRequests",
+    "503",
+}
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """Indica si una excepción de boto3 es throttling (SlowDown, 503, 429)."""
+    response = getattr(error, "response", None)
+    if not isinstance(response, dict):
+        return False
+    code = response.get("Error", {}).get("Code", "")
+    status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return code in THROTTLING_CODES or status in (429, 503)
+
+
+class TokenBucket:
+    """
+    Limitador de bytes/s (token bucket). Thread-safe.
+
+    consume() descuenta los bytes y, si el bucket queda en negativo,
+    duerme lo necesario para volver a la tasa configurada.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None):
+        """
+        Args:
+            rate: Bytes por segundo
+            burst: Bytes acumulables en reposo (default: 0.25 s de tasa)
+        """
+        self.rate = rate
+        self.capacity = burst if burst is not None else rate / 4
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount: int):
+        """Consume bytes del bucket, bloqueando si se excede la tasa."""
+        if amount <= 0:
+            # boto3 reporta bytes negativos al reintentar una parte
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """
+    Límite de subidas simultáneas ajustable (AIMD). Thread-safe.
+
+    Cada `window` segundos compara el throughput de la ventana con el de
+    la anterior: si mejoró al menos un `min_gain`, suma un slot. Ante
+    throttling divide el límite a la mitad y no vuelve a subir hasta la
+    siguiente ventana completa.
+    """
+
+    def __init__(
+        self,
+        maximum: int,
+        initial: int = 2,
+        minimum: int = 1,
+        window: float = 2.0,
+        min_gain: float = 0.05,
+    ):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = max(minimum, min(initial, maximum))
+        self.peak = self.limit
+        self.throttled = 0
+        self.window = window
+        self.min_gain = min_gain
+
+        self._active = 0
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._last_rate = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Espera un slot libre."""
+        with self._condition:
+            while self._active >= self.limit:
+                self._condition.wait()
+            self._active += 1
+
+    def release(self):
+        """Libera un slot."""
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def add_bytes(self, amount: int):
+        """Registra bytes transferidos y ajusta el límite al cerrar la ventana."""
+        with self._condition:
+            self._window_bytes += max(amount, 0)
+            now = time.monotonic()
+            elapsed = now - self._window_start
+            if elapsed < self.window:
+                return
+
+            rate = self._window_bytes / elapsed
+            if rate > self._last_rate * (1 + self.min_gain) and self.limit < self.maximum:
+                self.limit += 1
+                self.peak = max(self.peak, self.limit)
+                self._condition.notify_all()
+            self._last_rate = rate
+            self._window_start = now
+            self._window_bytes = 0
+
+    def on_throttle(self):
+        """Reduce el límite a la mitad tras un SlowDown/503."""
+        with self._condition:
+            self.throttled += 1
+            self.limit = max(self.minimum, self.limit // 2)
+            # Reiniciar la ventana; solo se vuelve a subir si se supera
+            # el throughput previo al throttling
+            self._window_start = time.monotonic()
+            self._window_bytes = 0
@@ -0,0 +1,117 @@
+"""
+Journal de subidas completadas para lotes de almacenamiento.
+
+Registra en SQLite cada objeto subido correctamente (key, bucket,
+tamaño y checksum). Si un lote se interrumpe (credenciales expiradas,
+portátil suspendido), al relanzarlo se omiten los archivos ya subidos
+sin consultar S3: el journal se carga en memoria al abrirlo y cada
+verificación es O(1).
+
+Ubicación por clínica: clinics/{clinica}/logs/{nombre}_journal.sqlite
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+CLINICS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "clinics")
+
+
+def get_clinic_journal_path(clinic_folder: str, name: str = "uploads") -> str:
+    """Ruta del journal de una clínica (crea logs/ si no existe)."""
+    logs_dir = os.path.join(CLINICS_DIR, clinic_folder, "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    return os.path.join(logs_dir, f"{name}_journal.sqlite")
+
+
+class UploadJournal:
+    """Journal durable (SQLite) de subidas completadas. Thread-safe."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS uploads (
+                bucket_type TEXT NOT NULL,
+                key TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                checksum TEXT,
+                uploaded_at TEXT NOT NULL,
+                PRIMARY KEY (bucket_type, key)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+        # Índice en memoria: (bucket_type, key) -> (size, checksum)
+        self._entries = {
+            (bucket_type, key): (size, checksum)
+            for bucket_type, key, size, checksum in self._conn.execute(
+                "SELECT bucket_type, key, size, checksum FROM uploads"
+            )
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def is_done(self, bucket_type: str, key: str, size: int | None = None) -> bool:
+        """
+        Indica si la key ya se subió en un lote anterior.
+
+        Si se pasa size, también debe coincidir con el tamaño registrado
+        (un archivo local modificado se vuelve a subir).
+        """
+        entry = self._entries.get((bucket_type, key))
+        if entry is None:
+            return False
+        return size is None or entry[0] == size
+
+    def get(self, bucket_type: str, key: str) -> dict | None:
+        """Obtiene el registro de una key (size, checksum) o None."""
+        entry = self._entries.get((bucket_type, key))
+        if entry is None:
+            return None
+        return {"size": entry[0], "checksum": entry[1]}
+
+    def record(self, bucket_type: str, key: str, size: int, checksum: str | None = None):
+        """Registra una subida completada (persistida inmediatamente)."""
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO uploads (bucket_type, key, size, checksum, uploaded_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (bucket_type, key, size, checksum, datetime.now().isoformat()),
+            )
+            self._conn.commit()
+            self._entries[(bucket_type, key)] = (size, checksum)
+
+    def forget(self, bucket_type: str, keys: list[str]) -> int:
+        """
+        Elimina keys del journal (p.ej. tras borrarlas del bucket), para que
+        un lote posterior las vuelva a subir. Retorna cuántas se eliminaron.
+        """
+        with self._lock:
+            present = [k for k in keys if (bucket_type, k) in self._entries]
+            self._conn.executemany(
+                "DELETE FROM uploads WHERE bucket_type = ? AND key = ?",
+                [(bucket_type, k) for k in present],
+            )
+            self._conn.commit()
+            for k in present:
+                del self._entries[(bucket_type, k)]
+            return len(present)
+
+    def close(self):
+        """Cierra la conexión SQLite."""
+        with self._lock:
+            self._conn.close()
@@ -1,8 +1,30 @@
 """
 Utilidades compartidas para scripts de migración.
 """
+import os
+import re
+import time
+import unicodedata
+import threading
+from datetime import datetime, timezone
+
 from ulid import ULID
 
+# Alfabeto base32 de Crockford (el mismo que usa ULID)
+CROCKFORD_BASE32 = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+# Tabla de 10 bits -> 2 caracteres: codifica un ULID con 13 lookups
+_PAIRS = [a + b for a in CROCKFORD_BASE32 for b in CROCKFORD_BASE32]
+
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+_TIMESTAMP_MAX = (1 << 48) - 1
+
+# Estado monotónico compartido por las llamadas a generate_ids del proceso
+_ulid_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
 
 def generate_id() -> str:
     """
@@ -17,3 +39,147 @@ def generate_id() -> str:
         str: ULID en formato string UPPERCASE
     """
     return str(ULID()).upper()
+
+
+def normalize_name(value) -> str:
+    """
+    Normaliza un nombre para compararlo: minúsculas, sin acentos ni
+    signos, con espacios simples ("  Fisioterapia  Avanzada " ->
+    "fisioterapia avanzada").
+    """
+    value = unicodedata.normalize("NFKD", str(value or ""))
+    value = "".join(c for c in value if not unicodedata.combining(c)).lower()
+    return " ".join(re.sub(r"[^a-z0-9 ]", " ", value).split())
+
+
+def _encode_timestamp(timestamp_ms: int) -> str:
+    """Codifica los 48 bits de timestamp en 10 caracteres base32."""
+    p = _PAIRS
+    return (
+        p[(timestamp_ms >> 40) & 1023] + p[(timestamp_ms >> 30) & 1023]
+        + p[(timestamp_ms >> 20) & 1023] + p[(timestamp_ms >> 10) & 1023]
+        + p[timestamp_ms & 1023]
+    )
+
+
+def generate_ids(n: int) -> list[str]:
+    """
+    Genera n ULIDs en lote, monotónicos.
+
+    Todos comparten el timestamp de la llamada y la parte aleatoria se
+    incrementa en 1 por ID (modo monotónico de la especificación ULID),
+    así que la lista queda ordenada y es estrictamente creciente también
+    respecto de llamadas anteriores del mismo proceso. El formato es el
+    mismo que generate_id (26 caracteres base32 en mayúsculas).
+
+    Returns:
+        list[str]: ULIDs ordenados
+    """
+    global _last_ms, _last_random
+
+    with _ulid_lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms <= _last_ms:
+            # Mismo milisegundo (o reloj atrasado): continuar la secuencia
+            timestamp_ms = _last_ms
+            random = _last_random + 1
+        else:
+            random = int.from_bytes(os.urandom(10), "big")
+
+        if random + n - 1 > _RANDOM_MAX:
+            # Desborde de los 80 bits: pasar al milisegundo siguiente
+            timestamp_ms += 1
+            random = int.from_bytes(os.urandom(10), "big") >> 1
+
+        _last_ms = timestamp_ms
+        _last_random = random + n - 1
+
+    prefix = _encode_timestamp(timestamp_ms)
+    p = _PAIRS
+    return [
+        prefix
+        + p[r >> 70] + p[(r >> 60) & 1023] + p[(r >> 50) & 1023] + p[(r >> 40) & 1023]
+        + p[(r >> 30) & 1023] + p[(r >> 20) & 1023] + p[(r >> 10) & 1023] + p[r & 1023]
+        for r in range(random, random + n)
+    ]
+
+
+def _timestamp_ms(value) -> int:
+    """
+    Milisegundos Unix de un timestamp de origen.
+
+    Acepta datetime, date, string ISO 8601, epoch en ms (int o float) o
+    None (ahora). Los datetime sin zona horaria se interpretan como UTC
+    para que el resultado no dependa de la máquina que migra.
+
+    Raises:
+        ValueError: Si el timestamp es anterior a 1970 o no entra en los
+            48 bits del ULID
+    """
+    if value is None:
+        timestamp_ms = time.time_ns() // 1_000_000
+    elif isinstance(value, (int, float)):
+        timestamp_ms = int(value)
+    else:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        if not isinstance(value, datetime):
+            value = datetime(value.year, value.month, value.day)
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        timestamp_ms = int(value.timestamp() * 1000)
+    if not 0 <= timestamp_ms <= _TIMESTAMP_MAX:
+        raise ValueError(f"Timestamp fuera del rango de un ULID (0 a 2^48 - 1 ms): {value!r}")
+    return timestamp_ms
+
+
+def generate_ids_at(timestamps: list) -> list[str]:
+    """
+    Genera un ULID por timestamp de origen (p.ej. created_at del registro).
+
+    El prefijo de tiempo del ULID es el del registro, no el de la
+    migración: insertar las filas ordenadas por created_at hace que el
+    índice de la PK crezca por el final (sin splits de páginas intermedias)
+    y los IDs quedan ordenados por tiempo de negocio.
+
+    Dentro de un mismo milisegundo los IDs son monotónicos (la parte
+    aleatoria se incrementa), en el orden en que aparecen en la lista.
+    Entre llamadas distintas no: cada llamada parte de un valor aleatorio
+    nuevo por milisegundo, así que dos registros con el mismo created_at
+    generados en llamadas separadas pueden quedar en cualquier orden.
+    Pasar en una sola llamada los registros cuyo orden importa.
+
+    Args:
+        timestamps: datetime/date/ISO string/epoch ms por registro (None = ahora)
+
+    Returns:
+        list[str]: ULIDs en el mismo orden que timestamps
+
+    Raises:
+        ValueError: Si algún timestamp es negativo o no entra en 48 bits
+    """
+    p = _PAIRS
+    sequences: dict[int, int] = {}
+    prefixes: dict[int, str] = {}
+    result = []
+    for value in timestamps:
+        timestamp_ms = _timestamp_ms(value)
+        r = sequences.get(timestamp_ms)
+        if r is None:
+            # Bit alto libre: margen para incrementar sin desbordar
+            r = int.from_bytes(os.urandom(10), "big") >> 1
+            prefixes[timestamp_ms] = _encode_timestamp(timestamp_ms)
+        else:
+            r += 1
+        sequences[timestamp_ms] = r
+        result.append(
+            prefixes[timestamp_ms]
+            + p[r >> 70] + p[(r >> 60) & 1023] + p[(r >> 50) & 1023] + p[(r >> 40) & 1023]
+            + p[(r >> 30) & 1023] + p[(r >> 20) & 1023] + p[(r >> 10) & 1023] + p[r & 1023]
+        )
+    return result
+
+
+def generate_id_at(timestamp) -> str:
+    """Genera un ULID con el timestamp de origen (ver generate_ids_at)."""
+    return generate_ids_at([timestamp])[0]